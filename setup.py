@@ -16,4 +16,5 @@ setup(
     version="0.6.9",
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={"polars": ["polars"]},
 )
\ No newline at end of file
@@ -0,0 +1,81 @@
+import json
+import pytest
+from datetime import date
+from unittest.mock import MagicMock, patch
+from toolbox.api_client.bodacc_api_client import LIMITE_PAGINATION_API, BodaccAPIClient
+from toolbox.api_client.extraction_job import BodaccExtractionJob
+
+
+@pytest.fixture
+def client(tmp_path):
+    return BodaccAPIClient(
+        base_url="https://bodacc-datadila.opendatasoft.com/api/explore/v2.1/catalog/datasets/annonces-commerciales/records",
+        cache_dir=str(tmp_path / "cache")
+    )
+
+@pytest.fixture
+def job(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(client, "count_results", lambda query_list=None, headers=None: 1)
+    return BodaccExtractionJob(
+        client, str(tmp_path / "job"),
+        start_date="2025-01-01", end_date="2025-01-20",
+        departements=["76", "27"], window_days=10
+    )
+
+def fake_fetch(query_list=None, max_workers=5, raise_on_error=False):
+    return [{"id": json.dumps(query_list)}]
+
+def test_partitions(job):
+    assert job.date_windows() == [("2025-01-01", "2025-01-10"), ("2025-01-11", "2025-01-20")]
+    assert len(job.partitions()) == 4
+
+def test_run_writes_manifest_and_results(job):
+    with patch.object(job.client, "fetch_all_data_from_api", side_effect=fake_fetch) as mock_api:
+        df = job.run()
+    assert mock_api.call_count == 4
+    assert len(df) == 4
+    assert len(job.read_manifest()["partitions"]) == 4
+    assert job.pending_partitions() == []
+
+def test_resume_skips_completed_partitions(job):
+    calls = {"n": 0}
+    def failing_fetch(**kwargs):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise RuntimeError("coupure réseau")
+        return fake_fetch(**kwargs)
+
+    with patch.object(job.client, "fetch_all_data_from_api", side_effect=failing_fetch):
+        df = job.run()
+    assert len(df) == 3
+    assert len(job.pending_partitions()) == 1
+
+    with patch.object(job.client, "fetch_all_data_from_api", side_effect=fake_fetch) as mock_api:
+        df = job.run()
+    mock_api.assert_called_once()
+    assert len(df) == 4
+
+def _jours(query_list):
+    # nombre de jours de la fenêtre de dates d'une requête
+    where = dict(query_list)["where"]
+    debut, fin = [date.fromisoformat(borne.split("'")[1]) for borne in where.split(" and ")]
+    return (fin - debut).days + 1
+
+def test_large_partition_split_into_narrower_windows(job, monkeypatch):
+    # 2 500 annonces par jour : une fenêtre de 10 jours dépasse la fenêtre de pagination de l'API
+    monkeypatch.setattr(job.client, "count_results", lambda query_list=None, headers=None: 2500 * _jours(query_list))
+    partition = job.partitions()[0]
+    with patch.object(job.client, "fetch_all_data_from_api", side_effect=fake_fetch) as mock_api:
+        assert job.run_partition(partition) == 4
+    fenetres = [_jours(appel.kwargs["query_list"]) for appel in mock_api.call_args_list]
+    assert fenetres == [3, 2, 3, 2]
+    assert all(2500 * jours <= LIMITE_PAGINATION_API for jours in fenetres)
+    assert job.read_manifest()["partitions"][job.partition_key(partition)]["count"] == 4
+
+def test_fetch_all_refuses_results_beyond_pagination_window(client):
+    response = MagicMock()
+    response.json.return_value = {"total_count": LIMITE_PAGINATION_API + 1, "results": [{"id": "A1"}]}
+    with patch("toolbox.api_client.bodacc_api_client.requests.get", return_value=response) as mock_get:
+        with pytest.raises(RuntimeError):
+            client.fetch_all_data_from_api([], raise_on_error=True)
+    mock_get.assert_called_once()
@@ -1,3 +1,4 @@
+import json
 import pytest
 import pandas as pd
 from toolbox.api_client.bodacc_api_client import BodaccAPIClient
@@ -72,3 +73,221 @@ def test_clean_and_extract_ps(raw_dataframe):
 
     # Test type de données sur une colonne date
     assert pd.api.types.is_datetime64_any_dtype(cleaned["date de plan de redressement"])
+
+
+# --- Tests hors ligne ---
+
+@pytest.fixture
+def sample_dataframe():
+    jugements = [
+        {"type": "initial", "famille": "Jugement d'ouverture", "nature": "Jugement d'ouverture d'une procédure de sauvegarde",
+         "date": "2024-01-15", "complementJugement": "Jugement ouvrant une procédure de sauvegarde"},
+        {"type": "initial", "famille": "Jugement de clôture", "nature": "Jugement arrêtant le plan de sauvegarde",
+         "date": "2024-06-10", "complementJugement": "Plan de sauvegarde d'une durée de huit ans"},
+        {"type": "initial", "famille": "Jugement d'ouverture", "nature": "Jugement d'ouverture de liquidation judiciaire",
+         "date": "2024-03-01", "complementJugement": "Jugement prononçant la liquidation judiciaire"},
+    ]
+    return pd.DataFrame({
+        "id": ["A1", "A2", "A3"],
+        "dateparution": ["2024-01-20", "2024-06-15", "2024-03-05"],
+        "numerodepartement": ["76", "76", "27"],
+        "commercant": ["SOCIETE A", "SOCIETE A", "SOCIETE;B"],
+        "jugement": [json.dumps(j, ensure_ascii=False) for j in jugements],
+        "numeroannonce": [1, 2, 3],
+        "registre": [["552100554", "552 100 554"], ["552100554", "552 100 554"], ["841774730", "841 774 730"]],
+    })
+
+
+def test_extract_jugement_fields_single_pass():
+    jugements = pd.Series(['{"date": "2024-01-01", "nature": "N", "extra": 1}', "pas du json", None, "[1, 2]"])
+    extracted = extract_jugement_fields(jugements, ["date", "nature", "extra"])
+    assert list(extracted.columns) == ["date", "nature", "extra"]
+    assert extracted.loc[0].tolist() == ["2024-01-01", "N", 1]
+    assert extracted.loc[1:].isnull().all().all()
+
+
+def test_extract_jugement_variable_offline(sample_dataframe):
+    jugement = json.loads(sample_dataframe.loc[0, "jugement"])
+    sample_dataframe.loc[0, "jugement"] = json.dumps({**jugement, "devise": "EUR"}, ensure_ascii=False)
+    df = extract_jugement_variable(sample_dataframe, extra_variables=["devise"])
+    assert df.loc[0, "date"] == "2024-01-15"
+    assert df.loc[2, "nature"] == "Jugement d'ouverture de liquidation judiciaire"
+    assert df.loc[1, "famille"] == "Jugement de clôture"
+    # variable supplémentaire : extraite lorsqu'elle est présente, manquante sinon
+    assert df.loc[0, "devise"] == "EUR"
+    assert df.loc[1:, "devise"].isnull().all()
+
+
+def test_extract_jugement_fields_input_forms():
+    jugements = pd.Series([
+        {"nature": "dict API", "complementJugement": ""},
+        '{"nature": "json API", "complementJugement": ""}',
+        '{""nature"": ""export CSV""}',
+    ])
+    extracted = extract_jugement_fields(jugements, ["nature", "complementJugement"])
+    assert extracted["nature"].tolist() == ["dict API", "json API", "export CSV"]
+    # une chaîne vide valide n'est pas altérée par la réparation des exports CSV
+    assert extracted.loc[1, "complementJugement"] == ""
+
+
+def test_extract_jugement_variable_repairs_only_legacy_rows(sample_dataframe):
+    jugements = sample_dataframe["jugement"].tolist()
+    jugements[0] = json.loads(jugements[0])
+    jugements[2] = '{""nature"": ""Jugement d\'ouverture de liquidation judiciaire""}'
+    sample_dataframe["jugement"] = pd.Series(jugements, dtype=object)
+    df = extract_jugement_variable(sample_dataframe)
+    assert isinstance(df.loc[0, "jugement"], dict)
+    assert df.loc[2, "jugement"] == '{"nature": "Jugement d\'ouverture de liquidation judiciaire"}'
+    assert df["nature"].notnull().all()
+
+
+def test_corriger_caracteres_speciaux():
+    assert corriger_caracteres_speciaux("Jugement de clÃ´ture") == "Jugement de clôture"
+    # texte non ré-décodable : corrections appliquées en une passe
+    assert corriger_caracteres_speciaux("dÃ©pÃ´t â€“ côté") == "dépôt – côté"
+    assert corriger_caracteres_speciaux("pâtisserie") == "pâtisserie"
+    assert corriger_caracteres_speciaux(None) is None
+
+
+def test_corriger_caracteres_speciaux_series():
+    series = pd.Series(["Avis de dÃ©pÃ´t", None, "Avis de dÃ©pÃ´t", "ok"], index=[3, 1, 2, 0])
+    corrigee = corriger_caracteres_speciaux_series(series)
+    assert corrigee.tolist()[0] == "Avis de dépôt"
+    assert corrigee.tolist()[2] == "Avis de dépôt"
+    assert corrigee.index.tolist() == [3, 1, 2, 0]
+    assert pd.isnull(corrigee.iloc[1])
+
+
+def test_extract_siren_from_registre():
+    registre = pd.Series([
+        ["552 100 554", "552100554"],
+        "['841 774 730', '841774730']",
+        [],
+        "sans siren",
+        None,
+    ])
+    siren = extract_siren_from_registre(registre)
+    assert siren.tolist()[:2] == ["552100554", "841774730"]
+    assert siren.iloc[2:].isnull().all()
+
+
+def test_classify_nature():
+    natures = pd.Series(["Jugement modifiant le plan de redressement", None, "Avis de dépôt"])
+    categories = classify_nature(natures)
+    assert categories.loc[0, "plan_redressement"] and categories.loc[0, "modification_plan_redressement"]
+    assert not categories.loc[1:].any().any()
+
+
+def test_classify_and_group_matches_filter_and_group():
+    df = pd.DataFrame({
+        "id": ["A", "A", "B", "B", "C"],
+        "date": pd.to_datetime(["2024-01-01", "2024-05-01", "2023-01-01", "2023-02-01", None]),
+        "nature": [
+            "Jugement arrêtant le plan de redressement",
+            "Jugement modifiant le plan de redressement",
+            "Jugement d'ouverture d'une procédure de sauvegarde",
+            "Jugement arrêtant le plan de sauvegarde",
+            "Jugement d'ouverture de liquidation judiciaire",
+        ],
+    })
+    groupes = classify_and_group(df)
+    for categorie, motif in REGLES_NATURE.items():
+        attendu = filter_and_group(df, "nature", motif)
+        obtenu = groupes[groupes["categorie"] == categorie].drop(columns="categorie")
+        pd.testing.assert_frame_equal(obtenu.reset_index(drop=True), attendu.reset_index(drop=True))
+
+
+def test_clean_and_extract_ps_offline(sample_dataframe):
+    df = clean_and_extract_ps(sample_dataframe)
+    assert len(df) == 3
+    assert df.loc[df["id"] == "A3", "date_ouverture_liquidation_judiciaire"].notnull().all()
+    assert df.loc[df["id"] == "A1", "date_ouverture_une_procedure_sauvegarde"].notnull().all()
+    assert df.loc[df["id"] == "A2", "date_plan_sauvegarde"].notnull().all()
+
+
+def test_build_status_table(sample_dataframe):
+    df = clean_dates(clean_columns(extract_jugement_variable(sample_dataframe)))
+    statuts = build_status_table(df)
+    assert list(statuts.columns) == [colonne for colonne, _, _ in COLONNES_STATUT]
+    assert statuts.loc["A2", "date_prevue_fin_sauvegarde"] == pd.Timestamp("2032-06-10")
+    assert pd.isnull(statuts.loc["A2", "date_ouverture_liquidation_judiciaire"])
+
+
+def test_current_status_by_company(sample_dataframe):
+    df = clean_dates(clean_columns(extract_jugement_variable(sample_dataframe)))
+    statuts = current_status_by_company(df)
+    assert sorted(statuts.index) == ["552100554", "841774730"]
+    assert pd.notnull(statuts.loc["552100554", "date_ouverture_une_procedure_sauvegarde"])
+    assert statuts.loc["552100554", "derniere_procedure"] == "plan_sauvegarde"
+    assert statuts.loc["841774730", "derniere_procedure"] == "liquidation_judiciaire"
+
+
+def _jugements_sans_siren(sirens):
+    return pd.DataFrame({
+        "id": ["a", "b", "c"], "SIREN": sirens,
+        "date": pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01"]),
+        "nature": ["Jugement d'ouverture de liquidation judiciaire",
+                   "Jugement d'ouverture d'une procédure de redressement judiciaire",
+                   "Jugement d'ouverture de liquidation judiciaire"],
+        "complementJugement": [None, None, None],
+    })
+
+
+@pytest.mark.parametrize("engine", ["pandas", "polars"])
+def test_status_by_siren_ignores_missing_siren(engine):
+    if engine == "polars":
+        pytest.importorskip("polars")
+    df = process_judgements_columns(_jugements_sans_siren([None, "", "552100554"]), cle="SIREN", engine=engine)
+    # les annonces sans SIREN ne partagent pas leurs statuts
+    assert df["date_ouverture_liquidation_judiciaire"].isnull().tolist() == [True, True, False]
+    assert df["date_ouverture_procedure_redressement"].isnull().all()
+
+    statuts = current_status_by_company(_jugements_sans_siren([None, "", "552100554"]), engine=engine)
+    assert statuts.index.tolist() == ["552100554"]
+
+
+@pytest.mark.parametrize("engine", ["pandas", "polars"])
+def test_status_by_siren_without_any_siren(engine):
+    if engine == "polars":
+        pytest.importorskip("polars")
+    df = process_judgements_columns(_jugements_sans_siren([None, None, None]), cle="SIREN", engine=engine)
+    assert df["date_ouverture_liquidation_judiciaire"].isnull().all()
+    assert current_status_by_company(_jugements_sans_siren([None, None, None]), engine=engine).empty
+
+
+def test_update_ps_status_returns_changed_rows(sample_dataframe):
+    previous = clean_and_extract_ps(sample_dataframe.iloc[[0, 2]].copy())
+    previous_copy = previous.copy()
+
+    # A2 (plan de sauvegarde) concerne le même SIREN que A1 : seules les lignes de ce SIREN sont recalculées
+    changed = update_ps_status(previous, sample_dataframe.iloc[[1]].copy(), cle="SIREN")
+    assert sorted(changed["id"]) == ["A1", "A2"]
+    assert changed["date_plan_sauvegarde"].notnull().all()
+    pd.testing.assert_frame_equal(previous, previous_copy)
+
+    # une annonce déjà connue et inchangée ne produit aucune ligne
+    unchanged = update_ps_status(previous, sample_dataframe.iloc[[2]].copy())
+    assert unchanged.empty
+
+
+def test_extract_missing_siren():
+    df = pd.DataFrame({
+        "SIREN": ["123456789", None, ""],
+        "listepersonnes": [
+            json.dumps({"personne": {"numeroImmatriculation": {"numeroIdentification": "552 100 554"}}}),
+            json.dumps({"personne": {"numeroImmatriculation": {"numeroIdentification": "552 100 554"}}}),
+            json.dumps({"personne": [{"numeroImmatriculation": {"numeroIdentification": "841 774 730"}}]}),
+        ],
+    })
+    assert extract_missing_siren(df)["SIREN"].tolist() == ["123456789", "552100554", "841774730"]
+    assert df["SIREN"].tolist() == ["123456789", None, ""]
+
+
+def test_clean_and_extract_ps_flags_invalid_siren(sample_dataframe):
+    sample_dataframe["registre"] = [["552100554"], ["55210055A"], None]
+    sample_dataframe["listepersonnes"] = [
+        None, None, json.dumps({"personne": {"numeroImmatriculation": {"numeroIdentification": "84177473X"}}}),
+    ]
+    df = clean_and_extract_ps(sample_dataframe)
+    # le SIREN retrouvé dans listepersonnes est lui aussi contrôlé
+    assert df["siren_invalide"].tolist() == [False, True, True]
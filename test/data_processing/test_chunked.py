@@ -0,0 +1,66 @@
+import json
+import pytest
+import pandas as pd
+from toolbox.data_processing.bodacc_utils import prepare_ps_data, process_judgements_columns
+from toolbox.data_processing.str_utils import clean_chaine
+from toolbox.data_processing.chunked import (
+    clean_and_extract_ps_chunked,
+    iter_clean_and_extract_ps_chunked,
+    partition_index,
+)
+
+NATURES = [
+    "Jugement d'ouverture d'une procédure de sauvegarde",
+    "Jugement arrêtant le plan de sauvegarde",
+    "Jugement arrêtant le plan de redressement",
+    "Jugement d'ouverture de liquidation judiciaire",
+]
+
+@pytest.fixture
+def raw_dataframe():
+    rows = []
+    for i in range(60):
+        jugement = {
+            "nature": NATURES[i % len(NATURES)],
+            "date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "complementJugement": "plan d'une durée de dix ans",
+        }
+        siren = f"{i % 7:09d}"
+        rows.append({
+            "id": f"A{i}", "dateparution": "2024-12-31", "numerodepartement": "76",
+            "commercant": "SOCIETE", "jugement": json.dumps(jugement, ensure_ascii=False),
+            "numeroannonce": i, "registre": str([siren, siren]),
+        })
+    return pd.DataFrame(rows)
+
+def _sorted(df):
+    return df.sort_values("id").reset_index(drop=True)
+
+def test_partition_index_is_stable():
+    keys = pd.Series(["a", "b", "a", None])
+    partitions = partition_index(keys, 4)
+    assert partitions.iloc[0] == partitions.iloc[2]
+    assert partitions.between(0, 3).all()
+
+@pytest.mark.parametrize("cle", ["id", "SIREN"])
+def test_chunked_matches_in_memory(raw_dataframe, cle):
+    chunks = (raw_dataframe.iloc[i:i + 13].copy() for i in range(0, len(raw_dataframe), 13))
+    chunked = clean_and_extract_ps_chunked(chunks, cle=cle, n_partitions=3)
+
+    expected = process_judgements_columns(prepare_ps_data(raw_dataframe.copy()), cle=cle)
+    expected.columns = expected.columns.map(clean_chaine)
+    pd.testing.assert_frame_equal(_sorted(chunked), _sorted(expected))
+
+def test_chunked_from_csv(raw_dataframe, tmp_path):
+    path = tmp_path / "annonces.csv"
+    raw_dataframe.to_csv(path, index=False)
+    output = clean_and_extract_ps_chunked(str(path), output_path=str(tmp_path / "out.csv"), chunksize=10, n_partitions=4)
+    result = pd.read_csv(output)
+    assert sorted(result["id"]) == sorted(raw_dataframe["id"])
+
+def test_chunked_budget_estimation(raw_dataframe, tmp_path):
+    path = tmp_path / "annonces.csv"
+    raw_dataframe.to_csv(path, index=False)
+    partitions = list(iter_clean_and_extract_ps_chunked(str(path), memory_budget_mb=0.01))
+    assert len(partitions) > 1
+    assert sum(len(p) for p in partitions) == len(raw_dataframe)
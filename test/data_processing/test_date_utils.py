@@ -1,14 +1,27 @@
+import re
 import pytest
-from datetime import datetime
+from datetime import datetime, date
 import pandas as pd
+from dateutil.relativedelta import relativedelta
 from toolbox.data_processing.date_utils import (
     mois_fr_vers_num,
     inverse_date,
     remplacer_nombres_francais,
+    remplacer_nombres_francais_series,
+    nombre_francais_vers_int,
     extraire_annees,
     extraire_mois,
-    bi_date
+    bi_date,
+    extraire_durees,
+    ajouter_duree_series,
+    MOTIFS_DUREE_REDRESSEMENT,
+    MOTIFS_DUREE_SAUVEGARDE,
+    detecter_format_date,
+    parse_dates,
+    clean_dates,
+    extraire_dates_fr,
 )
+from toolbox.data_processing.str_utils import ajouter_espace
 
 def test_mois_fr_vers_num():
     assert mois_fr_vers_num("janvier") == 1
@@ -28,6 +41,26 @@ def test_remplacer_nombres_francais():
     assert remplacer_nombres_francais("aucun nombre ici") == "aucun nombre ici"
     assert remplacer_nombres_francais("") == ""
 
+def test_remplacer_nombres_francais_composes():
+    assert remplacer_nombres_francais("vingt-quatre mois") == "24 mois"
+    assert remplacer_nombres_francais("soixante-dix-huit ans") == "78 ans"
+    assert remplacer_nombres_francais("quatre-vingt-dix-neuf") == "99"
+    assert remplacer_nombres_francais("trente et un mois") == "31 mois"
+    assert remplacer_nombres_francais("d'une durée de dix ans") == "d'une durée de 10 ans"
+    assert remplacer_nombres_francais("en septembre") == "en septembre"
+
+def test_nombre_francais_vers_int():
+    assert nombre_francais_vers_int("soixante et onze") == 71
+    assert nombre_francais_vers_int("Quatre-Vingts") == 80
+    assert nombre_francais_vers_int("mois") is None
+
+def test_remplacer_nombres_francais_series():
+    series = pd.Series(["deux ans", None, "deux ans", "vingt-deux mois"])
+    result = remplacer_nombres_francais_series(series)
+    assert result.tolist()[::2] == ["2 ans", "2 ans"]
+    assert result.iloc[3] == "22 mois"
+    assert pd.isnull(result.iloc[1])
+
 def test_extraire_annees():
     assert extraire_annees("durée 5 ans") == 5
     assert extraire_annees("3 an") == 3
@@ -42,3 +75,87 @@ def test_bi_date():
     assert bi_date("2020-02-29") == datetime(2020, 3, 1)
     assert bi_date("2021-02-28") == datetime(2021, 2, 28)
     assert bi_date(None) is None
+
+
+TEXTES_PLANS = [
+    "Jugement arrêtant le plan de redressement d'une durée de dix ans",
+    "plan de sauvegarde, durée du plan : 8 ans et 6 mois, nommant commissaire",
+    "Plan arrêté pour une durée de vingt-quatre mois",
+    "durée de soixante mois",
+    None,
+    "aucune durée",
+]
+
+def _duree_ligne_a_ligne(texte, motif):
+    extrait = re.search(motif, ajouter_espace(texte))
+    brut = remplacer_nombres_francais(extrait[1] if extrait else "")
+    nombre = re.search(r"(\d+)", brut)
+    return int(nombre[1]) if nombre else 0
+
+@pytest.mark.parametrize("motifs", [MOTIFS_DUREE_REDRESSEMENT, MOTIFS_DUREE_SAUVEGARDE])
+def test_extraire_durees(motifs):
+    durees = extraire_durees(pd.Series(TEXTES_PLANS), motifs)
+    assert durees["duree_annes"].tolist() == [_duree_ligne_a_ligne(t, motifs[0]) for t in TEXTES_PLANS]
+    assert durees["duree_mois"].tolist() == [_duree_ligne_a_ligne(t, motifs[1]) for t in TEXTES_PLANS]
+
+def test_ajouter_duree_series():
+    dates = [date(2020, 2, 29), date(2024, 1, 31), date(2023, 8, 31), None]
+    annees, mois = [1, 0, 0, 2], [0, 1, 6, 0]
+    fins = ajouter_duree_series(pd.Series(dates), annees, mois)
+    for d, a, m, fin in zip(dates[:3], annees, mois, fins):
+        assert fin == pd.Timestamp(bi_date(d) + relativedelta(years=a, months=m))
+    assert pd.isnull(fins.iloc[3])
+
+
+def test_detecter_format_date():
+    assert detecter_format_date(["2024-01-05", "2023-12-31"]) == "%Y-%m-%d"
+    assert detecter_format_date(["05/01/2024", "31/12/2023", "n/a"]) == "%d/%m/%Y"
+    assert detecter_format_date([None, 12]) is None
+
+
+def test_parse_dates_reports_unparsable_values():
+    dates, non_reconnues = parse_dates(pd.Series(["05/01/2024", "n/a", None, "05/01/2024", ""], index=[4, 3, 2, 1, 0]))
+    assert str(dates.dtype) == "datetime64[ns]"
+    assert dates.tolist()[0] == pd.Timestamp("2024-01-05")
+    assert dates.isnull().tolist() == [False, True, True, False, True]
+    assert dates.index.tolist() == [4, 3, 2, 1, 0]
+    assert non_reconnues == ["n/a"]
+
+
+def test_clean_dates_keeps_datetime64():
+    df = pd.DataFrame({
+        "date": ["2024-01-05", None, "erreur"],
+        "dateparution": [date(2024, 1, 2), None, date(2024, 1, 4)],
+        "nature": ["a", "b", "c"],
+    })
+    rapport = {}
+    cleaned = clean_dates(df.copy(), rapport=rapport)
+    assert pd.api.types.is_datetime64_any_dtype(cleaned["date"])
+    assert pd.api.types.is_datetime64_any_dtype(cleaned["dateparution"])
+    assert cleaned["nature"].tolist() == ["a", "b", "c"]
+    assert rapport == {"date": ["erreur"]}
+
+    exporte = clean_dates(df.copy(), as_date=True)
+    assert exporte["date"].tolist() == [date(2024, 1, 5), None, None]
+    assert exporte["dateparution"].tolist() == [date(2024, 1, 2), None, date(2024, 1, 4)]
+
+
+def test_extraire_dates_fr():
+    textes = pd.Series([
+        "Jugement du 12 janvier 2024, audience le 1er Mars 2023",
+        "date du jugement : 05/06/2021",
+        "31 février 2024",
+        None,
+        "Jugement du 12 janvier 2024, audience le 1er Mars 2023",
+    ], index=[10, 11, 12, 13, 14])
+    dates = extraire_dates_fr(textes)
+    assert dates.tolist()[:2] == [pd.Timestamp("2024-01-12"), pd.Timestamp("2021-06-05")]
+    assert dates.iloc[2:4].isnull().all()
+    assert dates.loc[14] == pd.Timestamp("2024-01-12")
+
+
+def test_extraire_dates_fr_toutes():
+    textes = pd.Series(["le 3 aout 2020 et le 1er décembre 2021", "aucune date"])
+    dates = extraire_dates_fr(textes, toutes=True)
+    assert dates.index.tolist() == [(0, 0), (0, 1)]
+    assert dates["date"].tolist() == [pd.Timestamp("2020-08-03"), pd.Timestamp("2021-12-01")]
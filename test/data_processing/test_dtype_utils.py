@@ -0,0 +1,120 @@
+import json
+import tracemalloc
+import pytest
+import pandas as pd
+from toolbox.data_processing.bodacc_utils import clean_and_extract_ps
+from toolbox.data_processing.dtype_utils import (
+    TYPE_IDENTIFIANT, compacter_types, copie_a_l_ecriture, detacher, rapport_memoire,
+)
+
+NATURES = [
+    "Jugement d'ouverture d'une procédure de sauvegarde",
+    "Jugement arrêtant le plan de sauvegarde",
+    "Jugement d'ouverture de liquidation judiciaire",
+]
+
+@pytest.fixture
+def raw_dataframe():
+    rows = []
+    for i in range(30):
+        jugement = {
+            "type": "initial", "famille": "Jugement", "nature": NATURES[i % len(NATURES)],
+            "date": f"2024-{i % 12 + 1:02d}-10", "complementJugement": f"plan d'une durée de {i % 9 + 1} ans",
+        }
+        siren = f"{i % 7:09d}"
+        rows.append({
+            "id": f"A{i}", "dateparution": "2024-12-31", "numerodepartement": "76",
+            "commercant": f"SOCIETE {i}", "jugement": json.dumps(jugement, ensure_ascii=False),
+            "numeroannonce": i, "registre": [siren, siren],
+        })
+    return pd.DataFrame(rows)
+
+def test_compacter_types():
+    df = pd.DataFrame({
+        "id": ["A1", "A2", "A3", "A4"],
+        "numeroannonce": [1, 2, 3, 4],
+        "nature": ["a", "b", "a", None],
+        "commentaire": ["x", "x", "x", "y"],
+        "texte": ["un", "deux", "trois", "quatre"],
+        "quantite": [1, 2, 3, 4],
+        "registre": [[1], [2], [3], [4]],
+    })
+    compact = compacter_types(df.copy())
+    assert compact["id"].dtype == TYPE_IDENTIFIANT
+    assert compact["numeroannonce"].tolist() == ["1", "2", "3", "4"]
+    assert isinstance(compact["nature"].dtype, pd.CategoricalDtype)
+    assert isinstance(compact["commentaire"].dtype, pd.CategoricalDtype)  # cardinalité détectée
+    assert compact["texte"].dtype == TYPE_IDENTIFIANT
+    assert compact["quantite"].dtype == "int8"
+    assert compact["registre"].dtype == object
+
+def test_clean_and_extract_ps_compact(raw_dataframe):
+    standard = clean_and_extract_ps(raw_dataframe.copy(), cle="SIREN")
+    compact = clean_and_extract_ps(raw_dataframe.copy(), cle="SIREN", compact=True)
+
+    assert isinstance(compact["nature"].dtype, pd.CategoricalDtype)
+    assert isinstance(compact["numero_departement"].dtype, pd.CategoricalDtype)
+    assert compact["siren"].dtype == TYPE_IDENTIFIANT
+    assert pd.api.types.is_datetime64_any_dtype(compact["date_plan_sauvegarde"])
+    pd.testing.assert_frame_equal(
+        compact.astype(object).where(compact.notnull(), None),
+        standard.astype(object).where(standard.notnull(), None),
+    )
+
+def test_rapport_memoire(raw_dataframe):
+    compact = compacter_types(raw_dataframe.drop(columns="registre"))
+    rapport = rapport_memoire(raw_dataframe.drop(columns="registre"), compact)
+    assert "total" in rapport.index
+    assert rapport.loc["total", "ratio"] > 1
+
+
+@pytest.fixture
+def large_raw_dataframe():
+    rows = []
+    for i in range(5000):
+        jugement = {
+            "type": "initial", "famille": "Jugement", "nature": NATURES[i % len(NATURES)],
+            "date": f"20{i % 15 + 10}-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "complementJugement": f"plan d'une durée de {i % 9 + 1} ans (annonce {i})",
+        }
+        siren = f"{i % 1500:09d}"
+        rows.append({
+            "id": f"A{i % 2000}", "dateparution": "2024-12-31", "numerodepartement": f"{i % 95 + 1:02d}",
+            "commercant": f"SOCIETE;{i}", "jugement": json.dumps(jugement, ensure_ascii=False),
+            "numeroannonce": i, "registre": [siren, siren],
+        })
+    return pd.DataFrame(rows)
+
+def test_clean_and_extract_ps_peak_memory(large_raw_dataframe):
+    # premier passage : compilation des motifs et imports paresseux hors de la mesure
+    clean_and_extract_ps(large_raw_dataframe.head(50))
+    taille = large_raw_dataframe.memory_usage(deep=True).sum()
+
+    tracemalloc.start()
+    try:
+        clean_and_extract_ps(large_raw_dataframe)
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # le pipeline ne copie pas les annonces reçues : pic mesuré autour de 1,63 fois la taille de l'entrée,
+    # une copie complète de l'entrée le porterait au-delà de 2,6 fois
+    assert pic < 1.8 * taille
+
+def test_clean_and_extract_ps_does_not_modify_input(raw_dataframe):
+    entree = raw_dataframe.copy()
+    resultat = clean_and_extract_ps(raw_dataframe)
+    pd.testing.assert_frame_equal(raw_dataframe, entree)
+
+    # hors copie à l'écriture, une écriture sur le résultat ne remonte pas dans l'entrée
+    resultat.loc[resultat.index[0], "id"] = "modifie"
+    resultat.loc[resultat.index[0], "numero_departement"] = "00"
+    pd.testing.assert_frame_equal(raw_dataframe, entree)
+
+def test_detacher():
+    entree = pd.DataFrame({"a": ["x", "y"], "b": [1, 2]})
+    with copie_a_l_ecriture():
+        resultat = entree.copy(deep=False).assign(c=[3, 4])
+    resultat = detacher(resultat, entree)
+    resultat.loc[0, ["a", "b"]] = ["z", 9]
+    assert entree["a"].tolist() == ["x", "y"]
+    assert entree["b"].tolist() == [1, 2]
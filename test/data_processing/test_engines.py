@@ -0,0 +1,116 @@
+import json
+import pytest
+import pandas as pd
+from toolbox.data_processing.bodacc_utils import clean_and_extract_ps, prepare_ps_data, build_status_table
+from toolbox.data_processing.date_utils import MOTIFS_DUREE_REDRESSEMENT, MOTIFS_DUREE_SAUVEGARDE
+from toolbox.data_processing.engines import PandasEngine, available_engines, get_engine, benchmark_engines
+
+NATURES = [
+    "Jugement d'ouverture d'une procédure de sauvegarde",
+    "Jugement arrêtant le plan de sauvegarde",
+    "Jugement arrêtant le plan de redressement",
+    "Jugement d'ouverture de liquidation judiciaire",
+    "Jugement modifiant le plan de redressement",
+    "Avis de dépÃ´t",
+    None,
+]
+
+@pytest.fixture
+def raw_dataframe():
+    rows = []
+    for i in range(60):
+        jugement = {
+            "nature": NATURES[i % len(NATURES)],
+            "date": f"2024-{i % 12 + 1:02d}-{i % 5 + 1:02d}" if i % 11 else None,
+            "complementJugement": "plan d'une durée de huit ans" if i % 3 else "fin du plan",
+        }
+        siren = f"{i % 7:09d}"
+        rows.append({
+            "id": f"A{i % 20}", "dateparution": "2024-12-31", "numerodepartement": "76",
+            "commercant": "SOCIETE", "jugement": json.dumps(jugement, ensure_ascii=False),
+            "numeroannonce": i, "registre": [siren, siren],
+        })
+    return pd.DataFrame(rows)
+
+def test_get_engine():
+    assert isinstance(get_engine("pandas"), PandasEngine)
+    assert get_engine("auto").name in available_engines()
+    with pytest.raises(ValueError):
+        get_engine("inconnu")
+
+@pytest.mark.parametrize("cle", ["id", "SIREN"])
+def test_polars_matches_pandas(raw_dataframe, cle):
+    pytest.importorskip("polars")
+    df = prepare_ps_data(raw_dataframe)
+    pd.testing.assert_frame_equal(
+        build_status_table(df, cle, engine="polars").sort_index(),
+        build_status_table(df, cle, engine="pandas").sort_index(),
+    )
+
+def test_clean_and_extract_ps_engine(raw_dataframe):
+    pytest.importorskip("polars")
+    pd.testing.assert_frame_equal(
+        clean_and_extract_ps(raw_dataframe.copy(), cle="SIREN", engine="polars"),
+        clean_and_extract_ps(raw_dataframe.copy(), cle="SIREN"),
+    )
+
+def test_benchmark_engines(raw_dataframe):
+    resultat = benchmark_engines(raw_dataframe, engines=["pandas"], repeat=1)
+    assert list(resultat["engine"]) == ["pandas"]
+    assert resultat.loc[0, "acceleration"] == 1
+
+JUGEMENTS_DIFFICILES = [
+    json.dumps({"nature": "Jugement d'ouverture de liquidation judiciaire", "date": "2024-01-05", "complementJugement": "a;b"}),
+    json.dumps({"nature": "Avis de dépÃ´t", "famille": "Jugement", "date": 20240105}),
+    '{"nature": "premier", "nature": "second", "type": null}',
+    '{"nature": "x", "complementJugement": true, "famille": "\\ud800"}',
+    "null",
+    None,
+]
+
+@pytest.mark.parametrize("jugements", [
+    JUGEMENTS_DIFFICILES,
+    JUGEMENTS_DIFFICILES + ['{""nature"": ""Jugement de clôture""}'],
+    JUGEMENTS_DIFFICILES + [{"nature": "dictionnaire de l'API"}],
+])
+def test_polars_extract_jugement_variable_matches_pandas(jugements):
+    pytest.importorskip("polars")
+    df = pd.DataFrame({"jugement": jugements}, index=[10 * i for i in range(len(jugements))])
+    pd.testing.assert_frame_equal(
+        get_engine("polars").extract_jugement_variable(df.copy()),
+        get_engine("pandas").extract_jugement_variable(df.copy()),
+    )
+
+def test_polars_clean_columns_matches_pandas():
+    pytest.importorskip("polars")
+    df = pd.DataFrame({
+        "registre": [["123456789", "123 456 789"], None, "552 100 554", None],
+        "commercant": ["SOC;IETE", None, 5, float("nan")],
+        "complementJugement": ["a;b;c", "sans", None, ""],
+        "nature": ["x;y", None, "z", "x;y"],
+    })
+    pd.testing.assert_frame_equal(get_engine("polars").clean_columns(df.copy()), get_engine("pandas").clean_columns(df.copy()))
+
+@pytest.mark.parametrize("dates", [
+    ["2024-01-15", "2024-1-5", " 2024-01-15", "0001-01-01", "2262-04-12", "+2024-01-01", "2024-02-30", "", None, "2024-01-15"],
+    ["15/01/2024", "15/01/24", "1/2/2024", "pas une date", None],
+    ["2024-01-15T10:00:00.5", "2024-01-15T10:00:00.25"],
+    ["janvier", "2024-01-15", None],
+])
+def test_polars_parse_dates_matches_pandas(dates):
+    pytest.importorskip("polars")
+    serie = pd.Series(dates, dtype=object, name="date")
+    resultat, non_reconnues = get_engine("polars").parse_dates(serie)
+    attendu, non_reconnues_attendues = get_engine("pandas").parse_dates(serie)
+    pd.testing.assert_series_equal(resultat, attendu)
+    assert non_reconnues == non_reconnues_attendues
+
+def test_polars_extraire_durees_matches_pandas():
+    pytest.importorskip("polars")
+    textes = pd.Series([
+        "plan d'une durée de huit ans", "plan de 9ans et 6mois", "durée de vingt-quatre mois", "soixante et onze ans",
+        "fin du plan", None, 12, "durée 5 ans nommant commissaire",
+    ], index=[3, 1, 4, 1, 5, 9, 2, 6])
+    moteur, reference = get_engine("polars"), get_engine("pandas")
+    for motifs in (MOTIFS_DUREE_REDRESSEMENT, MOTIFS_DUREE_SAUVEGARDE):
+        pd.testing.assert_frame_equal(moteur.extraire_durees(textes, motifs), reference.extraire_durees(textes, motifs))
@@ -0,0 +1,75 @@
+import json
+import pytest
+import pandas as pd
+from toolbox.data_processing.json_utils import (
+    ExtracteurJson, aplatir_champs_imbriques, compiler_chemin, decoder_json, extraire_chemins,
+)
+
+@pytest.fixture
+def listepersonnes():
+    return pd.Series([
+        json.dumps({"personne": {"typePersonne": "pm", "denomination": "SOCIETE A",
+                                 "numeroImmatriculation": {"numeroIdentification": "552 100 554", "nomGreffeImmat": "Rouen"}}}),
+        json.dumps({"personne": [{"typePersonne": "pp", "nom": "DUPONT", "numeroImmatriculation": {"numeroIdentification": "841 774 730"}},
+                                 {"typePersonne": "pp", "nom": "MARTIN"}]}),
+        None,
+        "pas du json",
+    ], index=[10, 11, 11, 12])
+
+def test_decoder_json():
+    assert decoder_json('{"a": 1}') == {"a": 1}
+    assert decoder_json({"a": 1}) == {"a": 1}
+    assert decoder_json("{invalide") is None
+    assert decoder_json(None) is None
+
+def test_compiler_chemin():
+    suivre = compiler_chemin("personne.numeroImmatriculation.numeroIdentification")
+    assert suivre({"personne": {"numeroImmatriculation": {"numeroIdentification": "1"}}}) == "1"
+    # une liste rencontrée en cours de chemin est remplacée par son premier élément
+    assert suivre({"personne": [{"numeroImmatriculation": {"numeroIdentification": "2"}}, {}]}) == "2"
+    assert suivre({"personne": "texte"}) is None
+    assert suivre(None) is None
+
+def test_extracteur_json_matches_compiler_chemin(listepersonnes):
+    chemins = {"type": "personne.typePersonne", "siren": "personne.numeroImmatriculation.numeroIdentification",
+               "greffe": "personne.numeroImmatriculation.nomGreffeImmat", "personne": "personne"}
+    colonnes = ExtracteurJson(chemins)(listepersonnes)
+    assert list(colonnes.columns) == list(chemins)
+    assert colonnes.index.equals(listepersonnes.index)
+    for nom, chemin in chemins.items():
+        attendu = [compiler_chemin(chemin)(decoder_json(valeur)) for valeur in listepersonnes]
+        assert colonnes[nom].tolist() == attendu
+
+def test_extracteur_json_types(listepersonnes):
+    colonnes = extraire_chemins(listepersonnes, {"siren": "personne.numeroImmatriculation.numeroIdentification"},
+                                types={"siren": "siren"})
+    assert colonnes["siren"].tolist() == ["552100554", "841774730", None, None]
+
+    dates = pd.Series(['{"dateEffet": "2024-01-15"}', '{"dateEffet": null}'])
+    assert ExtracteurJson({"date": "dateEffet"}, types={"date": "date"})(dates)["date"].dtype == "datetime64[ns]"
+
+def test_extracteur_json_listes(listepersonnes):
+    extracteur = ExtracteurJson({"type": "personne.typePersonne"},
+                                listes={"personnes": ("personne", {"nom": "nom", "type": "typePersonne"})})
+    colonnes, tables = extracteur.extraire(listepersonnes)
+    personnes = tables["personnes"]
+    assert colonnes["type"].tolist() == ["pm", "pp", None, None]
+    assert list(personnes.index) == [10, 11, 11]
+    assert personnes["rang"].tolist() == [0, 0, 1]
+    assert personnes["nom"].tolist() == [None, "DUPONT", "MARTIN"]
+
+def test_aplatir_champs_imbriques(listepersonnes):
+    df = pd.DataFrame({
+        "id": ["A", "B", "C", "D"],
+        "listepersonnes": listepersonnes.to_numpy(),
+        "acte": [json.dumps({"vente": {"categorieVente": "Achat", "dateEffet": "2024-01-02"}, "descriptif": "Achat d'un fonds"}),
+                 None, None, None],
+    }, index=listepersonnes.index)
+    tables = aplatir_champs_imbriques(df)
+    annonces, personnes = tables["annonces"], tables["listepersonnes"]
+
+    assert "listepersonnes" not in annonces.columns and "acte" not in annonces.columns
+    assert annonces["categorie_vente"].tolist() == ["Achat", None, None, None]
+    assert annonces["date_effet_vente"].iloc[0] == pd.Timestamp("2024-01-02")
+    assert personnes["id"].tolist() == ["A", "B", "B"]
+    assert personnes["siren"].tolist() == ["552100554", "841774730", None]
@@ -0,0 +1,83 @@
+import json
+import multiprocessing
+import pytest
+import pandas as pd
+from multiprocessing import shared_memory
+from toolbox.data_processing import parallel
+from toolbox.data_processing.bodacc_utils import clean_and_extract_ps
+from toolbox.data_processing.parallel import clean_and_extract_ps_parallel
+
+NATURES = [
+    "Jugement d'ouverture d'une procédure de sauvegarde",
+    "Jugement arrêtant le plan de sauvegarde",
+    "Jugement arrêtant le plan de redressement",
+    "Jugement d'ouverture de liquidation judiciaire",
+    "Avis de dépÃ´t",
+]
+
+@pytest.fixture
+def raw_dataframe():
+    rows = []
+    for i in range(80):
+        jugement = {
+            "nature": NATURES[i % len(NATURES)],
+            "date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "complementJugement": "plan d'une durée de huit ans",
+        }
+        siren = f"{i % 9:09d}"
+        rows.append({
+            "id": f"A{i}", "dateparution": "2024-12-31", "numerodepartement": "76",
+            "commercant": "SOCIETE", "jugement": json.dumps(jugement, ensure_ascii=False),
+            "numeroannonce": i, "registre": [siren, siren],
+        })
+    return pd.DataFrame(rows, index=range(100, 180))
+
+@pytest.mark.parametrize("cle", ["id", "SIREN"])
+def test_parallel_matches_serial(raw_dataframe, cle):
+    serial = clean_and_extract_ps(raw_dataframe.copy(), cle=cle)
+    parallel = clean_and_extract_ps_parallel(raw_dataframe.copy(), n_workers=2, cle=cle, n_partitions=4)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+def test_parallel_siren_from_listepersonnes():
+    # une annonce avec registre et une liquidation dont le SIREN n'est que dans 'listepersonnes', par entreprise
+    rows = []
+    for i in range(40):
+        siren = f"{i + 1:09d}"
+        rows.append({
+            "id": f"A{i}", "dateparution": "2024-01-15", "numerodepartement": "76", "commercant": "SOCIETE",
+            "jugement": json.dumps({"nature": NATURES[0], "date": "2023-03-01"}, ensure_ascii=False),
+            "numeroannonce": 2 * i, "registre": [siren, siren], "listepersonnes": None,
+        })
+        rows.append({
+            "id": f"B{i}", "dateparution": "2024-02-15", "numerodepartement": "76", "commercant": "SOCIETE",
+            "jugement": json.dumps({"nature": NATURES[3], "date": "2024-02-01"}, ensure_ascii=False),
+            "numeroannonce": 2 * i + 1, "registre": None,
+            "listepersonnes": json.dumps({"personne": {"numeroImmatriculation": {"numeroIdentification": siren}}}),
+        })
+    raw_dataframe = pd.DataFrame(rows)
+    serial = clean_and_extract_ps(raw_dataframe, cle="SIREN")
+    parallel = clean_and_extract_ps_parallel(raw_dataframe, n_workers=2, cle="SIREN", n_partitions=4)
+    assert serial["date_ouverture_liquidation_judiciaire"].notnull().sum() == 80
+    pd.testing.assert_frame_equal(parallel, serial)
+
+def test_partitions_handed_over_through_shared_memory(raw_dataframe, monkeypatch):
+    noms, partager = [], parallel._partager
+    def espion(df):
+        segment, taille = partager(df)
+        noms.append(segment.name)
+        return segment, taille
+    monkeypatch.setattr(parallel, "_partager", espion)
+
+    clean_and_extract_ps_parallel(raw_dataframe, n_workers=2, n_partitions=4)
+    assert len(noms) == 4
+    # les segments sont libérés après le traitement
+    for nom in noms:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=nom)
+
+def test_start_method(monkeypatch):
+    monkeypatch.setattr(parallel, "_processus_multithread", lambda: True)
+    assert parallel._methode_de_demarrage() in ("forkserver", "spawn")
+    if "fork" in multiprocessing.get_all_start_methods():
+        monkeypatch.setattr(parallel, "_processus_multithread", lambda: False)
+        assert parallel._methode_de_demarrage() == "fork"
@@ -0,0 +1,118 @@
+import pytest
+import pandas as pd
+from toolbox.data_processing.str_utils import (
+    corrections_caracteres,
+    compiler_corrections,
+    normaliser_siren,
+    siren_invalides,
+    is_valide_siren_siret,
+    valider_siren_siret,
+    FonctionParValeur,
+    par_valeur,
+    rapport_memoisation,
+    ajouter_espace_series,
+)
+
+
+def test_compiler_corrections_longest_match():
+    corriger = compiler_corrections(corrections_caracteres)
+    assert corriger("Ã©tÃ©") == "été"
+    assert corriger("lâ€™entreprise") == "l’entreprise"
+    assert corriger("â€¢ point") == "• point"
+    assert corriger("sans erreur") == "sans erreur"
+
+
+def test_compiler_corrections_custom_table():
+    corriger = compiler_corrections({"a": "b", "ab": "X"})
+    assert corriger("aab") == "bX"
+
+
+def test_normaliser_siren():
+    siren = pd.Series(["552 100 554", "552\xa0100\xa0554", "12345678", " ", None, 123])
+    assert normaliser_siren(siren).tolist() == ["552100554", "552100554", "012345678", None, None, None]
+
+
+def test_siren_invalides():
+    siren = pd.Series(["552100554", "55210055A", "5521005540", None, 552100554])
+    assert siren_invalides(siren).tolist() == [False, True, True, False, True]
+
+
+def test_is_valide_siren_siret_la_poste():
+    assert is_valide_siren_siret("552100554")
+    assert not is_valide_siren_siret("552100555")
+    assert is_valide_siren_siret("35600000049837")  # somme des chiffres multiple de 5
+    assert is_valide_siren_siret("35600000000048")  # siège : clé de Luhn
+
+
+def test_valider_siren_siret_matches_scalar():
+    numeros = pd.Series([
+        "552100554", "552100555", "73282932000074", "73282932000075",
+        "35600000049837", "35600000049838", "35600000000048",
+        "55210055A", "١٢٣٤٥٦٧٨٩", "", None, 552100554,
+    ], index=range(10, 22))
+    valides = valider_siren_siret(numeros)
+    attendus = [isinstance(n, str) and n.isascii() and is_valide_siren_siret(n) for n in numeros]
+    assert valides.tolist() == attendus
+    assert valides.index.equals(numeros.index)
+
+
+def test_fonction_par_valeur_calls_once_per_distinct_value():
+    appels = []
+
+    @par_valeur
+    def majuscules(texte):
+        appels.append(texte)
+        return texte.upper()
+
+    resultat = majuscules(pd.Series(["a", "b", None, "a", "b"], index=[5, 4, 3, 2, 1]))
+    assert resultat.tolist()[:2] == ["A", "B"] and resultat.tolist()[3:] == ["A", "B"]
+    assert pd.isnull(resultat.iloc[2])
+    assert resultat.index.tolist() == [5, 4, 3, 2, 1]
+    assert sorted(appels) == ["a", "b"]
+
+
+def test_fonction_par_valeur_bounded_cache():
+    appels = []
+    longueur = FonctionParValeur(lambda texte: appels.append(texte) or len(texte), cache_size=2)
+    longueur(pd.Series(["a", "bb"]))
+    longueur(pd.Series(["bb", "ccc"]))  # "bb" est servi par le cache, "a" en est évincé
+    longueur(pd.Series(["a"]))
+    assert appels == ["a", "bb", "ccc", "a"]
+
+    stats = longueur.stats()
+    assert stats["lignes"] == 5 and stats["calculs"] == 4 and stats["succes_cache"] == 1
+    assert stats["taux_reutilisation"] == pytest.approx(0.2)
+
+
+def test_fonction_par_valeur_skips_cache_for_near_unique_series():
+    longueur = FonctionParValeur(len, cache_size=None)
+    uniques = pd.Series([f"SOCIETE {i}" for i in range(2000)])
+    longueur(uniques)
+    assert len(longueur._cache) == 0
+
+    repetees = pd.Series(["a", "bb"] * 1000)
+    longueur(repetees)
+    longueur(repetees)
+    assert len(longueur._cache) == 2 and longueur.stats()["succes_cache"] == 2
+
+
+def test_fonction_par_valeur_shared_between_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    longueur = FonctionParValeur(len, cache_size=50)
+    series = [pd.Series([f"{i}-{j % 80}" for j in range(200)]) for i in range(4)] * 10
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resultats = list(executor.map(longueur, series))
+    assert all(resultat.tolist() == serie.str.len().tolist() for resultat, serie in zip(resultats, series))
+
+    stats = longueur.stats()
+    assert stats["lignes"] == 200 * len(series)
+    assert stats["calculs"] + stats["succes_cache"] == stats["valeurs_distinctes"] == 80 * len(series)
+    assert len(longueur._cache) <= 50
+
+
+def test_rapport_memoisation():
+    ajouter_espace_series(pd.Series(["TEST123", "TEST123"]))
+    rapport = rapport_memoisation()
+    ligne = rapport[rapport["fonction"] == "ajouter_espace"].iloc[0]
+    assert ligne["lignes"] >= 2
+    assert 0 <= ligne["taux_reutilisation"] <= 1
@@ -0,0 +1,55 @@
+import json
+import pytest
+import pandas as pd
+from toolbox.data_processing.vente_cession_utils import (
+    clean_and_extract_vc,
+    extract_vc_nested_fields,
+    iter_clean_and_extract_vc,
+)
+
+@pytest.fixture
+def raw_dataframe():
+    rows = []
+    for i in range(20):
+        siren = f"{i:09d}"
+        personne = {"typePersonne": "pm", "denomination": f"SOCIETE {i}",
+                    "numeroImmatriculation": {"numeroIdentification": f"{siren[:3]} {siren[3:6]} {siren[6:]}"}}
+        if i % 4 == 0:
+            personne = [personne, {"typePersonne": "pp", "nom": "DUPONT"}]
+        rows.append({
+            "id": f"B{i % 15}", "dateparution": f"2024-{i % 12 + 1:02d}-10", "numerodepartement": "76",
+            "numeroannonce": i, "commercant": f"SOCIETE {i}",
+            "registre": [siren, siren] if i % 2 else None,
+            "listepersonnes": json.dumps({"personne": personne}, ensure_ascii=False),
+            "listeetablissements": json.dumps({"etablissement": {"origineFonds": "Achat d'un fonds", "activite": "Boulangerie"}}),
+            "acte": json.dumps({"vente": {"categorieVente": "Achat", "dateEffet": f"2024-{i % 12 + 1:02d}-15"}}),
+        })
+    return pd.DataFrame(rows)
+
+def test_extract_vc_nested_fields(raw_dataframe):
+    df = extract_vc_nested_fields(raw_dataframe)
+    assert "listepersonnes" not in df.columns and "acte" not in df.columns
+    assert df["denomination"].tolist() == [f"SOCIETE {i}" for i in range(20)]
+    assert df["siren_personne"].iloc[1] == "000000001"
+    assert df["activite"].eq("Boulangerie").all()
+    # champs absents du DataFrame : colonnes vides
+    assert df["type_depot"].isnull().all()
+
+def test_clean_and_extract_vc(raw_dataframe):
+    df = clean_and_extract_vc(raw_dataframe)
+    assert df["id"].is_unique and len(df) == 15
+    assert df["siren"].tolist() == [f"{i:09d}" for i in range(15)]
+    assert df["date_parution"].dtype == "datetime64[ns]"
+    assert df["date_effet_vente"].dtype == "datetime64[ns]"
+    assert {"raison_sociale", "numero_departement", "categorie_vente", "origine_fonds"} <= set(df.columns)
+
+def test_clean_and_extract_vc_chunks_match_single_pass(raw_dataframe):
+    attendu = clean_and_extract_vc(raw_dataframe)
+    blocs = list(iter_clean_and_extract_vc(raw_dataframe, chunksize=6))
+    assert len(blocs) > 1
+    # les annonces déjà vues dans un bloc précédent sont ignorées
+    pd.testing.assert_frame_equal(pd.concat(blocs), attendu)
+
+def test_clean_and_extract_vc_output_path(raw_dataframe, tmp_path):
+    chemin = clean_and_extract_vc(raw_dataframe, chunksize=7, output_path=str(tmp_path / "vc.csv"))
+    assert len(pd.read_csv(chemin)) == 15
@@ -0,0 +1,11 @@
+import pytest
+
+@pytest.fixture
+def records():
+    return [
+        {"id": "A1", "dateparution": "2024-01-20", "numerodepartement": "76", "commercant": "SOCIETE A",
+         "jugement": "{}", "numeroannonce": 1, "registre": ["552100554", "552 100 554"], "SIREN": "552 100 554",
+         "hors_schema": 0},
+        {"id": "A2", "dateparution": "2024-06-15", "numerodepartement": "27", "commercant": "SOCIETE B",
+         "jugement": "{}", "numeroannonce": 2, "registre": None},
+    ]
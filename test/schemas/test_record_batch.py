@@ -0,0 +1,51 @@
+import dataclasses
+import numpy as np
+import pandas as pd
+import pytest
+from toolbox.schemas import (
+    ProcessedVenteCessionBatch,
+    UnProcessedProcedureCollective,
+    UnProcessedProcedureCollectiveBatch,
+    UnProcessedVenteCession,
+    UnProcessedVenteCessionBatch,
+)
+
+def test_schemas_are_slotted():
+    assert not hasattr(UnProcessedVenteCession(), "__dict__")
+    assert "id" in UnProcessedVenteCession.__slots__
+    assert dataclasses.is_dataclass(UnProcessedVenteCession)
+
+def test_from_records_matches_from_dict(records):
+    batch = UnProcessedProcedureCollectiveBatch.from_records(records)
+    assert len(batch) == 2
+    assert batch.to_records() == [UnProcessedProcedureCollective.from_dict(record) for record in records]
+    assert batch[0].SIREN == "552100554" and batch[-1].SIREN is None
+
+def test_from_records_mappings():
+    class Ligne(dict):
+        pass
+    lignes = [{"id": "B1", "ville": "Rouen"}, Ligne(id="B2")]
+    batch = UnProcessedVenteCessionBatch.from_records(lignes)
+    assert list(batch.column("id")) == ["B1", "B2"]
+    assert batch[0] == UnProcessedVenteCession.from_dict(lignes[0])
+
+def test_dataframe_round_trip_without_copy():
+    df = pd.DataFrame({"id": np.array(["C1", "C2"], dtype=object), "siren": np.array(["1", "2"], dtype=object),
+                       "numero_annonce": np.array([1, 2])})
+    batch = ProcessedVenteCessionBatch.from_dataframe(df)
+    assert batch.column("date_parution").tolist() == [None, None]
+
+    resultat = batch.to_dataframe()
+    assert list(resultat.columns) == ProcessedVenteCessionBatch.get_fields()
+    assert np.shares_memory(resultat["id"].to_numpy(), batch.column("id"))
+    assert np.shares_memory(batch.column("numero_annonce"), df["numero_annonce"].to_numpy())
+
+def test_from_arrow():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({"id": ["D1", "D2"], "ville": ["Rouen", None], "numeroannonce": [1, 2]})
+    batch = UnProcessedVenteCessionBatch.from_arrow(table)
+    assert batch[1] == UnProcessedVenteCession(id="D2", ville=None, numeroannonce=2)
+
+def test_invalid_length():
+    with pytest.raises(ValueError):
+        UnProcessedVenteCessionBatch({"id": ["E1"], "ville": ["Rouen", "Evreux"]}, 1)
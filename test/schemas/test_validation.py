@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+from toolbox.schemas import (
+    ProcessedProcedureCollective,
+    UnProcessedProcedureCollective,
+    UnProcessedProcedureCollectiveBatch,
+    ValidateurSchema,
+    type_du_champ,
+    validateur,
+    valider,
+)
+
+@pytest.fixture
+def annonces(records):
+    # une annonce valide, une annonce aux champs invalides, une annonce aux identifiants numériques
+    return [
+        records[0],
+        {"id": None, "dateparution": "pas une date", "numerodepartement": "7", "commercant": "SOCIETE B",
+         "jugement": "{}", "numeroannonce": "a", "registre": None, "SIREN": ["552100554"]},
+        {**records[1], "id": "A3", "numerodepartement": "2A", "numeroannonce": 3.0, "SIREN": 12345674},
+    ]
+
+def test_type_du_champ():
+    types = {nom: type_du_champ(nom, annotation) for nom, annotation in UnProcessedProcedureCollective.__annotations__.items()}
+    assert types == {
+        "id": "str", "dateparution": "date", "numerodepartement": "departement", "commercant": "str",
+        "jugement": "str", "numeroannonce": "entier", "registre": "any", "SIREN": "siren",
+    }
+    assert type_du_champ("arret_cour_appel", str) == "date"
+
+def test_valider_converts_columns(annonces):
+    resultat = valider(annonces, UnProcessedProcedureCollective)
+    donnees = resultat.donnees
+    assert list(donnees.columns) == UnProcessedProcedureCollective.get_fields()
+    assert pd.api.types.is_datetime64_any_dtype(donnees["dateparution"])
+    assert donnees["numeroannonce"].tolist() == ["1", None, "3"]
+    assert donnees["SIREN"].tolist() == ["552100554", None, "012345674"]
+    assert donnees["registre"].iloc[0] == ["552100554", "552 100 554"]
+
+def test_valider_reports_errors(annonces):
+    resultat = valider(annonces, UnProcessedProcedureCollective)
+    erreurs = set(resultat.erreurs[["ligne", "champ", "motif"]].itertuples(index=False, name=None))
+    assert erreurs == {
+        (1, "id", "obligatoire"),
+        (1, "dateparution", "date"),
+        (1, "numerodepartement", "format"),
+        (1, "numeroannonce", "format"),
+        (1, "SIREN", "type"),
+    }
+    assert not resultat.valide
+    assert list(resultat.lignes_invalides) == [1]
+    assert resultat.lignes_valides()["id"].tolist() == ["A1", "A3"]
+    # les valeurs invalides sont remplacées par des valeurs manquantes
+    assert resultat.donnees.loc[1, ["numerodepartement", "numeroannonce", "SIREN"]].isnull().all()
+    assert pd.isna(resultat.donnees.loc[1, "dateparution"])
+
+def test_valider_dataframe_and_batch(annonces):
+    attendu = valider(annonces, UnProcessedProcedureCollective)
+    depuis_df = valider(pd.DataFrame(annonces), UnProcessedProcedureCollective)
+    pd.testing.assert_frame_equal(depuis_df.erreurs, attendu.erreurs)
+
+    batch = UnProcessedProcedureCollectiveBatch.from_records(annonces[:1])
+    resultat = batch.valider()
+    assert resultat.valide
+    assert resultat.donnees["SIREN"].tolist() == ["552100554"]
+
+def test_optional_fields_may_be_absent():
+    resultat = valider(pd.DataFrame({"id": ["A1"], "date_parution": ["20/01/2024"]}), ProcessedProcedureCollective)
+    assert resultat.valide
+    assert list(resultat.donnees.columns) == [champ for champ in ProcessedProcedureCollective.__dataclass_fields__]
+    assert resultat.donnees["date_parution"].iloc[0] == pd.Timestamp("2024-01-20")
+    assert resultat.donnees["siren"].isnull().all()
+
+def test_valider_siren_luhn_key():
+    df = pd.DataFrame({"id": ["A1", "A2", "A3", "A4"], "SIREN": ["552100554", "552100555", "55210055", "5521OO554"]})
+    resultat = valider(df, UnProcessedProcedureCollective)
+    erreurs = resultat.erreurs[resultat.erreurs["champ"] == "SIREN"]
+    assert set(erreurs[["ligne", "champ", "valeur", "motif"]].itertuples(index=False, name=None)) == {(1, "SIREN", "552100555", "cle"), (2, "SIREN", "55210055", "cle"), (3, "SIREN", "5521OO554", "format")}
+    assert resultat.donnees["SIREN"].tolist() == ["552100554", None, None, None]
+
+def test_validateur_is_compiled_once():
+    assert validateur(UnProcessedProcedureCollective) is validateur(UnProcessedProcedureCollective)
+    assert isinstance(validateur(UnProcessedProcedureCollective), ValidateurSchema)
+
+def test_valider_booleen():
+    assert type_du_champ("siren_invalide", bool) == "booleen"
+    df = pd.DataFrame({"id": ["A1", "A2", "A3"], "siren_invalide": [True, None, "oui"]})
+    resultat = valider(df, ProcessedProcedureCollective)
+    assert set(resultat.erreurs[["ligne", "champ", "motif"]].itertuples(index=False, name=None)) == {(2, "siren_invalide", "type")}
+    assert resultat.donnees["siren_invalide"].tolist() == [True, None, None]
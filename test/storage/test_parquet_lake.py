@@ -0,0 +1,104 @@
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+from toolbox.data_processing import clean_and_extract_ps
+from toolbox.schemas import ProcessedProcedureCollective
+from toolbox.storage import BodaccParquetLake, colonnes_de_partition, schema_arrow, vers_table_arrow
+
+@pytest.fixture
+def raw_dataframe():
+    rows = []
+    for i in range(24):
+        jugement = {"type": "initial", "famille": "Jugement", "nature": "Jugement d'ouverture de liquidation judiciaire",
+                    "date": f"2023-{i % 12 + 1:02d}-10"}
+        rows.append({
+            "id": f"A{i}", "dateparution": f"2024-{i % 3 + 1:02d}-15", "numerodepartement": "76" if i % 2 else "27",
+            "commercant": f"SOCIETE {i}", "jugement": json.dumps(jugement), "numeroannonce": i,
+            "registre": [f"{i:09d}", f"{i:09d}"], "familleavis": "collective",
+        })
+    return pd.DataFrame(rows)
+
+@pytest.fixture
+def lake(tmp_path):
+    return BodaccParquetLake(str(tmp_path / "lake"))
+
+def test_schema_arrow():
+    schema = schema_arrow(ProcessedProcedureCollective)
+    assert schema.field("date_parution").type == pa.timestamp("ns")
+    assert schema.field("siren").type == pa.string()
+    assert schema.field("arret_cour_appel").type == pa.timestamp("ns")
+    assert schema.field("siren_invalide").type == pa.bool_()
+
+def test_vers_table_arrow_types_empty_and_numeric_columns():
+    df = pd.DataFrame({"id": [1, 2], "date_parution": ["2024-01-15", None], "arret_cour_appel": [float("nan")] * 2, "autre": [1, 2]})
+    table = vers_table_arrow(df, ProcessedProcedureCollective)
+    assert table.schema.field("id").type == pa.string()
+    assert table.column("id").to_pylist() == ["1", "2"]
+    assert table.schema.field("arret_cour_appel").type == pa.timestamp("ns")
+    assert table.schema.field("autre").type == pa.int64()
+
+def test_unparsed_dates_are_kept_raw_and_rejected_processed(lake, raw_dataframe):
+    raw_dataframe.loc[0, "dateparution"] = "15 janvier 2024"
+    lake.write_raw(raw_dataframe)
+    assert "15 janvier 2024" in lake.read_raw(columns=["dateparution"])["dateparution"].tolist()
+    assert schema_arrow(ProcessedProcedureCollective, dates_en_texte=True).field("date_parution").type == pa.string()
+
+    with pytest.raises(ValueError, match="15 janvier 2024"):
+        vers_table_arrow(pd.DataFrame({"id": ["1"], "date_parution": ["15 janvier 2024"]}), ProcessedProcedureCollective)
+
+def test_colonnes_de_partition(raw_dataframe):
+    partitions = colonnes_de_partition(raw_dataframe)
+    assert partitions.loc[0].tolist() == ["collective", 2024, 1, "27"]
+    sans_famille = colonnes_de_partition(raw_dataframe.drop(columns=["familleavis"]), familleavis="collective")
+    assert (sans_famille["famille_avis"] == "collective").all()
+
+def test_write_and_read_raw(lake, raw_dataframe):
+    assert lake.write_raw(raw_dataframe) == 24
+    dossiers = os.listdir(os.path.join(lake.root, "raw", "famille_avis=collective", "annee=2024"))
+    assert sorted(dossiers) == ["mois=1", "mois=2", "mois=3"]
+
+    relu = lake.read_raw().sort_values("numeroannonce", key=lambda s: s.astype(int)).reset_index(drop=True)
+    assert list(relu.columns) == list(raw_dataframe.columns)
+    assert relu["id"].tolist() == raw_dataframe["id"].tolist()
+    assert relu["dateparution"].tolist() == raw_dataframe["dateparution"].tolist()
+    assert list(relu.loc[0, "registre"]) == raw_dataframe.loc[0, "registre"]
+
+def test_read_prunes_columns_and_partitions(lake, raw_dataframe):
+    lake.write_raw(raw_dataframe)
+    relu = lake.read_raw(columns=["id", "mois"], mois=[2, 3], departements="76")
+    assert list(relu.columns) == ["id", "mois"]
+    attendu = raw_dataframe[(raw_dataframe.index % 3 != 0) & (raw_dataframe["numerodepartement"] == "76")]
+    assert sorted(relu["id"]) == sorted(attendu["id"])
+    assert set(relu["mois"]) == {2, 3}
+
+    filtre = ds.field("commercant") == "SOCIETE 5"
+    assert lake.read_raw(columns=["id"], filtre=filtre)["id"].tolist() == ["A5"]
+
+def test_processed_round_trip(lake, raw_dataframe):
+    processed = clean_and_extract_ps(raw_dataframe)
+    lake.write_processed(processed)
+    relu = lake.read_processed().set_index("id").loc[processed["id"]].reset_index()
+    assert list(relu.columns) == list(processed.columns)
+    pd.testing.assert_series_equal(relu["siren"], processed["siren"].reset_index(drop=True))
+    pd.testing.assert_series_equal(relu["date_parution"], processed["date_parution"].reset_index(drop=True))
+    pd.testing.assert_series_equal(relu["siren_invalide"], processed["siren_invalide"].reset_index(drop=True))
+
+def test_pipeline_on_raw_read_back(lake, raw_dataframe):
+    lake.write_raw(raw_dataframe)
+    relu = lake.read_raw()
+    attendu = clean_and_extract_ps(raw_dataframe).set_index("id").sort_index()
+    resultat = clean_and_extract_ps(relu).set_index("id").sort_index()
+    assert resultat["siren"].tolist() == attendu["siren"].tolist()
+
+def test_append_and_replace(lake, raw_dataframe):
+    lake.write_raw(raw_dataframe)
+    lake.write_raw(raw_dataframe)
+    assert len(lake.read_raw(columns=["id"])) == 48
+    lake.write_raw(raw_dataframe, replace=True)
+    assert len(lake.read_raw(columns=["id"])) == 24
+
+def test_read_empty_lake(lake):
+    assert lake.read_processed().empty
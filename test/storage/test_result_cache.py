@@ -0,0 +1,99 @@
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import pytest
+from toolbox.data_processing import clean_and_extract_ps
+from toolbox.data_processing.bodacc_utils import PIPELINE_VERSION
+from toolbox.storage import ResultCache, empreinte_dataframe
+
+@pytest.fixture
+def raw_dataframe():
+    rows = []
+    for i in range(30):
+        jugement = {"type": "initial", "famille": "Jugement", "nature": "Jugement d'ouverture de liquidation judiciaire",
+                    "date": f"2023-{i % 12 + 1:02d}-10"}
+        rows.append({
+            "id": f"A{i % 20}", "dateparution": "2024-01-15", "numerodepartement": "76", "commercant": f"SOCIETE {i}",
+            "jugement": json.dumps(jugement), "numeroannonce": i, "registre": [f"{i:09d}", f"{i:09d}"] if i % 5 else None,
+        })
+    return pd.DataFrame(rows)
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "cache"))
+
+def test_empreinte_dataframe(raw_dataframe):
+    assert empreinte_dataframe(raw_dataframe) == empreinte_dataframe(raw_dataframe.copy())
+    modifie = raw_dataframe.copy()
+    modifie.loc[3, "commercant"] = "AUTRE"
+    assert empreinte_dataframe(modifie) != empreinte_dataframe(raw_dataframe)
+    assert empreinte_dataframe(raw_dataframe.iloc[::-1]) != empreinte_dataframe(raw_dataframe)
+    assert empreinte_dataframe(raw_dataframe.astype({"numeroannonce": "int32"})) != empreinte_dataframe(raw_dataframe)
+
+@pytest.mark.parametrize("gauche, droite", [
+    ([None, None], ["None", "None"]),
+    ([float("nan")], ["nan"]),
+    ([None, "a"], ["None", "a"]),
+    ([pd.NA, "a"], ["<NA>", "a"]),
+    (["a\x1fb", "c"], ["a", "b\x1fc"]),
+    (["ab", "c"], ["a", "bc"]),
+    ([1, "a"], ["1", "a"]),
+])
+def test_empreinte_distinguishes_values(gauche, droite):
+    assert empreinte_dataframe(pd.DataFrame({"x": gauche}, dtype=object)) != empreinte_dataframe(pd.DataFrame({"x": droite}, dtype=object))
+
+def test_empreinte_distinguishes_column_names():
+    assert empreinte_dataframe(pd.DataFrame({1: ["a"]})) != empreinte_dataframe(pd.DataFrame({"1": ["a"]}))
+
+def test_clean_and_extract_ps_cache_no_collision(raw_dataframe, cache):
+    nul = raw_dataframe.copy()
+    nul["commercant"] = None
+    texte = raw_dataframe.copy()
+    texte["commercant"] = "None"
+    clean_and_extract_ps(nul, cache=cache)
+    pd.testing.assert_frame_equal(clean_and_extract_ps(texte, cache=cache), clean_and_extract_ps(texte))
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+def test_clean_and_extract_ps_cache(raw_dataframe, cache, monkeypatch):
+    attendu = clean_and_extract_ps(raw_dataframe)
+    resultat = clean_and_extract_ps(raw_dataframe, cache=cache)
+    pd.testing.assert_frame_equal(resultat, attendu)
+    assert len(os.listdir(cache.cache_dir)) == 1
+
+    # un second appel relit le cache sans recalculer
+    monkeypatch.setattr(ResultCache, "put", lambda *args: pytest.fail("résultat recalculé"))
+    pd.testing.assert_frame_equal(clean_and_extract_ps(raw_dataframe, cache=cache.cache_dir), attendu)
+
+def test_cache_keys_depend_on_parameters_and_version(raw_dataframe, cache):
+    cle = cache.key(raw_dataframe, clean_and_extract_ps, PIPELINE_VERSION, cle="id", engine="pandas", compact=False)
+    assert cle != cache.key(raw_dataframe, clean_and_extract_ps, PIPELINE_VERSION, cle="SIREN", engine="pandas", compact=False)
+    assert cle != cache.key(raw_dataframe, clean_and_extract_ps, PIPELINE_VERSION + 1, cle="id", engine="pandas", compact=False)
+
+def test_compact_types_round_trip(raw_dataframe, cache):
+    attendu = clean_and_extract_ps(raw_dataframe, compact=True)
+    clean_and_extract_ps(raw_dataframe, compact=True, cache=cache)
+    pd.testing.assert_frame_equal(clean_and_extract_ps(raw_dataframe, compact=True, cache=cache), attendu)
+
+def test_get_table_is_memory_mapped(raw_dataframe, cache):
+    cache.put("cle", raw_dataframe.drop(columns=["registre"]))
+    alloues = pa.total_allocated_bytes()
+    table = cache.get_table("cle")
+    assert table.num_rows == len(raw_dataframe)
+    # les colonnes pointent dans le fichier projeté : aucune mémoire allouée par Arrow pour les lire
+    assert pa.total_allocated_bytes() == alloues
+    assert table.column("numeroannonce").to_pylist() == raw_dataframe["numeroannonce"].tolist()
+    assert cache.get("absente") is None
+
+def test_eviction_least_recently_used(raw_dataframe, tmp_path):
+    cache = ResultCache(str(tmp_path / "petit"), max_bytes=1)
+    cache.put("a", raw_dataframe)
+    taille = cache.size()
+    cache.max_bytes = 2 * taille
+    cache.put("b", raw_dataframe)
+    os.utime(cache._path("b"), (0, 0))
+    cache.get("a")
+    cache.put("c", raw_dataframe)
+    assert sorted(os.listdir(cache.cache_dir)) == ["a.arrow", "c.arrow"]
+    cache.clear()
+    assert cache.size() == 0
@@ -1,3 +1,4 @@
 from .bodacc_api_client import BodaccAPIClient
 from .siren_api_client import SirenAPIClient
 from .api_client import APIClient
+from .extraction_job import BodaccExtractionJob
\ No newline at end of file
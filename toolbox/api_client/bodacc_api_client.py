@@ -15,6 +15,9 @@ from ..schemas.bodacc_schemas import (
 )
 
 
+# fenêtre de pagination de l'API : offset + limit ne peut pas dépasser cette valeur
+LIMITE_PAGINATION_API = 10_000
+
 
 
 
@@ -40,7 +43,7 @@ class BodaccAPIClient(APIClient):
         # self.fetch_and_clean_api_data = self.fetch_and_reduce_ps_data
 
 
-    def fetch_chunck(self, query_list,  offset, limit, headers=None):
+    def fetch_chunck(self, query_list,  offset, limit, headers=None, raise_on_error=False):
         try:
             full_query = query_list + [('limit', str(limit)), ('offset', str(offset))]
             full_url = f"{self.base_url}?{urlencode(full_query, doseq=True)}"
@@ -57,11 +60,31 @@ class BodaccAPIClient(APIClient):
         except Exception as e:
             if self.logger:
                 self.logger.error(f"❌ Erreur offset {offset} : {e}")
+            if raise_on_error:
+                raise
             return []
 
-    def fetch_all_data_from_api(self,  query_list=None, headers=None, max_workers=5):
+    def count_results(self, query_list=None, headers=None) -> int:
+        """
+        Retourne le nombre de résultats d'une requête (total_count), sans télécharger de résultats.
+        """
+        full_query = (query_list or []) + [('limit', '0')]
+        full_url = f"{self.base_url}?{urlencode(full_query, doseq=True)}"
+        if headers:
+            self.session.headers.update(headers)
+        response = requests.get(full_url, headers=self.session.headers)
+        response.raise_for_status()
+        return response.json().get("total_count", 0)
+
+    def fetch_all_data_from_api(self,  query_list=None, headers=None, max_workers=5, raise_on_error=False):
         """
         Récupère toutes les données depuis une API paginée (100 max par requête) en parallèle.
+        Seuls les LIMITE_PAGINATION_API premiers résultats d'une requête sont accessibles : au-delà,
+        la requête doit être découpée (voir BodaccExtractionJob).
+
+        :param raise_on_error: Si True, une page en échec lève une exception au lieu d'être ignorée,
+            et le nombre de résultats doit correspondre au total annoncé par l'API (une requête dont le
+            total dépasse la fenêtre de pagination échoue avant le téléchargement des pages suivantes).
         """
         query_list = query_list or []
         limit = 100
@@ -82,8 +105,15 @@ class BodaccAPIClient(APIClient):
         if self.logger:
             self.logger.info(f"Total de résultats à récupérer : {total_count}")
 
-        # Étape 2 : Générer tous les offsets nécessaires
-        offsets = list(range(limit, total_count, limit))  # on a déjà fait l'offset 0
+        if total_count > LIMITE_PAGINATION_API:
+            message = f"{total_count} résultats annoncés : seuls les {LIMITE_PAGINATION_API} premiers sont accessibles par pagination."
+            if raise_on_error:
+                raise RuntimeError(message)
+            if self.logger:
+                self.logger.warning(message)
+
+        # Étape 2 : Générer tous les offsets nécessaires, dans la fenêtre de pagination
+        offsets = list(range(limit, min(total_count, LIMITE_PAGINATION_API), limit))  # on a déjà fait l'offset 0
         if self.logger:
             self.logger.info(f"Offsets à traiter : {offsets}")
         all_results = first_results.copy()
@@ -91,13 +121,16 @@ class BodaccAPIClient(APIClient):
         # Étape 3 : Télécharger les pages suivantes en parallèle
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = [
-                executor.submit(self.fetch_chunck, query_list, offset, limit, headers)
+                executor.submit(self.fetch_chunck, query_list, offset, limit, headers, raise_on_error)
                 for offset in offsets
             ]
             for future in as_completed(futures):
                 results = future.result()
                 all_results.extend(results)
 
+        if raise_on_error and len(all_results) != total_count:
+            raise RuntimeError(f"Résultats incomplets : {len(all_results)} reçus sur {total_count} annoncés.")
+
         return all_results
 
     # ChangeLog: 2024-01-15
@@ -0,0 +1,221 @@
+import os
+import json
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+from .bodacc_api_client import LIMITE_PAGINATION_API, BodaccAPIClient
+
+
+MANIFEST_FILE = "manifest.json"
+PARTITIONS_DIR = "partitions"
+
+
+class BodaccExtractionJob:
+    """
+    Extraction BODACC reprenable, découpée en partitions (fenêtre de dates × département × famille d'avis).
+
+    Chaque partition terminée est écrite sur disque dès sa fin de téléchargement et enregistrée
+    dans un manifeste. En cas d'interruption, un nouvel appel à `run` ne télécharge que les
+    partitions absentes du manifeste.
+
+    Une partition dont le nombre d'annonces dépasse la fenêtre de pagination de l'API
+    (LIMITE_PAGINATION_API) est téléchargée par fenêtres de dates plus étroites, divisées par deux
+    jusqu'à passer sous la limite ; elle reste une seule partition dans le manifeste.
+    """
+
+    def __init__(self, client: BodaccAPIClient, job_dir: str, start_date, end_date=None,
+                 familleavis_libs: Optional[List[str]] = None, departements: Optional[List[str]] = None,
+                 window_days: int = 30, logger: Optional[Any] = None):
+        """
+        Initialise le job d'extraction.
+
+        :param client: Client BODACC utilisé pour les appels à l'API.
+        :param job_dir: Dossier local où sont stockés le manifeste et les partitions.
+        :param start_date: Date de début au format 'YYYY-MM-DD'.
+        :param end_date: Date de fin au format 'YYYY-MM-DD'. Par défaut, aujourd'hui.
+        :param familleavis_libs: Libellés des familles d'avis à extraire.
+        :param departements: Codes de départements à extraire. Par défaut, extraction nationale.
+        :param window_days: Taille (en jours) des fenêtres de dates.
+        :param logger: Logger pour les messages d'information et d'erreur.
+        """
+        assert window_days > 0, "La taille de fenêtre doit être strictement positive."
+        if isinstance(start_date, datetime):
+            start_date = start_date.strftime("%Y-%m-%d")
+        if end_date is None:
+            end_date = datetime.now().strftime("%Y-%m-%d")
+        if isinstance(end_date, datetime):
+            end_date = end_date.strftime("%Y-%m-%d")
+
+        self.client = client
+        self.job_dir = job_dir
+        self.start_date = start_date
+        self.end_date = end_date
+        self.familleavis_libs = familleavis_libs or ["Procédures collectives"]
+        self.departements = departements or [None]
+        self.window_days = window_days
+        self.logger = logger if logger is not None else client.logger
+        os.makedirs(os.path.join(job_dir, PARTITIONS_DIR), exist_ok=True)
+
+    def date_windows(self) -> List[tuple]:
+        """
+        Découpe la période [start_date, end_date] en fenêtres contiguës de `window_days` jours.
+
+        :return: Liste de tuples (début, fin) au format 'YYYY-MM-DD', bornes incluses.
+        """
+        start = datetime.strptime(self.start_date, "%Y-%m-%d")
+        end = datetime.strptime(self.end_date, "%Y-%m-%d")
+        windows = []
+        while start <= end:
+            window_end = min(start + timedelta(days=self.window_days - 1), end)
+            windows.append((start.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d")))
+            start = window_end + timedelta(days=1)
+        return windows
+
+    def partitions(self) -> List[Dict[str, Any]]:
+        """
+        Retourne la liste de toutes les partitions du job.
+        """
+        return [
+            {"start_date": start, "end_date": end, "departement": departement, "familleavis_lib": famille}
+            for famille in self.familleavis_libs
+            for departement in self.departements
+            for start, end in self.date_windows()
+        ]
+
+    @staticmethod
+    def partition_key(partition: Dict[str, Any]) -> str:
+        """
+        Génère une clé stable (utilisable comme nom de fichier) pour une partition.
+        """
+        departement = partition["departement"] or "all"
+        famille = partition["familleavis_lib"].replace(" ", "_").replace("/", "-")
+        return f"{partition['start_date']}__{partition['end_date']}__{departement}__{famille}"
+
+    def _build_queries(self, partition: Dict[str, Any]) -> list:
+        queries = [
+            ('refine', f"familleavis_lib:'{partition['familleavis_lib']}'"),
+            ('where', f"dateparution >= date'{partition['start_date']}' and dateparution <= date'{partition['end_date']}'")
+        ]
+        if partition["departement"]:
+            queries.insert(0, ('refine', f"code_departement:{partition['departement']}"))
+        return queries
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.job_dir, MANIFEST_FILE)
+
+    def _partition_path(self, key: str) -> str:
+        return os.path.join(self.job_dir, PARTITIONS_DIR, f"{key}.json")
+
+    @staticmethod
+    def _atomic_write_json(filepath: str, data):
+        # écriture dans un fichier temporaire puis renommage : un crash ne laisse jamais de fichier tronqué
+        tmp_filepath = f"{filepath}.tmp"
+        with open(tmp_filepath, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_filepath, filepath)
+
+    def read_manifest(self) -> Dict[str, Any]:
+        """
+        Lit le manifeste du job. Retourne un manifeste vide s'il n'existe pas encore.
+        """
+        filepath = self._manifest_path()
+        if os.path.exists(filepath):
+            with open(filepath, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"partitions": {}}
+
+    def completed_keys(self) -> set:
+        """
+        Retourne les clés des partitions terminées dont le fichier est présent sur disque.
+        """
+        manifest = self.read_manifest()
+        return {
+            key for key in manifest["partitions"]
+            if os.path.exists(self._partition_path(key))
+        }
+
+    def pending_partitions(self) -> List[Dict[str, Any]]:
+        """
+        Retourne les partitions restant à télécharger.
+        """
+        completed = self.completed_keys()
+        return [p for p in self.partitions() if self.partition_key(p) not in completed]
+
+    def run_partition(self, partition: Dict[str, Any], max_workers: int = 5) -> int:
+        """
+        Télécharge une partition, l'écrit sur disque et l'enregistre dans le manifeste.
+
+        :return: Nombre d'annonces récupérées.
+        """
+        key = self.partition_key(partition)
+        data = self._fetch_window(partition, max_workers)
+        self._atomic_write_json(self._partition_path(key), data)
+
+        manifest = self.read_manifest()
+        manifest["partitions"][key] = {
+            **partition,
+            "count": len(data),
+            "completed_at": datetime.now().isoformat(timespec="seconds")
+        }
+        self._atomic_write_json(self._manifest_path(), manifest)
+        return len(data)
+
+    def _fetch_window(self, partition: Dict[str, Any], max_workers: int) -> list:
+        """
+        Télécharge les annonces d'une fenêtre de dates, coupée en deux tant que son nombre d'annonces
+        dépasse la fenêtre de pagination de l'API. Une journée au-delà de la limite reste en échec.
+        """
+        queries = self._build_queries(partition)
+        start = datetime.strptime(partition["start_date"], "%Y-%m-%d")
+        end = datetime.strptime(partition["end_date"], "%Y-%m-%d")
+        if start < end and self.client.count_results(queries) > LIMITE_PAGINATION_API:
+            middle = start + (end - start) // 2
+            if self.logger:
+                self.logger.info(f"Fenêtre {partition['start_date']} - {partition['end_date']} découpée au {middle:%Y-%m-%d}.")
+            first = {**partition, "end_date": middle.strftime("%Y-%m-%d")}
+            second = {**partition, "start_date": (middle + timedelta(days=1)).strftime("%Y-%m-%d")}
+            return self._fetch_window(first, max_workers) + self._fetch_window(second, max_workers)
+        return self.client.fetch_all_data_from_api(
+            query_list=queries,
+            max_workers=max_workers,
+            raise_on_error=True
+        )
+
+    def run(self, max_workers: int = 5, stop_on_error: bool = False) -> pd.DataFrame:
+        """
+        Exécute (ou reprend) le job : seules les partitions absentes du manifeste sont téléchargées.
+
+        :param max_workers: Nombre de pages téléchargées en parallèle pour une partition.
+        :param stop_on_error: Si True, la première partition en échec interrompt le job.
+        :return: DataFrame contenant les annonces de toutes les partitions terminées.
+        """
+        pending = self.pending_partitions()
+        if self.logger:
+            self.logger.info(f"{len(pending)} partition(s) à traiter sur {len(self.partitions())}.")
+
+        for partition in pending:
+            key = self.partition_key(partition)
+            try:
+                count = self.run_partition(partition, max_workers=max_workers)
+                if self.logger:
+                    self.logger.info(f"✅ Partition {key} : {count} éléments enregistrés.")
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"❌ Partition {key} en échec : {e}")
+                if stop_on_error:
+                    raise
+
+        return self.load_results()
+
+    def load_results(self) -> pd.DataFrame:
+        """
+        Charge les annonces de toutes les partitions terminées du job.
+        """
+        rows = []
+        completed = self.completed_keys()
+        for partition in self.partitions():
+            key = self.partition_key(partition)
+            if key in completed:
+                with open(self._partition_path(key), "r", encoding="utf-8") as f:
+                    rows.extend(json.load(f))
+        return pd.DataFrame(rows)
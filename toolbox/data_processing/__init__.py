@@ -1,3 +1,9 @@
 from .bodacc_utils import *
 from .date_utils import *
-from .str_utils import *
\ No newline at end of file
+from .str_utils import *
+from .chunked import *
+from .parallel import *
+from .engines import *
+from .dtype_utils import *
+from .json_utils import *
+from .vente_cession_utils import *
\ No newline at end of file
@@ -4,10 +4,34 @@ import json
 import pandas as pd
 import numpy as np
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta
+from typing import Optional, List
 from .date_utils import *
 from .str_utils import *
-
+from .str_utils import _appliquer_sur_uniques
+from .str_utils import FonctionParValeur, TAILLE_CACHE_TEXTE
+from .dtype_utils import compacter_types, sans_effet_de_bord
+from .json_utils import ExtracteurJson, _json_loads
+
+
+JUGEMENT_VARIABLES = ["date", "complementJugement", "type", "famille", "nature"]
+
+# catégorie de procédure -> motif recherché (insensible à la casse) dans la nature du jugement.
+# Une même nature peut relever de plusieurs catégories.
+REGLES_NATURE = {
+    "liquidation_judiciaire": r"jugement.*liquidation judiciaire",
+    "arret_cour_appel": r"arr..t.*cour.*appel",
+    "plan_redressement": r"plan de redressement",
+    "fin_redressement": r"fin.*redressement judiciaire",
+    "extension_redressement": r"extension.*redressement judiciaire",
+    "conversion_sauvegarde": r"conversion.*sauvegarde",
+    "resolution_plan_redressement": r"résolution.*plan de redressement",
+    "ouverture_redressement": r"ouverture.*redressement judiciaire",
+    "modification_plan_continuation": r"modifiant.*plan de continuation",
+    "modification_plan_redressement": r"modifiant.*plan de redressement",
+    "ouverture_sauvegarde": r"ouverture.*procédure de sauvegarde",
+    "plan_sauvegarde": r"plan de sauvegarde",
+    "modification_plan_sauvegarde": r"modifiant.*plan de sauvegarde",
+}
 
 
 def create_jugement_variable_extractor(variable_name):
@@ -27,56 +51,191 @@ def create_jugement_variable_extractor(variable_name):
             return None
     return extract_variable
 
+# colonnes de la table des statuts : (colonne, catégorie, champ), 'date' étant la date du
+# dernier jugement de la catégorie et 'date_fin' la date de fin prévue du plan
+COLONNES_STATUT = [
+    ("date_plan_continuation", "modification_plan_continuation", "date"),
+    ("date_plan_redressement", "plan_redressement", "date"),
+    ("date_fin_plan_redressement", "plan_redressement", "date_fin"),
+    ("date_prevue_fin_redressement", "plan_redressement", "date_fin"),
+    ("date_fin_plan_sauvegarde", "plan_sauvegarde", "date_fin"),
+    ("date_prevue_fin_sauvegarde", "plan_sauvegarde", "date_fin"),
+    ("date_plan_sauvegarde", "plan_sauvegarde", "date"),
+    ("date_ouverture_une_procedure_sauvegarde", "ouverture_sauvegarde", "date"),
+    ("date_modification_plan_redressement", "modification_plan_redressement", "date"),
+    ("date_ouverture_liquidation_judiciaire", "liquidation_judiciaire", "date"),
+    ("date_mettant_fin_procedure_redressement_judiciaire", "fin_redressement", "date"),
+    ("date_conversion_en_redressement_judiciaire_procedure", "conversion_sauvegarde", "date"),
+    ("date_extension_procedure_redressement_judiciaire", "extension_redressement", "date"),
+    ("date_prononcant_resolution_plan_redressement", "resolution_plan_redressement", "date"),
+    ("date_ouverture_procedure_redressement", "ouverture_redressement", "date"),
+    ("date_modification_plan_sauvegarde", "modification_plan_sauvegarde", "date"),
+    ("arret_cour_appel", "arret_cour_appel", "date"),
+]
+
+# premier identifiant entre quotes de la représentation texte du registre : "['552 100 554', '552100554']"
+REGISTRE_SIREN_PATTERN = re.compile(r"'([^']+)'")
+
+# catégorie de plan -> (motifs de durée, motif d'exclusion du complément de jugement)
+PLANS = {
+    "plan_redressement": (MOTIFS_DUREE_REDRESSEMENT, None),
+    "plan_sauvegarde": (MOTIFS_DUREE_SAUVEGARDE, r"fin du plan|accélérée"),
+}
+
+def _parse_jugement(value):
+    """
+    Décode un jugement. Les dictionnaires (données issues directement de l'API) sont retournés tels quels.
+    Retourne None si la valeur n'est pas un objet JSON valide.
+    """
+    if isinstance(value, dict):
+        return value
+    try:
+        jugement = _json_loads(value)
+    except (ValueError, TypeError):
+        return None
+    return jugement if isinstance(jugement, dict) else None
+
+def repair_jugement_json(jugements: pd.Series) -> pd.Series:
+    """
+    Répare les jugements issus d'exports CSV (guillemets doublés, accolades parasites).
+
+    Args:
+        jugements (pd.Series): La série contenant les jugements à réparer.
+    Returns:
+        pd.Series: La série des jugements réparés, sous forme de chaînes.
+    """
+    return (
+        jugements
+        .astype(str)
+        .str.replace(r'"{4}', '"', regex=True)       # remplace """" par "
+        .str.replace(r'""', '"', regex=True)         # remplace "" par "
+        .str.replace(r'""""', "'", regex=True)       # remplace """" par '
+        .str.replace(r"\}'", "", regex=True)         # supprime }'
+        .str.replace(r'\\"\\\"', '"', regex=True)    # remplace \"\" par "
+    )
+
+def _decode_jugements(jugements: pd.Series):
+    """
+    Décode une série de jugements selon leur forme : dictionnaire ou JSON valide (API),
+    sinon chaîne d'export CSV à réparer. Seules les valeurs non décodables passent par la réparation.
+
+    Returns:
+        tuple: La liste des jugements décodés, les positions des valeurs réparées et leurs valeurs réparées.
+    """
+    values = jugements.tolist()
+    parsed = [_parse_jugement(value) for value in values]
+
+    legacy = [i for i, (value, jugement) in enumerate(zip(values, parsed)) if jugement is None and isinstance(value, str)]
+    if not legacy:
+        return parsed, legacy, []
+
+    repaired = repair_jugement_json(jugements.iloc[legacy]).tolist()
+    for i, value in zip(legacy, repaired):
+        parsed[i] = _parse_jugement(value)
+    return parsed, legacy, repaired
+
+def _jugement_fields_frame(parsed, index, variables) -> pd.DataFrame:
+    columns = {variable: [] for variable in variables}
+    appenders = [(variable, columns[variable].append) for variable in variables]
+
+    for jugement in parsed:
+        if jugement is None:
+            for _, append in appenders:
+                append(None)
+        else:
+            for variable, append in appenders:
+                append(jugement.get(variable))
+
+    return pd.DataFrame(columns, index=index, dtype=object)
+
+def extract_jugement_fields(jugements: pd.Series, variables: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Extrait en une seule passe plusieurs variables du champ 'jugement'.
+    Chaque jugement n'est décodé qu'une fois, quel que soit le nombre de variables demandées.
+    Les dictionnaires et chaînes JSON valides sont utilisés directement, la réparation
+    des exports CSV n'est appliquée qu'aux valeurs qui ne se décodent pas.
+
+    Args:
+        jugements (pd.Series): La série contenant les jugements (dictionnaires ou JSON).
+        variables (list): Les noms des variables à extraire. Par défaut, JUGEMENT_VARIABLES.
+    Returns:
+        pd.DataFrame: Un DataFrame avec une colonne par variable, aligné sur l'index de la série.
+    """
+    parsed, _, _ = _decode_jugements(jugements)
+    return _jugement_fields_frame(parsed, jugements.index, variables or JUGEMENT_VARIABLES)
+
 def corriger_caracteres_speciaux(text, corrections=corrections_caracteres):
     """
     Corrige les caractères spéciaux dans le texte en utilisant un dictionnaire de corrections.
 
+    Avec le dictionnaire par défaut, un texte entièrement ré-décodable (UTF-8 lu en cp1252)
+    est corrigé exactement par ré-encodage ; sinon les corrections sont appliquées en une passe.
+
     Args:
         text (str): Le texte à corriger.
         corrections (dict): Un dictionnaire de corrections où la clé est le mauvais caractère et la valeur est le bon caractère.
     Returns:
         str: Le texte corrigé.
     """
-    if pd.isnull(text):
+    if not isinstance(text, str):
         return text
-    for mauvais, bon in corrections.items():
-        text = text.replace(mauvais, bon)
-    return text
+    if corrections is corrections_caracteres:
+        if not MARQUEURS_MOJIBAKE.search(text):
+            return text
+        try:
+            return text.encode("cp1252").decode("utf-8")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return compiler_corrections(corrections)(text)
+
+# corrections avec la table par défaut, mises en cache entre les appels (natures et familles très répétitives)
+_corriger_caracteres_par_valeur = FonctionParValeur(
+    corriger_caracteres_speciaux, cache_size=TAILLE_CACHE_TEXTE, nom="corriger_caracteres_speciaux"
+)
+
+def corriger_caracteres_speciaux_series(series: pd.Series, corrections=corrections_caracteres) -> pd.Series:
+    """
+    Version vectorisée de corriger_caracteres_speciaux : chaque valeur distincte n'est corrigée qu'une fois.
+
+    Args:
+        series (pd.Series): La série de textes à corriger.
+        corrections (dict): Un dictionnaire de corrections.
+    Returns:
+        pd.Series: La série corrigée.
+    """
+    if corrections is corrections_caracteres:
+        return _corriger_caracteres_par_valeur(series)
+    return _appliquer_sur_uniques(series, lambda text: corriger_caracteres_speciaux(text, corrections))
 
-def extract_jugement_variable(dataframe : pd.DataFrame):
+def extract_jugement_variable(dataframe : pd.DataFrame, extra_variables: Optional[List[str]] = None):
     """
     Extrait une variable spécifique du champ 'jugement' dans le DataFrame.
 
     Args:
         dataframe (pd.DataFrame): Le DataFrame contenant la colonne 'jugement'.
+        extra_variables (list): Variables supplémentaires à extraire du champ 'jugement'.
     Returns:
         pd.DataFrame: Le DataFrame avec les champs 'date', 'complementJugement', 'type', 'famille' et 'nature' extraits du champ 'jugement'.
     """
     assert "jugement" in dataframe.columns, "La colonne 'jugement' n'existe pas dans le DataFrame."
 
-    
-# Supposons que dataframe est un DataFrame existant avec une colonne "jugement"
-    dataframe["jugement"] = (
-        dataframe["jugement"]
-        .astype(str)
-        .str.replace(r'"{4}', '"', regex=True)       # remplace """" par "
-        .str.replace(r'""', '"', regex=True)         # remplace "" par "
-        .str.replace(r'""""', "'", regex=True)       # remplace """" par '
-        .str.replace(r"\}'", "", regex=True)         # supprime }'
-        .str.replace(r'\\"\\\"', '"', regex=True)    # remplace \"\" par "
-    )
 
-    # extraction des variable imbriquées dans le champ jugement
-    dataframe["date"] = dataframe.apply(create_jugement_variable_extractor("date"), axis=1)
-    dataframe["complementJugement"] = dataframe.apply(create_jugement_variable_extractor("complementJugement"), axis=1)
-    dataframe["type"] = dataframe.apply(create_jugement_variable_extractor("type"), axis=1)
-    dataframe["famille"] = dataframe.apply(create_jugement_variable_extractor("famille"), axis=1)
-    dataframe["nature"] = dataframe.apply(create_jugement_variable_extractor("nature"), axis=1)
+    # extraction des variable imbriquées dans le champ jugement (un seul décodage par jugement)
+    variables = JUGEMENT_VARIABLES + [v for v in (extra_variables or []) if v not in JUGEMENT_VARIABLES]
+    parsed, legacy, repaired = _decode_jugements(dataframe["jugement"])
+    if legacy:
+        # seules les lignes d'export CSV sont remplacées par leur version réparée
+        jugements = dataframe["jugement"].to_numpy(dtype=object, copy=True)
+        jugements[legacy] = repaired
+        dataframe["jugement"] = jugements
+    extracted = _jugement_fields_frame(parsed, dataframe.index, variables)
+    for variable in variables:
+        dataframe[variable] = extracted[variable]
 
     
     # nettoyage des variables extraites
-    dataframe.loc[:, "nature"] = dataframe.loc[:, "nature"].apply(corriger_caracteres_speciaux)
-    dataframe.loc[:, "famille"] = dataframe.loc[:, "famille"].apply(corriger_caracteres_speciaux)
+    dataframe["nature"] = corriger_caracteres_speciaux_series(dataframe["nature"])
+    dataframe["famille"] = corriger_caracteres_speciaux_series(dataframe["famille"])
 
     return dataframe
 
@@ -94,6 +253,38 @@ def convert_int_to_str_columns(df):
     return df
 
 
+def _siren_du_registre(registre):
+    # listes de l'API, ou tableaux NumPy des listes relues depuis Parquet/Arrow
+    if isinstance(registre, (list, np.ndarray)):
+        return registre[-1] if len(registre) else None
+    if isinstance(registre, str):
+        match = REGISTRE_SIREN_PATTERN.search(registre)
+        return match[1] if match else None
+    return None
+
+def extract_siren_from_registre(registre: pd.Series) -> pd.Series:
+    """
+    Extrait le SIREN du champ 'registre' (liste issue de l'API ou de Parquet, ou sa représentation texte issue d'un CSV)
+    en une seule passe sur la colonne, puis le normalise avec normaliser_siren.
+
+    Args:
+        registre (pd.Series): La série du champ 'registre'.
+    Returns:
+        pd.Series: La série des SIREN (voir siren_invalides pour signaler les SIREN mal formés).
+    """
+    siren = pd.Series([_siren_du_registre(valeur) for valeur in registre], index=registre.index, dtype=object)
+    return normaliser_siren(siren)
+
+# remplacement des points-virgules (séparateur des exports CSV), une fois par valeur distincte
+_point_virgule_en_espace = FonctionParValeur(
+    lambda texte: texte.replace(";", " ") if isinstance(texte, str) else np.nan,
+    cache_size=TAILLE_CACHE_TEXTE, nom="point_virgule_en_espace",
+)
+_point_virgule_en_virgule = FonctionParValeur(
+    lambda texte: texte.replace(";", ",") if isinstance(texte, str) else np.nan,
+    cache_size=TAILLE_CACHE_TEXTE, nom="point_virgule_en_virgule",
+)
+
 def clean_columns(df):
     """
     Nettoie les colonnes du DataFrame en supprimant les espaces et en remplaçant les caractères spéciaux.
@@ -108,29 +299,13 @@ def clean_columns(df):
     assert "complementJugement" in df.columns, "La colonne 'complementJugement' n'existe pas dans le DataFrame."
     assert "nature" in df.columns, "La colonne 'nature' n'existe pas dans le DataFrame."
     
-    if "SIREN" not in df.columns:
-        df["SIREN"] = df["registre"].apply(lambda x: x[1] if isinstance(x, list) and len(x) > 0 else None)
-
-
-    def extraire_siren(val):
-        if isinstance(val, str):
-            match = re.search(r"'([^']+)'", val)
-            if match:
-                return match[1]
-        elif isinstance(val, list):
-            if len(val) > 0:
-                return val[-1]
-        return None
-
-    df["SIREN"] = df["registre"].apply(extraire_siren)
-    df["SIREN"] = df["SIREN"].str.replace(" ", "", regex=False)  # Suppression des espaces dans le SIREN
-    df["SIREN"] = df["SIREN"].str.zfill(9)  # Remplissage à 9 caractères
-    df.drop(columns=["registre"], inplace=True)
+    df["SIREN"] = extract_siren_from_registre(df["registre"])
+    df = df.drop(columns=["registre"])
 
     # --- Nettoyage ponctuation ---
-    df["commercant"] = df["commercant"].str.replace(";", " ", regex=False)
-    df["complementJugement"] = df["complementJugement"].str.replace(";", " ", regex=False)
-    df["nature"] = df["nature"].str.replace(";", ",", regex=False)
+    df["commercant"] = _point_virgule_en_espace(df["commercant"])
+    df["complementJugement"] = _point_virgule_en_espace(df["complementJugement"])
+    df["nature"] = _point_virgule_en_virgule(df["nature"])
 
     return df
 
@@ -152,6 +327,59 @@ def filter_and_group(df, col, pattern):
     mask = df[col].str.contains(pattern, case=False, regex=True, na=False)
     return df[mask].sort_values(by=["id", "date"], ascending=[True, False]).drop_duplicates("id")
 
+def classify_nature(natures: pd.Series, regles=REGLES_NATURE) -> pd.DataFrame:
+    """
+    Classe chaque ligne dans les catégories de procédure dont le motif correspond à sa nature.
+    Chaque valeur distincte de la nature n'est évaluée qu'une fois.
+
+    Args:
+        natures (pd.Series): La série des natures de jugement.
+        regles (dict): Table catégorie -> motif (insensible à la casse).
+    Returns:
+        pd.DataFrame: Une matrice booléenne lignes × catégories, alignée sur l'index de la série.
+    """
+    motifs = [re.compile(motif, re.IGNORECASE) for motif in regles.values()]
+    codes, uniques = pd.factorize(natures)
+
+    categories_uniques = np.zeros((len(uniques), len(motifs)), dtype=bool)
+    for i, nature in enumerate(uniques):
+        if isinstance(nature, str):
+            categories_uniques[i] = [motif.search(nature) is not None for motif in motifs]
+
+    categories = np.zeros((len(natures), len(motifs)), dtype=bool)
+    presents = codes >= 0
+    categories[presents] = categories_uniques[codes[presents]]
+    return pd.DataFrame(categories, index=natures.index, columns=list(regles))
+
+def classify_and_group(df, col="nature", regles=REGLES_NATURE, columns=None, cle="id"):
+    """
+    Classe les lignes par catégorie de procédure puis conserve, pour chaque catégorie et chaque clé,
+    le jugement le plus récent. Équivaut à un filter_and_group par règle, avec un seul tri.
+
+    Args:
+        df (pd.DataFrame): Le DataFrame à traiter.
+        col (str): Le nom de la colonne à classer.
+        regles (dict): Table catégorie -> motif.
+        columns (list): Colonnes à conserver dans le résultat. Par défaut, toutes.
+        cle (str): La colonne identifiant une procédure ('id' de l'annonce ou 'SIREN').
+    Returns:
+        pd.DataFrame: Une ligne par couple (catégorie, clé), avec la colonne 'categorie'.
+    """
+    assert col in df.columns, f"La colonne '{col}' n'existe pas dans le DataFrame."
+    assert cle in df.columns, f"La colonne '{cle}' n'existe pas dans le DataFrame."
+    assert "date" in df.columns, "La colonne 'date' n'existe pas dans le DataFrame."
+
+    categories = classify_nature(df[col], regles)
+    lignes, colonnes = np.nonzero(categories.to_numpy())
+
+    evenements = df if columns is None else df[columns]
+    evenements = evenements.iloc[lignes].assign(categorie=categories.columns.to_numpy()[colonnes])
+    return (
+        evenements
+        .sort_values(by=["categorie", cle, "date"], ascending=[True, True, False])
+        .drop_duplicates(["categorie", cle])
+    )
+
 def rename_columns(df):
 
     """
@@ -170,155 +398,133 @@ def rename_columns(df):
     })
     return df
 
-def process_judgements_columns(df):
+def compute_plan_end_dates(plans: pd.DataFrame, motifs=MOTIFS_DUREE_REDRESSEMENT, engine="pandas") -> pd.DataFrame:
     """
-    Traite les colonnes de jugement pour extraire les informations pertinentes.
+    Calcule la durée et la date de fin prévue des plans (redressement ou sauvegarde).
 
     Args:
-        df (pd.DataFrame): Le DataFrame à traiter.
+        plans (pd.DataFrame): Les jugements de plan, avec les colonnes 'date' et 'complementJugement'.
+        motifs (tuple): Les motifs (années, mois) de la durée dans le complément de jugement.
+        engine (str): Le moteur d'extraction des durées (voir engines.get_engine).
     Returns:
-        pd.DataFrame: Le DataFrame avec les colonnes de jugement traitées.
+        pd.DataFrame: Le DataFrame avec les colonnes 'duree_annes', 'duree_mois' et 'date_fin'.
+    """
+    assert "date" in plans.columns, "La colonne 'date' n'existe pas dans le DataFrame."
+    assert "complementJugement" in plans.columns, "La colonne 'complementJugement' n'existe pas dans le DataFrame."
+
+    from .engines import get_engine  # import local : engines dépend de ce module
+
+    durees = get_engine(engine).extraire_durees(plans["complementJugement"], motifs)
+    return plans.assign(
+        duree_annes=durees["duree_annes"],
+        duree_mois=durees["duree_mois"],
+        date_fin=ajouter_duree_series(plans["date"], durees["duree_annes"], durees["duree_mois"]),
+    )
+
+def build_status_table(df, cle="id", regles=REGLES_NATURE, engine="pandas") -> pd.DataFrame:
+    """
+    Construit la table des statuts de procédure à partir du flux de jugements :
+    dernière date de chaque catégorie de procédure et dates de fin prévues des plans,
+    avec une seule classification, un seul tri et un seul pivot.
+
+    Les jugements sans clé (SIREN manquant ou vide) sont écartés : regroupés ensemble, ils mêleraient
+    les procédures d'entreprises différentes. Ils n'ont donc pas de ligne dans la table.
+
+    Args:
+        df (pd.DataFrame): Les jugements, avec les colonnes cle, 'date', 'nature' et 'complementJugement'.
+        cle (str): La colonne de regroupement : 'id' (par annonce) ou 'SIREN' (par entreprise).
+        regles (dict): Table catégorie -> motif utilisée pour classer les natures de jugement.
+        engine (str): Le moteur de classification, de regroupement et d'extraction des durées (voir engines.get_engine).
+    Returns:
+        pd.DataFrame: Une ligne par clé, une colonne par statut (voir COLONNES_STATUT).
     """
-    # assert "id" in df.columns, "La colonne 'id' n'existe pas dans le DataFrame."
     assert "date" in df.columns, "La colonne 'date' n'existe pas dans le DataFrame."
     assert "nature" in df.columns, "La colonne 'nature' n'existe pas dans le DataFrame."
     assert "complementJugement" in df.columns, "La colonne 'complementJugement' n'existe pas dans le DataFrame."
 
+    from .engines import get_engine  # import local : engines dépend de ce module
 
-    def ajouter_duree(row):
-        """
-        Ajoute la durée de redressement ou de sauvegarde à la date de jugement.
+    df = df[df[cle].notnull() & (df[cle] != "")]
+    evenements = get_engine(engine).classify_and_group(df, "nature", regles, columns=[cle, "date", "complementJugement"], cle=cle)
+    return status_from_events(evenements, cle, engine)
 
-        Args:
-            row (pd.Series): Une ligne du DataFrame contenant les colonnes 'date', 'duree_annes' et 'duree_mois'.
-        Returns:
-            datetime: La date de fin de la procédure.
-        """
-        assert "date" in row, "La colonne 'date' n'existe pas dans la ligne."
-        assert "duree_annes" in row, "La colonne 'duree_annes' n'existe pas dans la ligne."
-        assert "duree_mois" in row, "La colonne 'duree_mois' n'existe pas dans la ligne."
-        base_date = bi_date(row["date"])
-        try:
-            return base_date + relativedelta(
-                years=int(row["duree_annes"] or 0),
-                months=int(row["duree_mois"] or 0)
-            )
-        except Exception:
-            return pd.NaT 
-
-    lj = filter_and_group(df, "nature", r"jugement.*liquidation judiciaire")
-    ljc = filter_and_group(df, "nature", r"arr..t.*cour.*appel")
-    pr = filter_and_group(df, "nature", r"plan de redressement")
-    fpr = filter_and_group(df, "nature", r"fin.*redressement judiciaire")
-    xpr = filter_and_group(df, "nature", r"extension.*redressement judiciaire")
-    xr_to_sauv = filter_and_group(df, "nature", r"conversion.*sauvegarde")
-    pro_pr = filter_and_group(df, "nature", r"résolution.*plan de redressement")
-    ouv_pr = filter_and_group(df, "nature", r"ouverture.*redressement judiciaire")
-    pc = filter_and_group(df, "nature", r"modifiant.*plan de continuation")
-    mod_p = filter_and_group(df, "nature", r"modifiant.*plan de redressement")
-    ouv_ps = filter_and_group(df, "nature", r"ouverture.*procédure de sauvegarde")
-    ps = filter_and_group(df, "nature", r"plan de sauvegarde")
-    mod_ps = filter_and_group(df, "nature", r"modifiant.*plan de sauvegarde")
-
-
-
-    # --- Extraction durée de redressement ---
-    if not pr.empty:
-        pr["complementJugement"] = pr["complementJugement"].apply(ajouter_espace)
-
-        # Extraction des années
-        cm = []
-        for texte in pr["complementJugement"]:
-            extrait = re.search(r"(.{2,10})\s(?:ans|annees|annee|années|année|an|nomme)", str(texte))
-            brut = extrait[1] if extrait else ""
-            cm.append(remplacer_nombres_francais(brut))
-
-        annes = []
-        for txt in cm:
-            extrait = re.search(r"(\d+)", str(txt))
-            annes.append(int(extrait[1]) if extrait else 0)
-
-        pr["duree_annes"] = annes
-
-        # Extraction des mois
-        cm = []
-        for texte in pr["complementJugement"]:
-            extrait = re.search(r"(.{2,10})\smois", str(texte))
-            brut = extrait[1] if extrait else ""
-            cm.append(remplacer_nombres_francais(brut))
-
-        mois = []
-        for txt in cm:
-            extrait = re.search(r"(\d+)", str(txt))
-            mois.append(int(extrait.group(1)) if extrait else 0)
-
-        pr["duree_mois"] = mois
-
-
-        pr["date_fin"] = pr.apply(ajouter_duree, axis=1)
-
-
-
-    # --- Extraction durée de sauvegarde ---
-    if not ps.empty:
-        ps["complementJugement"] = ps["complementJugement"].apply(ajouter_espace)
-        ps = ps[~ps["complementJugement"].str.contains("fin du plan|accélérée", case=False, na=False)]
-
-        cm = []
-        for texte in ps["complementJugement"]:
-            extrait = re.search(r"(.{3,10})\s(?:an|nommant)", str(texte))
-            brut = extrait.group(1) if extrait else ""
-            cm.append(remplacer_nombres_francais(brut))
-
-        annes = []
-        for txt in cm:
-            extrait = re.search(r"(\d+)", str(txt))
-            annes.append(int(extrait.group(1)) if extrait else 0)
-
-        ps["duree_annes"] = annes
-
-        # Mois
-        cm = []
-        for texte in ps["complementJugement"]:
-            extrait = re.search(r"(.{4,10})\smois", str(texte))
-            brut = extrait.group(1) if extrait else ""
-            cm.append(remplacer_nombres_francais(brut))
-
-        mois = []
-        for txt in cm:
-            extrait = re.search(r"(\d+)", str(txt))
-            mois.append(int(extrait.group(1)) if extrait else 0)
-
-        ps["duree_mois"] = mois
-
-        # Calcul de la date de fin
-        ps["date_fin"] = ps.apply(ajouter_duree, axis=1)
-
-        # fusion des données de sauvegarde et de redressement
-
-
-    status = df.copy()
-    # 2. Fusion des dates selon chaque procédure
-    status["date_plan_continuation"] = status["id"].map(pc.set_index("id")["date"])
-    status["date_plan_redressement"] = status["id"].map(pr.set_index("id")["date"])
-    if not pr.empty:
-        status["date_fin_plan_redressement"] = status["id"].map(pr.set_index("id")["date_fin"])
-        status["date_prevue_fin_redressement"] = status["id"].map(pr.set_index("id")["date_fin"])
-    if not ps.empty:
-        status["date_fin_plan_sauvegarde"] = status["id"].map(ps.set_index("id")["date_fin"])
-        status["date_prevue_fin_sauvegarde"] = status["id"].map(ps.set_index("id")["date_fin"])
-   
-    status["date_plan_sauvegarde"] = status["id"].map(ps.set_index("id")["date"])
-    status["date_ouverture_une_procedure_sauvegarde"] = status["id"].map(ouv_ps.set_index("id")["date"])
-    status["date_modification_plan_redressement"] = status["id"].map(mod_p.set_index("id")["date"])
-    status["date_ouverture_liquidation_judiciaire"] = status["id"].map(lj.set_index("id")["date"])
-    status["date_mettant_fin_procedure_redressement_judiciaire"] = status["id"].map(fpr.set_index("id")["date"])
-    status["date_conversion_en_redressement_judiciaire_procedure"] = status["id"].map(xr_to_sauv.set_index("id")["date"])
-    status["date_extension_procedure_redressement_judiciaire"] = status["id"].map(xpr.set_index("id")["date"])
-    status["date_prononcant_resolution_plan_redressement"] = status["id"].map(pro_pr.set_index("id")["date"])
-    status["date_ouverture_procedure_redressement"] = status["id"].map(ouv_pr.set_index("id")["date"])
-    status["date_modification_plan_sauvegarde"] = status["id"].map(mod_ps.set_index("id")["date"])
-    status["arret_cour_appel"] = status["id"].map(ljc.set_index("id")["date"])
+def status_from_events(evenements: pd.DataFrame, cle="id", engine="pandas") -> pd.DataFrame:
+    """
+    Construit la table des statuts à partir des événements de classify_and_group :
+    dates de fin prévues des plans, puis pivot en une colonne par statut.
+
+    Args:
+        evenements (pd.DataFrame): Une ligne par couple (catégorie, clé), avec les colonnes cle, 'date',
+            'complementJugement' et 'categorie'.
+        cle (str): La colonne de regroupement.
+        engine (str): Le moteur d'extraction des durées des plans.
+    Returns:
+        pd.DataFrame: Une ligne par clé, une colonne par statut (voir COLONNES_STATUT).
+    """
+    # --- Durée et date de fin prévue des plans de redressement et de sauvegarde ---
+    # (l'index des événements n'est pas unique : une ligne peut relever de plusieurs catégories)
+    evenements = evenements.reset_index(drop=True)
+    for categorie, (motifs, exclusion) in PLANS.items():
+        if exclusion:
+            plans = evenements["categorie"] == categorie
+            exclus = evenements.loc[plans, "complementJugement"].str.contains(exclusion, case=False, na=False)
+            evenements = evenements.drop(index=exclus.index[exclus.to_numpy(dtype=bool)])
+    date_fin = pd.Series(pd.NaT, index=evenements.index, dtype="datetime64[ns]")
+    for categorie, (motifs, _) in PLANS.items():
+        plans = evenements[evenements["categorie"] == categorie]
+        if not plans.empty:
+            date_fin[plans.index] = compute_plan_end_dates(plans, motifs, engine)["date_fin"]
+    evenements = evenements.assign(date_fin=date_fin)
+
+    # --- Pivot : une colonne par (champ, catégorie) ---
+    champs = pd.MultiIndex.from_tuples([(champ, categorie) for _, categorie, champ in COLONNES_STATUT])
+    statuts = (
+        evenements
+        .pivot(index=cle, columns="categorie", values=["date", "date_fin"])
+        .reindex(columns=champs)
+    )
+    statuts.columns = [colonne for colonne, _, _ in COLONNES_STATUT]
+    return statuts
+
+def current_status_by_company(df, regles=REGLES_NATURE, engine="pandas") -> pd.DataFrame:
+    """
+    Vue du statut courant par entreprise : table des statuts regroupée par SIREN,
+    complétée de la catégorie et de la date de la procédure la plus récente.
+
+    Args:
+        df (pd.DataFrame): Les jugements nettoyés, avec la colonne 'SIREN'.
+        regles (dict): Table catégorie -> motif utilisée pour classer les natures de jugement.
+        engine (str): Le moteur de classification et de regroupement.
+    Returns:
+        pd.DataFrame: Une ligne par SIREN.
+    """
+    statuts = build_status_table(df, cle="SIREN", regles=regles, engine=engine)
+    dates = statuts[[colonne for colonne, _, champ in COLONNES_STATUT if champ == "date"]]
+    dates = dates.apply(pd.to_datetime, errors="coerce")
+    categories = {colonne: categorie for colonne, categorie, champ in COLONNES_STATUT if champ == "date"}
+
+    derniere = dates.fillna(pd.Timestamp.min).idxmax(axis=1).map(categories)
+    statuts["date_derniere_procedure"] = dates.max(axis=1)
+    statuts["derniere_procedure"] = derniere.where(statuts["date_derniere_procedure"].notnull())
+    return statuts
+
+@sans_effet_de_bord
+def process_judgements_columns(df, regles=REGLES_NATURE, cle="id", engine="pandas"):
+    """
+    Traite les colonnes de jugement pour extraire les informations pertinentes.
+
+    Args:
+        df (pd.DataFrame): Le DataFrame à traiter.
+        regles (dict): Table catégorie -> motif utilisée pour classer les natures de jugement.
+        cle (str): La colonne de regroupement des statuts : 'id' (par annonce) ou 'SIREN' (par entreprise).
+        engine (str): Le moteur de classification et de regroupement ('pandas', 'polars' ou 'auto').
+    Returns:
+        pd.DataFrame: Le DataFrame avec les colonnes de jugement traitées.
+    """
+    assert cle in df.columns, f"La colonne '{cle}' n'existe pas dans le DataFrame."
+
+    # une seule jointure de la table des statuts, sans copie préalable du DataFrame
+    status = df.join(build_status_table(df, cle, regles, engine=engine), on=cle)
     status = rename_columns(status)
     return status
 
@@ -354,38 +560,162 @@ def rename_columns(df):
     })
     return df
 
+# SIREN de la personne concernée par l'annonce (première personne de la liste)
+EXTRACTEUR_SIREN_PERSONNES = ExtracteurJson(
+    {"SIREN": "personne.numeroImmatriculation.numeroIdentification"}, types={"SIREN": "siren"}
+)
+
 def extract_missing_siren(df):
     """
-    Extrait les lignes sans SIREN et les renomme.
+    Complète les SIREN manquants à partir du champ 'listepersonnes' (numéro d'immatriculation de la personne).
+    Seules les annonces sans SIREN sont décodées.
 
     Args:
         df (pd.DataFrame): Le DataFrame à traiter.
     Returns:
-        pd.DataFrame: Le DataFrame avec les lignes sans SIREN extraites et renommées.
+        pd.DataFrame: Le DataFrame avec la colonne 'SIREN' complétée.
     """
-    assert "listepersonnes" in df.columns, "La colonne 'SIREN' n'existe pas dans le DataFrame."
-    
-    return missing_siren
+    assert "listepersonnes" in df.columns, "La colonne 'listepersonnes' n'existe pas dans le DataFrame."
 
+    siren = df["SIREN"] if "SIREN" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    manquants = (siren.isnull() | (siren == "")).to_numpy()
+    if manquants.any():
+        retrouves = EXTRACTEUR_SIREN_PERSONNES(df["listepersonnes"][manquants])["SIREN"]
+        siren = siren.astype(object).copy()
+        siren[manquants] = retrouves.to_numpy()
+    return df.assign(SIREN=siren)
 
-def clean_and_extract_ps(df: pd.DataFrame) -> pd.DataFrame:
+def siren_des_annonces(df: pd.DataFrame) -> pd.Series:
     """
-    Pipeline de nettoyage des données et extraction des informations sur les procédures de judiciaire.
+    SIREN des annonces brutes tel que le calcule prepare_ps_data : celui du registre, complété
+    par le numéro d'immatriculation de 'listepersonnes' lorsque la colonne existe.
 
     Args:
-        df (pd.DataFrame): Le DataFrame à traiter.
+        df (pd.DataFrame): Les annonces brutes.
     Returns:
-        pd.DataFrame: Le DataFrame nettoyé et enrichi avec les informations sur les procédures judiciaires.
+        pd.Series: Les SIREN normalisés, alignés sur l'index de df.
     """
+    siren = extract_siren_from_registre(df["registre"])
+    if "listepersonnes" in df.columns:
+        siren = extract_missing_siren(pd.DataFrame({"SIREN": siren, "listepersonnes": df["listepersonnes"]}))["SIREN"]
+    return siren
+
+
+@sans_effet_de_bord
+def prepare_ps_data(df: pd.DataFrame, compact: bool = False, engine="pandas") -> pd.DataFrame:
+    """
+    Étapes ligne à ligne du pipeline des procédures collectives : extraction du jugement,
+    nettoyage des colonnes et des dates. Ne calcule pas les statuts.
+
+    Args:
+        df (pd.DataFrame): Les annonces brutes.
+        compact (bool): Si True, les colonnes sont converties en types compacts (voir compacter_types)
+            au lieu de convertir les entiers en chaînes.
+        engine (str): Le moteur des étapes ligne à ligne ('pandas', 'polars' ou 'auto').
+    Returns:
+        pd.DataFrame: Les annonces nettoyées, avec les noms de colonnes internes et la colonne
+            'SIREN_invalide' (voir siren_invalides).
+    """
+    from .engines import get_engine  # import local : engines dépend de ce module
+
+    moteur = get_engine(engine)
     if "siren" in df.columns:
         df = df.rename(columns={"siren": "SIREN"})
-    df = extract_jugement_variable(df)
-    df = clean_columns(df)
-    #df = extract_missing_siren(df) # fonction 
+    df = moteur.extract_jugement_variable(df)
+    df = moteur.clean_columns(df)
+    if "listepersonnes" in df.columns:
+        df = extract_missing_siren(df)
+    # SIREN présents mais mal formés, signalés une fois le SIREN complété
+    df["SIREN_invalide"] = siren_invalides(df["SIREN"])
     # df = remove_no_siren_rows(df)
-    df = clean_dates(df)
+    df = moteur.clean_dates(df)
+    if compact:
+        return compacter_types(df)
     df = convert_int_to_str_columns(df)
-    df = process_judgements_columns(df)
+    return df
+
+def final_column_names(columns) -> dict:
+    """
+    Retourne la correspondance entre les noms de colonnes internes et ceux de la sortie de clean_and_extract_ps.
+    """
+    renamed = rename_columns(pd.DataFrame(columns=list(columns))).columns
+    return {col: clean_chaine(new) for col, new in zip(columns, renamed)}
+
+# version du résultat de clean_and_extract_ps, à incrémenter à chaque modification de ce résultat :
+# elle invalide les résultats mis en cache (voir storage.result_cache)
+PIPELINE_VERSION = 2
+
+@sans_effet_de_bord
+def clean_and_extract_ps(df: pd.DataFrame, cle="id", engine="pandas", compact=False, cache=None) -> pd.DataFrame:
+    """
+    Pipeline de nettoyage des données et extraction des informations sur les procédures de judiciaire.
+    Le DataFrame reçu n'est pas modifié ; les étapes s'exécutent sous copie à l'écriture et partagent
+    leurs données au lieu de les copier (voir dtype_utils.sans_effet_de_bord).
+
+    Args:
+        df (pd.DataFrame): Le DataFrame à traiter.
+        cle (str): La colonne de regroupement des statuts : 'id' (par annonce) ou 'SIREN' (par entreprise).
+        engine (str): Le moteur des étapes ligne à ligne et de regroupement ('pandas', 'polars' ou 'auto').
+        compact (bool): Si True, le résultat utilise des types compacts (catégories, chaînes Arrow, datetime64).
+        cache (ResultCache | str): Un cache de résultats (ou son dossier) : un appel répété sur les mêmes données
+            et avec les mêmes paramètres relit le résultat en cache au lieu de le recalculer.
+    Returns:
+        pd.DataFrame: Le DataFrame nettoyé et enrichi avec les informations sur les procédures judiciaires.
+    """
+    if cache is not None:
+        from ..storage.result_cache import ResultCache
+        if not isinstance(cache, ResultCache):
+            cache = ResultCache(cache)
+        return cache.call(clean_and_extract_ps, df, version=PIPELINE_VERSION, cle=cle, engine=engine, compact=compact)
+
+    df = prepare_ps_data(df, compact=compact, engine=engine)
+    df = process_judgements_columns(df, cle=cle, engine=engine)
     df.columns = df.columns.map(clean_chaine)
 
-    return df
\ No newline at end of file
+    return df
+
+def _comparable(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalise un DataFrame en chaînes pour comparer des lignes issues de sources différentes
+    (dates en objets date, Timestamp ou chaînes, valeurs manquantes None ou NaN).
+    """
+    normalise = {}
+    for col in df.columns:
+        serie = df[col]
+        if "date" in col.lower() or col == "arret_cour_appel":
+            serie = pd.to_datetime(serie, errors="coerce").dt.strftime("%Y-%m-%d")
+        normalise[col] = serie.astype(object).where(serie.notnull(), "").astype(str)
+    return pd.DataFrame(normalise, index=df.index)
+
+def update_ps_status(previous: pd.DataFrame, new_df: pd.DataFrame, cle="id") -> pd.DataFrame:
+    """
+    Recalcule de façon incrémentale les statuts de procédure après l'arrivée de nouvelles annonces.
+    Seules les clés ('id' ou 'SIREN') touchées par les nouvelles annonces sont recalculées.
+
+    Args:
+        previous (pd.DataFrame): La table des statuts précédente (sortie de clean_and_extract_ps).
+        new_df (pd.DataFrame): Les nouvelles annonces brutes. Une annonce dont l'id existe déjà remplace l'ancienne.
+        cle (str): La colonne de regroupement des statuts ('id' ou 'SIREN').
+    Returns:
+        pd.DataFrame: Les lignes nouvelles ou modifiées, au format de clean_and_extract_ps.
+    """
+    nouveaux = prepare_ps_data(new_df)
+    noms = final_column_names(nouveaux.columns)
+    internes = {final: interne for interne, final in noms.items()}
+    assert noms["id"] in previous.columns, "La colonne 'id' n'existe pas dans la table précédente."
+    assert noms[cle] in previous.columns, f"La colonne '{noms[cle]}' n'existe pas dans la table précédente."
+
+    # historique des clés touchées, sans les annonces remplacées par les nouvelles
+    touches = previous[noms[cle]].isin(nouveaux[cle].dropna()) & ~previous[noms["id"]].isin(nouveaux["id"])
+    anciens = previous.loc[touches, [col for col in previous.columns if col in internes]].rename(columns=internes)
+    historique = pd.concat([anciens, nouveaux], ignore_index=True)
+
+    recalcule = process_judgements_columns(historique, cle=cle)
+    recalcule.columns = recalcule.columns.map(clean_chaine)
+
+    # lignes sans équivalent strict dans la table précédente
+    colonnes = [col for col in recalcule.columns if col in previous.columns]
+    cles_precedentes = set(map(tuple, _comparable(previous.loc[previous[noms["id"]].isin(recalcule[noms["id"]]), colonnes]).to_numpy()))
+    modifies = np.array([ligne not in cles_precedentes for ligne in map(tuple, _comparable(recalcule[colonnes]).to_numpy())], dtype=bool)
+    return recalcule[modifies]
+
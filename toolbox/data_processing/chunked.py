@@ -0,0 +1,146 @@
+import os
+import math
+import shutil
+import tempfile
+import pandas as pd
+from typing import Iterable, Iterator, Optional, Union
+from .bodacc_utils import prepare_ps_data, process_judgements_columns
+from .str_utils import clean_chaine
+
+
+# rapport estimé entre la mémoire occupée pendant le traitement et la taille des données lues
+FACTEUR_EXPANSION = 4
+# nombre de partitions utilisé lorsque la taille de la source n'est pas connue à l'avance
+PARTITIONS_PAR_DEFAUT = 16
+
+
+def estimate_chunk_plan(path: str, memory_budget_mb: float = 512, sample_rows: int = 1000, read_csv_kwargs=None) -> dict:
+    """
+    Estime la taille des blocs de lecture et le nombre de partitions d'un fichier CSV
+    pour que le traitement tienne dans le budget mémoire.
+
+    Args:
+        path (str): Le chemin du fichier CSV.
+        memory_budget_mb (float): Le budget mémoire en Mo.
+        sample_rows (int): Le nombre de lignes lues pour estimer la taille d'une ligne.
+        read_csv_kwargs (dict): Arguments supplémentaires pour pd.read_csv.
+    Returns:
+        dict: 'chunksize' (lignes par bloc) et 'n_partitions'.
+    """
+    budget = memory_budget_mb * 1024 ** 2
+    sample = pd.read_csv(path, nrows=sample_rows, **(read_csv_kwargs or {}))
+    octets_par_ligne = max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1)
+
+    # taille en mémoire estimée du fichier complet, au prorata de la taille sur disque de l'échantillon
+    taille_fichier = os.path.getsize(path)
+    taille_echantillon = max(len(sample.to_csv(index=False).encode("utf-8")), 1)
+    taille_memoire = taille_fichier / taille_echantillon * sample.memory_usage(deep=True).sum()
+
+    return {
+        "chunksize": max(int(budget / (octets_par_ligne * FACTEUR_EXPANSION)), 1),
+        "n_partitions": max(math.ceil(taille_memoire * FACTEUR_EXPANSION / budget), 1),
+    }
+
+
+def partition_index(keys: pd.Series, n_partitions: int) -> pd.Series:
+    """
+    Affecte chaque clé à une partition par hachage : une même clé est toujours dans la même partition.
+    """
+    hashes = pd.util.hash_pandas_object(keys.astype(str), index=False)
+    return pd.Series(hashes.to_numpy() % n_partitions, index=keys.index)
+
+
+def iter_chunks(source: Union[str, Iterable[pd.DataFrame]], chunksize: int,
+                read_csv_kwargs: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+    """
+    Itère sur les blocs d'une source : un fichier CSV lu par blocs de chunksize lignes,
+    ou un itérable de DataFrames parcouru tel quel.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with pd.read_csv(source, chunksize=chunksize, **(read_csv_kwargs or {})) as reader:
+            yield from reader
+    else:
+        yield from source
+
+
+def iter_clean_and_extract_ps_chunked(source: Union[str, Iterable[pd.DataFrame]], cle: str = "id",
+                                      memory_budget_mb: float = 512, chunksize: Optional[int] = None,
+                                      n_partitions: Optional[int] = None, spill_dir: Optional[str] = None,
+                                      read_csv_kwargs: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+    """
+    Version hors mémoire de clean_and_extract_ps, pour des sources plus grandes que la RAM.
+
+    Les étapes ligne à ligne (extraction du jugement, nettoyage des colonnes et des dates) sont
+    appliquées bloc par bloc ; les blocs nettoyés sont écrits sur disque, partitionnés par hachage
+    de la clé, puis les statuts sont calculés partition par partition. Toutes les lignes d'une même
+    clé étant dans la même partition, le résultat est identique à celui du traitement en mémoire.
+
+    Pour des résultats strictement identiques sur un CSV, fixer les types des colonnes
+    (read_csv_kwargs={"dtype": ...}) afin qu'ils ne varient pas d'un bloc à l'autre.
+
+    Args:
+        source: Le chemin d'un fichier CSV ou un itérable de DataFrames.
+        cle (str): La colonne de regroupement des statuts ('id' ou 'SIREN').
+        memory_budget_mb (float): Le budget mémoire en Mo, utilisé si chunksize ou n_partitions ne sont pas fournis.
+        chunksize (int): Le nombre de lignes par bloc de lecture.
+        n_partitions (int): Le nombre de partitions écrites sur disque.
+        spill_dir (str): Le dossier des fichiers intermédiaires. Par défaut, un dossier temporaire supprimé à la fin.
+        read_csv_kwargs (dict): Arguments supplémentaires pour pd.read_csv.
+    Yields:
+        pd.DataFrame: Le résultat de clean_and_extract_ps pour chaque partition non vide.
+    """
+    if isinstance(source, (str, os.PathLike)) and (chunksize is None or n_partitions is None):
+        plan = estimate_chunk_plan(source, memory_budget_mb, read_csv_kwargs=read_csv_kwargs)
+        chunksize = chunksize or plan["chunksize"]
+        n_partitions = n_partitions or plan["n_partitions"]
+    n_partitions = n_partitions or PARTITIONS_PAR_DEFAUT
+
+    dossier = spill_dir or tempfile.mkdtemp(prefix="bodacc_spill_")
+    try:
+        # --- Étapes ligne à ligne, bloc par bloc, puis écriture par partition ---
+        for numero, chunk in enumerate(iter_chunks(source, chunksize, read_csv_kwargs)):
+            chunk = prepare_ps_data(chunk)
+            partitions = partition_index(chunk[cle], n_partitions)
+            for partition, rows in chunk.groupby(partitions, sort=False):
+                dossier_partition = os.path.join(dossier, f"part-{partition:05d}")
+                os.makedirs(dossier_partition, exist_ok=True)
+                rows.to_pickle(os.path.join(dossier_partition, f"chunk-{numero:06d}.pkl"))
+
+        # --- Étapes de regroupement, partition par partition ---
+        for partition in range(n_partitions):
+            dossier_partition = os.path.join(dossier, f"part-{partition:05d}")
+            if not os.path.isdir(dossier_partition):
+                continue
+            fichiers = sorted(os.listdir(dossier_partition))
+            df = pd.concat([pd.read_pickle(os.path.join(dossier_partition, f)) for f in fichiers])
+            df = process_judgements_columns(df, cle=cle)
+            df.columns = df.columns.map(clean_chaine)
+            shutil.rmtree(dossier_partition)
+            yield df
+    finally:
+        if spill_dir is None:
+            shutil.rmtree(dossier, ignore_errors=True)
+
+
+def clean_and_extract_ps_chunked(source: Union[str, Iterable[pd.DataFrame]], output_path: Optional[str] = None,
+                                 **kwargs) -> Union[pd.DataFrame, str]:
+    """
+    Exécute iter_clean_and_extract_ps_chunked et rassemble le résultat.
+
+    Args:
+        source: Le chemin d'un fichier CSV ou un itérable de DataFrames.
+        output_path (str): Si fourni, chaque partition est ajoutée à ce fichier CSV au lieu d'être gardée en mémoire.
+        **kwargs: Arguments de iter_clean_and_extract_ps_chunked.
+    Returns:
+        pd.DataFrame | str: Le DataFrame complet, ou le chemin du fichier CSV écrit.
+    """
+    partitions = iter_clean_and_extract_ps_chunked(source, **kwargs)
+    if output_path is None:
+        resultats = list(partitions)
+        return pd.concat(resultats) if resultats else pd.DataFrame()
+
+    premiere = True
+    for df in partitions:
+        df.to_csv(output_path, mode="w" if premiere else "a", header=premiere, index=False)
+        premiere = False
+    return output_path
@@ -1,19 +1,26 @@
 import re
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from typing import Optional, Tuple
 import pytz
+from .str_utils import FonctionParValeur, TAILLE_CACHE_TEXTE
+from .str_utils import ajouter_espace_series
+
+
+MOIS_FR = {
+    'janvier': 1, 'février': 2, 'mars': 3, 'avril': 4, 'mai': 5, 'juin': 6,
+    'juillet': 7, 'août': 8, 'septembre': 9, 'octobre': 10, 'novembre': 11, 'décembre': 12
+}
+# variantes sans accent rencontrées dans les annonces
+MOIS_FR_VARIANTES = {**MOIS_FR, 'fevrier': 2, 'aout': 8, 'decembre': 12}
 
 
 def mois_fr_vers_num(mois):
     """
     Convertit un mois en français vers un numéro (ex: "janvier" -> 1)
     """
-    mois = mois.lower()
-    mois_dict = {
-        'janvier': 1, 'février': 2, 'mars': 3, 'avril': 4, 'mai': 5, 'juin': 6,
-        'juillet': 7, 'août': 8, 'septembre': 9, 'octobre': 10, 'novembre': 11, 'décembre': 12
-    }
-    return mois_dict.get(mois)
+    return MOIS_FR.get(mois.lower())
 
 def inverse_date(date_str):
     """
@@ -27,27 +34,145 @@ def inverse_date(date_str):
 
         
 
-def remplacer_nombres_francais(chaine):
+# Dates en toutes lettres ("12 janvier 2024", "1er mars 2023") ou numériques ("12/01/2024")
+DATE_FR_PATTERN = re.compile(
+    r"""\b(?:
+        (?P<jour>\d{1,2})(?:\s*er)?\s+(?P<mois>"""+"|".join(sorted(MOIS_FR_VARIANTES, key=len, reverse=True))+r""")\s+(?P<annee>\d{4})
+      | (?P<jour_num>\d{1,2})/(?P<mois_num>\d{1,2})/(?P<annee_num>\d{4})
+    )\b""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+def _dates_des_correspondances(correspondances: pd.DataFrame) -> pd.Series:
+    """
+    Construit les dates (datetime64) à partir des groupes de DATE_FR_PATTERN.
+    """
+    mois = correspondances["mois"].str.lower().map(MOIS_FR_VARIANTES)
+    composantes = pd.DataFrame({
+        "year": correspondances["annee"].fillna(correspondances["annee_num"]),
+        "month": mois.fillna(correspondances["mois_num"]),
+        "day": correspondances["jour"].fillna(correspondances["jour_num"]),
+    }).apply(pd.to_numeric, errors="coerce")
+    # les dates impossibles ("31 février 2024") deviennent NaT
+    return pd.to_datetime(composantes, errors="coerce")
+
+
+def extraire_dates_fr(textes: pd.Series, toutes: bool = False):
     """
-    Remplace les nombres en français par leur équivalent numérique dans une chaîne de caractères.
+    Extrait les dates d'une série de textes d'annonces ("12 janvier 2024", "1er mars 2023", "12/01/2024"),
+    avec une seule expression compilée, évaluée une fois par texte distinct.
+
+    Args:
+        textes (pd.Series): Les textes (ex : complementJugement).
+        toutes (bool): Si False, seule la première date de chaque texte est retournée.
+    Returns:
+        pd.Series: Si toutes=False, la première date de chaque texte (datetime64, NaT si aucune).
+        pd.DataFrame: Si toutes=True, une ligne par date trouvée, indexée comme str.extractall
+            (index d'origine, numéro de la correspondance), avec la colonne 'date'.
     """
-    correspondances = {
-        "onze": "11", "douze": "12", "treize": "13",
-        "quatorze": "14", "quinze": "15", "seize": "16",
-        "dix-sept": "17", "dix-huit": "18", "dix-neuf": "19", "vingt": "20",
-        "un": "1", "deux": "2", "trois": "3", "quatre": "4",
-        "cinq": "5", "six": "6", "sept": "7", "huit": "8", "neuf": "9",
-        "dix": "10"
-    }
+    codes, uniques = pd.factorize(textes)
+    uniques = pd.Series(np.asarray(uniques, dtype=object)).where(lambda u: u.map(type) == str)
+
+    if not toutes:
+        dates_uniques = _dates_des_correspondances(uniques.str.extract(DATE_FR_PATTERN)).to_numpy(dtype="datetime64[ns]")
+        dates = np.full(len(textes), np.datetime64("NaT", "ns"))
+        presents = codes >= 0
+        dates[presents] = dates_uniques[codes[presents]]
+        return pd.Series(dates, index=textes.index, name=textes.name)
+
+    correspondances = uniques.str.extractall(DATE_FR_PATTERN)
+    dates_uniques = pd.DataFrame({
+        "code": correspondances.index.get_level_values(0),
+        "match": correspondances.index.get_level_values(1),
+        "date": _dates_des_correspondances(correspondances).to_numpy(dtype="datetime64[ns]"),
+    })
+    lignes = pd.DataFrame({"position": np.arange(len(textes)), "code": codes})
+    dates = lignes.merge(dates_uniques, on="code").sort_values(["position", "match"])
+    index = pd.MultiIndex.from_arrays(
+        [textes.index[dates["position"].to_numpy()], dates["match"].to_numpy()],
+        names=[textes.index.name, "match"],
+    )
+    return pd.DataFrame({"date": dates["date"].to_numpy()}, index=index)
+
+
+UNITES_FR = {
+    "un": 1, "deux": 2, "trois": 3, "quatre": 4, "cinq": 5,
+    "six": 6, "sept": 7, "huit": 8, "neuf": 9,
+}
+DIX_A_DIX_NEUF_FR = {
+    "dix": 10, "onze": 11, "douze": 12, "treize": 13, "quatorze": 14, "quinze": 15,
+    "seize": 16, "dix-sept": 17, "dix-huit": 18, "dix-neuf": 19,
+}
+DIZAINES_FR = {
+    "vingt": 20, "trente": 30, "quarante": 40, "cinquante": 50, "soixante": 60,
+    "septante": 70, "huitante": 80, "octante": 80, "nonante": 90, "quatre-vingt": 80,
+}
+
+_SEP = r"(?:\s*-\s*|\s+)"
+_ET = r"(?:\s*-\s*|\s+)et(?:\s*-\s*|\s+)"
+_UNITES = r"un|deux|trois|quatre|cinq|six|sept|huit|neuf"
+_DIX_A_DIX_NEUF = rf"dix(?:{_SEP}(?:sept|huit|neuf))?|onze|douze|treize|quatorze|quinze|seize"
+
+# Nombres de 1 à 99 écrits en toutes lettres ("vingt-quatre", "soixante et onze", "quatre-vingt-dix-neuf").
+# "une" n'est accepté qu'après "et" pour ne pas convertir l'article ("d'une durée").
+NOMBRE_FRANCAIS_PATTERN = re.compile(
+    rf"""\b(?:
+        (?P<quatre_vingt>quatre{_SEP}vingts?)(?:{_SEP}(?P<quatre_vingt_reste>{_DIX_A_DIX_NEUF}|{_UNITES}))?
+      | (?P<soixante>soixante)(?:{_ET}(?P<soixante_et>une?|onze)|{_SEP}(?P<soixante_reste>{_DIX_A_DIX_NEUF}|{_UNITES}))?
+      | (?P<dizaine>vingt|trente|quarante|cinquante|septante|huitante|octante|nonante)(?:{_ET}(?P<dizaine_et>une?)|{_SEP}(?P<dizaine_reste>{_UNITES}))?
+      | (?P<dix_a_dix_neuf>{_DIX_A_DIX_NEUF})
+      | (?P<unite>{_UNITES})
+    )\b""",
+    re.IGNORECASE | re.VERBOSE,
+)
+_SEP_PATTERN = re.compile(_SEP)
+
+
+def _valeur_mot(mot):
+    mot = _SEP_PATTERN.sub("-", mot.lower())
+    if mot in ("une", "un"):
+        return 1
+    return UNITES_FR.get(mot) or DIX_A_DIX_NEUF_FR.get(mot) or DIZAINES_FR.get(mot.rstrip("s"))
 
+
+def _valeur_nombre(match):
+    groupes = match.groupdict()
+    for dizaine, restes in (
+        ("quatre_vingt", ("quatre_vingt_reste",)),
+        ("soixante", ("soixante_et", "soixante_reste")),
+        ("dizaine", ("dizaine_et", "dizaine_reste")),
+    ):
+        if groupes[dizaine]:
+            reste = next((groupes[r] for r in restes if groupes[r]), None)
+            return _valeur_mot(groupes[dizaine]) + (_valeur_mot(reste) if reste else 0)
+    return _valeur_mot(groupes["dix_a_dix_neuf"] or groupes["unite"])
+
+
+def nombre_francais_vers_int(texte):
+    """
+    Convertit un nombre écrit en toutes lettres (ex: "soixante-dix" -> 70). Retourne None si le texte n'est pas un nombre.
+    """
+    if not texte:
+        return None
+    match = NOMBRE_FRANCAIS_PATTERN.fullmatch(texte.strip())
+    return _valeur_nombre(match) if match else None
+
+
+def remplacer_nombres_francais(chaine):
+    """
+    Remplace les nombres en français (de 1 à 99) par leur équivalent numérique dans une chaîne de caractères.
+    """
     if not chaine:
         return ""
 
-    for mot, chiffre in correspondances.items():
-        #  Utilise \b sans double échappement
-        chaine = re.sub(rf"\b{mot}\b", chiffre, chaine, flags=re.IGNORECASE)
+    return NOMBRE_FRANCAIS_PATTERN.sub(lambda match: str(_valeur_nombre(match)), chaine)
 
-    return chaine
+
+# version série de remplacer_nombres_francais : chaque valeur distincte n'est traitée qu'une fois
+remplacer_nombres_francais_series = FonctionParValeur(
+    remplacer_nombres_francais, cache_size=TAILLE_CACHE_TEXTE, nom="remplacer_nombres_francais"
+)
 
     
 def extraire_annees(txt):
@@ -79,16 +204,194 @@ def bi_date(d):
 
     return datetime(d.year, 3, 1) if d.month == 2 and d.day == 29 else d
 
-def clean_dates(df: pd.DataFrame) -> pd.DataFrame:
+# motifs (années, mois) de la durée d'un plan dans le complément de jugement
+MOTIFS_DUREE_REDRESSEMENT = (r"(.{2,10})\s(?:ans|annees|annee|années|année|an|nomme)", r"(.{2,10})\smois")
+MOTIFS_DUREE_SAUVEGARDE = (r"(.{3,10})\s(?:an|nommant)", r"(.{4,10})\smois")
+
+
+def extraire_duree_series(textes: pd.Series, motif: str) -> pd.Series:
+    """
+    Extrait une durée d'une série de textes : le fragment capturé par le motif est converti
+    (nombres en lettres -> chiffres) puis son premier nombre est retenu. 0 si aucune durée.
+    """
+    brut = textes.str.extract(motif, expand=False).fillna("")
+    nombres = remplacer_nombres_francais_series(brut).str.extract(r"(\d+)", expand=False)
+    return pd.to_numeric(nombres).fillna(0).astype(int)
+
+
+def extraire_durees(textes: pd.Series, motifs=MOTIFS_DUREE_REDRESSEMENT) -> pd.DataFrame:
+    """
+    Extrait la durée d'un plan (années et mois) d'une série de compléments de jugement.
+
+    Args:
+        textes (pd.Series): Les compléments de jugement.
+        motifs (tuple): Les motifs (années, mois) à rechercher.
+    Returns:
+        pd.DataFrame: Un DataFrame avec les colonnes 'duree_annes' et 'duree_mois'.
+    """
+    motif_annees, motif_mois = motifs
+    textes = ajouter_espace_series(textes.astype(object))
+    return pd.DataFrame({
+        "duree_annes": extraire_duree_series(textes, motif_annees),
+        "duree_mois": extraire_duree_series(textes, motif_mois),
+    }, index=textes.index)
+
+
+def ajouter_duree_series(dates: pd.Series, annees, mois) -> pd.Series:
+    """
+    Ajoute une durée (années et mois) à une série de dates, de façon vectorisée.
+    Comme avec bi_date, un 29 février est d'abord ramené au 1er mars ; le jour est ensuite
+    borné à la fin du mois d'arrivée (comme relativedelta).
+
+    Args:
+        dates (pd.Series): Les dates de départ.
+        annees: Les durées en années (série ou tableau d'entiers).
+        mois: Les durées en mois (série ou tableau d'entiers).
+    Returns:
+        pd.Series: Les dates de fin (datetime64), NaT si la date de départ est manquante.
+    """
+    dates = pd.to_datetime(dates, errors="coerce")
+    # tableaux modifiables : sous copie à l'écriture, to_numpy peut retourner une vue en lecture seule
+    valides = dates.notna().to_numpy(copy=True)
+    a = dates.dt.year.to_numpy(dtype=float)
+    m = dates.dt.month.to_numpy(dtype=float, copy=True)
+    j = dates.dt.day.to_numpy(dtype=float, copy=True)
+
+    # règle du 29 février
+    bissextile = (m == 2) & (j == 29)
+    m[bissextile], j[bissextile] = 3, 1
+
+    total = np.where(valides, a * 12 + (m - 1), 0).astype(np.int64)
+    total += np.asarray(annees, dtype=np.int64) * 12 + np.asarray(mois, dtype=np.int64)
+    annee, mois_fin = total // 12, total % 12 + 1
+
+    jours_par_mois = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[mois_fin - 1]
+    annee_bissextile = (annee % 4 == 0) & ((annee % 100 != 0) | (annee % 400 == 0))
+    jours_par_mois = jours_par_mois + ((mois_fin == 2) & annee_bissextile)
+    jour = np.minimum(np.where(valides, j, 1).astype(np.int64), jours_par_mois)
+
+    # dates hors des bornes de datetime64[ns] (durées aberrantes) -> NaT
+    valides &= (annee > pd.Timestamp.min.year) & (annee < pd.Timestamp.max.year)
+    fin = ((annee - 1970) * 12 + mois_fin - 1).astype("datetime64[M]").astype("datetime64[D]") + (jour - 1)
+    fin = np.where(valides, fin, np.datetime64("NaT", "D")).astype("datetime64[ns]")
+    return pd.Series(fin, index=dates.index)
+
+
+# formats testés, dans l'ordre, pour détecter le format d'une colonne de dates
+FORMATS_DATE = (
+    "%Y-%m-%d",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+)
+
+
+def detecter_format_date(valeurs, formats=FORMATS_DATE, echantillon: int = 50) -> Optional[str]:
     """
-    Nettoie les colonnes de type date dans le DataFrame.
+    Détecte le format d'une colonne de dates sur un échantillon de ses valeurs (chaînes).
+
+    Args:
+        valeurs: Les valeurs de la colonne, idéalement distinctes.
+        formats (tuple): Les formats candidats.
+        echantillon (int): Le nombre de chaînes testées.
+    Returns:
+        str: Le format qui reconnaît le plus de valeurs de l'échantillon, None si aucun ne convient.
+    """
+    chaines = [valeur for valeur in valeurs if isinstance(valeur, str)][:echantillon]
+    meilleur, reconnues_max = None, 0
+    for format in formats:
+        reconnues = 0
+        for chaine in chaines:
+            try:
+                datetime.strptime(chaine, format)
+                reconnues += 1
+            except ValueError:
+                pass
+        if reconnues > reconnues_max:
+            meilleur, reconnues_max = format, reconnues
+        if reconnues == len(chaines):
+            break
+    return meilleur
+
+
+def parse_dates(series: pd.Series, format: Optional[str] = None, formats=FORMATS_DATE) -> Tuple[pd.Series, list]:
+    """
+    Convertit une série en datetime64, avec un format explicite (détecté si non fourni)
+    et une seule conversion par valeur distincte.
+
+    Args:
+        series (pd.Series): Les dates (chaînes, objets date ou datetime).
+        format (str): Le format des chaînes. Par défaut, détecté avec detecter_format_date.
+        formats (tuple): Les formats candidats pour la détection.
+    Returns:
+        tuple: La série convertie (datetime64[ns], NaT si non reconnue) et la liste des valeurs non reconnues.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, []
+
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(np.asarray(uniques, dtype=object))
+    if format is None:
+        format = detecter_format_date(uniques, formats)
+    # sans format reconnu, chaque valeur est interprétée séparément
+    dates_uniques = pd.to_datetime(uniques, format=format or "mixed", errors="coerce")
+    if isinstance(dates_uniques.dtype, pd.DatetimeTZDtype):
+        dates_uniques = dates_uniques.dt.tz_localize(None)
+    dates_uniques = dates_uniques.to_numpy(dtype="datetime64[ns]")
+
+    dates = np.full(len(series), np.datetime64("NaT", "ns"))
+    presents = codes >= 0
+    dates[presents] = dates_uniques[codes[presents]]
+    # les chaînes vides sont des valeurs manquantes, pas des dates non reconnues
+    non_reconnues = [valeur for valeur in uniques[np.isnat(dates_uniques)] if not (isinstance(valeur, str) and not valeur.strip())]
+    return pd.Series(dates, index=series.index, name=series.name), non_reconnues
+
+
+def dates_vers_objets_date(df: pd.DataFrame, colonnes=None) -> pd.DataFrame:
+    """
+    Convertit des colonnes datetime64 en objets date Python (None si manquante), pour l'export en base.
+
+    Args:
+        df (pd.DataFrame): Le DataFrame à traiter.
+        colonnes (list): Les colonnes à convertir. Par défaut, toutes les colonnes datetime64.
+    Returns:
+        pd.DataFrame: Le DataFrame avec les colonnes converties.
+    """
+    if colonnes is None:
+        colonnes = df.select_dtypes(include=["datetime64[ns]", "datetime64"]).columns
+    for col in colonnes:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            dates = df[col].dt.date.astype(object)
+            df[col] = dates.where(df[col].notnull(), None)
+    return df
+
+
+def clean_dates(df: pd.DataFrame, as_date: bool = False, rapport: Optional[dict] = None, parser=parse_dates) -> pd.DataFrame:
+    """
+    Nettoie les colonnes de type date dans le DataFrame : le format de chaque colonne est détecté
+    une fois, puis chaque valeur distincte est convertie en datetime64.
+
+    Args:
+        df (pd.DataFrame): Le DataFrame à traiter.
+        as_date (bool): Si True, les dates sont converties en objets date Python (export en base).
+        rapport (dict): Si fourni, reçoit pour chaque colonne la liste des valeurs non reconnues.
+        parser: La fonction de conversion d'une colonne (signature de parse_dates), par exemple celle d'un moteur.
+    Returns:
+        pd.DataFrame: Le DataFrame avec les colonnes de dates converties.
     """
     date_columns = [col for col in df.columns if "date" in col.lower()]
 
     for col in date_columns:
         try:
-            df[col] = pd.to_datetime(df[col], errors='coerce').dt.date
+            df[col], non_reconnues = parser(df[col])
+            if rapport is not None and non_reconnues:
+                rapport[col] = non_reconnues
         except Exception as e:
             print(f"Erreur lors du traitement de la colonne {col}: {e}")
 
-    return df
\ No newline at end of file
+    if as_date:
+        df = dates_vers_objets_date(df, date_columns)
+    return df
@@ -0,0 +1,174 @@
+import contextlib
+import functools
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+try:
+    # chaînes Arrow : stockage contigu, bien plus compact que des objets str Python
+    import pyarrow  # noqa: F401
+    TYPE_IDENTIFIANT = pd.StringDtype("pyarrow")
+except ImportError:
+    TYPE_IDENTIFIANT = pd.StringDtype("python")
+
+
+# pandas >= 3 : la copie à l'écriture est toujours active et l'option n'existe plus
+COPIE_A_L_ECRITURE_NATIVE = int(pd.__version__.split(".")[0]) >= 3
+
+
+def copie_a_l_ecriture_active() -> bool:
+    """
+    Indique si pandas applique actuellement la copie à l'écriture (copy-on-write).
+    """
+    return COPIE_A_L_ECRITURE_NATIVE or pd.options.mode.copy_on_write is True
+
+
+def copie_a_l_ecriture():
+    """
+    Contexte dans lequel pandas applique la copie à l'écriture : les sélections, renommages,
+    suppressions de colonnes, jointures et copies superficielles partagent les données d'origine,
+    qui ne sont copiées qu'au moment d'une écriture.
+
+    Avant pandas 3, le contexte modifie l'option globale 'mode.copy_on_write' : il n'est pas sûr entre
+    threads, un autre thread exécutant du code pandas pendant le contexte voit l'option activée, et sa
+    sortie peut rétablir l'option pendant qu'un autre thread est encore dans le contexte.
+    """
+    if COPIE_A_L_ECRITURE_NATIVE:
+        return contextlib.nullcontext()
+    return pd.option_context("mode.copy_on_write", True)
+
+
+def _donnees(serie: pd.Series):
+    # tableau NumPy sous-jacent d'une colonne, ou None si les données ne sont pas modifiables en place (Arrow)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.array.codes
+    if isinstance(serie.dtype, np.dtype):
+        return serie.to_numpy()
+    return None
+
+
+def detacher(resultat: pd.DataFrame, entree: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copie les seules colonnes du résultat qui partagent encore leurs données avec le DataFrame d'entrée,
+    afin qu'une écriture en place sur le résultat, hors copie à l'écriture, ne modifie pas l'entrée.
+    """
+    tableaux = [t for t in (_donnees(entree.iloc[:, i]) for i in range(entree.shape[1])) if t is not None]
+    partagees = [
+        i for i in range(resultat.shape[1])
+        if (t := _donnees(resultat.iloc[:, i])) is not None and any(np.may_share_memory(t, e) for e in tableaux)
+    ]
+    if partagees:
+        resultat = resultat.copy(deep=False)
+        for i in partagees:
+            resultat.isetitem(i, resultat.iloc[:, i].copy())
+    return resultat
+
+
+def sans_effet_de_bord(func):
+    """
+    Décorateur des étapes du pipeline recevant un DataFrame en premier argument.
+
+    Propriété des données : l'étape travaille sur une copie superficielle du DataFrame reçu, sous
+    copie à l'écriture ; elle peut donc ajouter, remplacer ou supprimer des colonnes sans modifier
+    le DataFrame de l'appelant et sans copier les colonnes inchangées. Les étapes imbriquées
+    partagent ainsi leurs données jusqu'à la sortie du pipeline.
+
+    Si l'appelant n'utilise pas lui-même la copie à l'écriture, les colonnes du résultat encore
+    partagées avec l'entrée sont détachées en sortie (voir detacher). L'activation passe par
+    copie_a_l_ecriture, qui n'est pas sûr entre threads avant pandas 3 : les étapes décorées ne doivent pas
+    s'exécuter en parallèle dans des threads d'un même processus sans que l'appelant active lui-même
+    la copie à l'écriture (pd.set_option('mode.copy_on_write', True)) avant de lancer les threads.
+    """
+    @functools.wraps(func)
+    def etape(df, *args, **kwargs):
+        if copie_a_l_ecriture_active():
+            return func(df.copy(deep=False), *args, **kwargs)
+        with copie_a_l_ecriture():
+            resultat = func(df.copy(deep=False), *args, **kwargs)
+        return detacher(resultat, df)
+    return etape
+
+
+# colonnes identifiantes : conservées en chaînes (jamais en catégories)
+COLONNES_IDENTIFIANTS = ("id", "SIREN", "numeroannonce", "numero_annonce")
+
+# colonnes à faible cardinalité, toujours converties en catégories lorsqu'elles sont présentes
+COLONNES_CATEGORIELLES = (
+    "nature", "famille", "type",
+    "numerodepartement", "numero_departement",
+    "tribunal", "familleavis", "familleavis_lib", "publicationavis",
+)
+
+# part maximale de valeurs distinctes pour qu'une autre colonne texte soit convertie en catégorie
+SEUIL_CARDINALITE = 0.5
+
+
+def _est_peu_cardinale(serie: pd.Series, seuil: float) -> bool:
+    try:
+        distinctes = serie.nunique(dropna=True)
+    except TypeError:
+        # valeurs non hachables (listes, dictionnaires)
+        return False
+    return len(serie) > 0 and distinctes / len(serie) <= seuil
+
+
+def compacter_types(df: pd.DataFrame, categories=COLONNES_CATEGORIELLES, identifiants=COLONNES_IDENTIFIANTS,
+                    seuil_cardinalite: Optional[float] = SEUIL_CARDINALITE) -> pd.DataFrame:
+    """
+    Convertit les colonnes dans des types compacts :
+        - les colonnes à faible cardinalité (listées ou détectées) en catégories
+        - les identifiants et les autres colonnes texte en chaînes (Arrow si pyarrow est installé)
+        - les entiers au plus petit type entier suffisant
+    Les colonnes de dates (datetime64) sont conservées telles quelles.
+
+    Args:
+        df (pd.DataFrame): Le DataFrame à traiter.
+        categories (tuple): Les colonnes à convertir en catégories.
+        identifiants (tuple): Les colonnes identifiantes à convertir en chaînes.
+        seuil_cardinalite (float): Part maximale de valeurs distinctes pour convertir une autre colonne texte
+            en catégorie. None pour désactiver la détection.
+    Returns:
+        pd.DataFrame: Le DataFrame avec les colonnes converties.
+    """
+    for col in df.columns:
+        serie = df[col]
+        if col in identifiants:
+            if pd.api.types.is_integer_dtype(serie):
+                serie = serie.astype(str)
+            df[col] = serie.astype(TYPE_IDENTIFIANT)
+        elif isinstance(serie.dtype, pd.CategoricalDtype):
+            continue
+        elif col in categories or (
+            seuil_cardinalite is not None and serie.dtype == object and _est_peu_cardinale(serie, seuil_cardinalite)
+        ):
+            df[col] = serie.astype("category")
+        elif serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True) == "string":
+            df[col] = serie.astype(TYPE_IDENTIFIANT)
+        elif pd.api.types.is_integer_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            df[col] = pd.to_numeric(serie, downcast="integer")
+    return df
+
+
+def rapport_memoire(avant: pd.DataFrame, apres: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Rapport de l'occupation mémoire (profonde) d'un DataFrame, par colonne, en Mo.
+    Si un second DataFrame est fourni (par exemple après compacter_types), les deux sont comparés.
+
+    Args:
+        avant (pd.DataFrame): Le DataFrame de référence.
+        apres (pd.DataFrame): Le DataFrame à comparer.
+    Returns:
+        pd.DataFrame: Une ligne par colonne, plus une ligne 'total'.
+    """
+    def occupation(df):
+        memoire = df.memory_usage(deep=True, index=False) / 1024 ** 2
+        return pd.DataFrame({"type": df.dtypes.astype(str), "memoire_mo": memoire})
+
+    rapport = occupation(avant)
+    if apres is not None:
+        rapport = rapport.join(occupation(apres), rsuffix="_apres", how="outer")
+    total = rapport.select_dtypes(include=[np.number]).sum().to_frame("total").T
+    rapport = pd.concat([rapport, total])
+    if apres is not None:
+        rapport["ratio"] = rapport["memoire_mo"] / rapport["memoire_mo_apres"]
+    return rapport
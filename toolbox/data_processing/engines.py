@@ -0,0 +1,383 @@
+import importlib.util
+import re
+import time
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+from .bodacc_utils import (
+    JUGEMENT_VARIABLES, REGLES_NATURE, classify_and_group, clean_and_extract_ps, clean_columns,
+    corriger_caracteres_speciaux, corriger_caracteres_speciaux_series, extract_jugement_fields,
+    extract_jugement_variable, extract_siren_from_registre,
+)
+from .date_utils import (
+    FORMATS_DATE, MOTIFS_DUREE_REDRESSEMENT, clean_dates, detecter_format_date, extraire_durees,
+    parse_dates, remplacer_nombres_francais,
+)
+from .str_utils import MARQUEURS_MOJIBAKE
+
+# moteur colonnaire multi-thread optionnel (pip install toolbox[polars]), importé à la création du premier
+# moteur Polars : son import démarre des threads, inutiles avec le moteur pandas et qui empêchent
+# l'utilisation de fork par parallel
+pl = None
+
+
+def _importer_polars():
+    global pl
+    if pl is None:
+        import polars
+        pl = polars
+    return pl
+
+
+# composantes de date dont l'analyse par Polars donne le même résultat que pandas
+MOTIFS_COMPOSANTES_DATE = {
+    "%Y": "[0-9]{4}", "%m": "[0-9]{1,2}", "%d": "[0-9]{1,2}",
+    "%H": "[0-9]{1,2}", "%M": "[0-9]{1,2}", "%S": "[0-9]{1,2}",
+}
+
+
+def _motif_du_format(format: str) -> Optional[str]:
+    """
+    Motif des chaînes qu'un format de date reconnaît sans ambiguïté (chiffres ASCII, séparateurs exacts),
+    ou None si le format contient une autre composante (%f, %b...).
+    """
+    morceaux = re.findall(r"%.|[^%]+", format)
+    if any(morceau.startswith("%") and morceau not in MOTIFS_COMPOSANTES_DATE for morceau in morceaux):
+        return None
+    return "^" + "".join(MOTIFS_COMPOSANTES_DATE.get(morceau) or re.escape(morceau) for morceau in morceaux) + "$"
+
+
+def _chaines(series: pd.Series):
+    """
+    Valeurs d'une série (tableau d'objets) et masque des valeurs qui sont des chaînes.
+    """
+    valeurs = series.to_numpy(dtype=object, copy=True)
+    if pd.api.types.infer_dtype(valeurs, skipna=True) in ("string", "empty"):
+        return valeurs, pd.notna(valeurs)
+    return valeurs, np.fromiter((isinstance(valeur, str) for valeur in valeurs), dtype=bool, count=len(valeurs))
+
+
+def _serie_texte(valeurs: np.ndarray, chaines: np.ndarray):
+    # série Polars des chaînes, les autres valeurs devenant nulles
+    return pl.Series(np.where(chaines, valeurs, None), dtype=pl.String)
+
+
+class PandasEngine:
+    """
+    Moteur de référence : étapes ligne à ligne (jugement, colonnes, dates, durées des plans),
+    classification et regroupement des jugements avec pandas.
+    """
+
+    name = "pandas"
+
+    @staticmethod
+    def is_available() -> bool:
+        return True
+
+    def extract_jugement_variable(self, df, extra_variables=None) -> pd.DataFrame:
+        """
+        Voir bodacc_utils.extract_jugement_variable.
+        """
+        return extract_jugement_variable(df, extra_variables)
+
+    def clean_columns(self, df) -> pd.DataFrame:
+        """
+        Voir bodacc_utils.clean_columns.
+        """
+        return clean_columns(df)
+
+    def parse_dates(self, series, format=None, formats=FORMATS_DATE):
+        """
+        Voir date_utils.parse_dates.
+        """
+        return parse_dates(series, format, formats)
+
+    def clean_dates(self, df, as_date=False, rapport=None) -> pd.DataFrame:
+        """
+        Voir date_utils.clean_dates.
+        """
+        return clean_dates(df, as_date, rapport, parser=self.parse_dates)
+
+    def extraire_durees(self, textes, motifs=MOTIFS_DUREE_REDRESSEMENT) -> pd.DataFrame:
+        """
+        Voir date_utils.extraire_durees.
+        """
+        return extraire_durees(textes, motifs)
+
+    def classify_and_group(self, df, col="nature", regles=REGLES_NATURE, columns=None, cle="id") -> pd.DataFrame:
+        """
+        Voir bodacc_utils.classify_and_group.
+        """
+        return classify_and_group(df, col, regles, columns=columns, cle=cle)
+
+
+class PolarsEngine(PandasEngine):
+    """
+    Moteur Polars : les étapes ligne à ligne sont vectorisées par Polars (décodage JSON des jugements,
+    remplacements de texte, analyse des dates, extraction des durées) ; la classification, le tri et le
+    dédoublonnage des jugements sont exécutés par une requête paresseuse (optimisée et multi-thread), puis
+    les lignes retenues sont relues dans le DataFrame pandas d'origine.
+
+    Les entrées et sorties restent des DataFrames pandas, identiques au moteur pandas : les valeurs dont
+    l'interprétation par Polars pourrait différer (jugements en dictionnaires ou à réparer, dates hors du
+    motif de leur format) sont traitées par le moteur pandas.
+    """
+
+    name = "polars"
+
+    def __init__(self):
+        _importer_polars()
+
+    @staticmethod
+    def is_available() -> bool:
+        return pl is not None or importlib.util.find_spec("polars") is not None
+
+    @staticmethod
+    def _corriger_mojibake(textes: "pl.Series") -> "pl.Series":
+        # comme bodacc_utils.corriger_caracteres_speciaux_series : seuls les textes contenant un marqueur
+        # de mojibake sont corrigés, une fois par valeur distincte
+        a_corriger = textes.filter(textes.str.contains(MARQUEURS_MOJIBAKE.pattern).fill_null(False)).unique()
+        if not len(a_corriger):
+            return textes
+        return textes.replace({texte: corriger_caracteres_speciaux(texte) for texte in a_corriger.to_list()})
+
+    def _jugement_fields(self, jugements: pd.Series, variables) -> Optional[pd.DataFrame]:
+        """
+        Variables des jugements décodées par Polars, natures et familles corrigées, ou None si les jugements
+        ne sont pas tous des chaînes JSON valides (dictionnaires de l'API, exports CSV à réparer).
+        """
+        valeurs, chaines = _chaines(jugements)
+        if not (chaines | pd.isna(valeurs)).all():
+            return None
+        # Polars convertit en texte les valeurs non textuelles, retient la première de deux clés répétées
+        # et ne décode pas les surrogates isolés : ces jugements sont signalés, puis décodés par json
+        cles = "|".join(re.escape(variable) for variable in variables)
+        texte = pl.col("jugement")
+        requete = _serie_texte(valeurs, chaines).alias("jugement").to_frame().lazy().select(
+            texte.str.json_decode(dtype=pl.Struct({variable: pl.String for variable in variables})).struct.unnest(),
+            pl.any_horizontal(
+                texte.str.contains(rf'"(?:{cles})"\s*:\s*(?:[^"\sn]|n[^u])|\\u[dD][89abAB]'),
+                *[texte.str.count_matches(rf'"{re.escape(variable)}"\s*:') > 1 for variable in variables],
+            ).fill_null(False).alias("douteux"),
+        )
+        try:
+            decodes = requete.collect()
+        except pl.exceptions.PolarsError:
+            return None
+        decodes = decodes.with_columns(
+            self._corriger_mojibake(decodes["nature"]), self._corriger_mojibake(decodes["famille"])
+        )
+
+        champs = pd.DataFrame({variable: decodes[variable].to_numpy() for variable in variables}, index=jugements.index, dtype=object)
+        douteux = decodes["douteux"].to_numpy()
+        if douteux.any():
+            extraits = extract_jugement_fields(jugements[douteux], variables)
+            for variable in ("nature", "famille"):
+                extraits[variable] = corriger_caracteres_speciaux_series(extraits[variable])
+            champs.iloc[np.flatnonzero(douteux)] = extraits[variables].to_numpy()
+        return champs
+
+    def extract_jugement_variable(self, df, extra_variables=None) -> pd.DataFrame:
+        """
+        Voir bodacc_utils.extract_jugement_variable.
+        """
+        assert "jugement" in df.columns, "La colonne 'jugement' n'existe pas dans le DataFrame."
+
+        variables = JUGEMENT_VARIABLES + [v for v in (extra_variables or []) if v not in JUGEMENT_VARIABLES]
+        champs = self._jugement_fields(df["jugement"], variables)
+        if champs is None:
+            return super().extract_jugement_variable(df, extra_variables)
+        for variable in variables:
+            df[variable] = champs[variable]
+        return df
+
+    @staticmethod
+    def _remplacer(series: pd.Series, ancien: str, nouveau: str) -> pd.Series:
+        # comme bodacc_utils._point_virgule_en_espace : les valeurs manquantes sont conservées,
+        # les autres valeurs qui ne sont pas des chaînes deviennent NaN
+        valeurs, chaines = _chaines(series)
+        remplaces = pl.Series(valeurs[chaines], dtype=pl.String).str.replace_all(ancien, nouveau, literal=True)
+        autres = ~chaines & pd.notna(valeurs)
+        valeurs[chaines] = remplaces.to_numpy()
+        valeurs[autres] = np.nan
+        return pd.Series(valeurs, index=series.index, name=series.name)
+
+    def clean_columns(self, df) -> pd.DataFrame:
+        """
+        Voir bodacc_utils.clean_columns.
+        """
+        assert "registre" in df.columns, "La colonne 'registre' n'existe pas dans le DataFrame."
+        assert "commercant" in df.columns, "La colonne 'commercant' n'existe pas dans le DataFrame."
+        assert "complementJugement" in df.columns, "La colonne 'complementJugement' n'existe pas dans le DataFrame."
+        assert "nature" in df.columns, "La colonne 'nature' n'existe pas dans le DataFrame."
+
+        df["SIREN"] = extract_siren_from_registre(df["registre"])
+        df = df.drop(columns=["registre"])
+        df["commercant"] = self._remplacer(df["commercant"], ";", " ")
+        df["complementJugement"] = self._remplacer(df["complementJugement"], ";", " ")
+        df["nature"] = self._remplacer(df["nature"], ";", ",")
+        return df
+
+    def parse_dates(self, series, format=None, formats=FORMATS_DATE):
+        """
+        Voir date_utils.parse_dates. Les chaînes conformes au motif du format (voir _motif_du_format) sont
+        analysées par Polars ; les autres valeurs, et les colonnes qui ne contiennent pas que des chaînes,
+        sont analysées par pandas.
+        """
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series, []
+        # une analyse par valeur distincte, comme date_utils.parse_dates
+        codes, uniques = pd.factorize(series)
+        valeurs, chaines = _chaines(pd.Series(np.asarray(uniques, dtype=object)))
+        if not chaines.all():
+            return parse_dates(series, format, formats)
+        textes = pl.Series(valeurs, dtype=pl.String)
+        if format is None:
+            format = detecter_format_date(valeurs, formats)
+        motif = _motif_du_format(format) if format else None
+        if motif is None:
+            return parse_dates(series, format, formats)
+
+        # analyse en microsecondes, puis bornes de datetime64[ns] : les dates hors bornes sont NaT comme avec pandas
+        dates = textes.str.to_datetime(format, strict=False, time_unit="us")
+        bornes = dates.is_between(pd.Timestamp.min.ceil("us").to_pydatetime(), pd.Timestamp.max.floor("us").to_pydatetime())
+        reconnues = (textes.str.contains(motif) & bornes).fill_null(False).to_numpy()
+        dates_uniques = dates.to_numpy(writable=True)
+        dates_uniques[~reconnues] = np.datetime64("NaT", "us")
+        dates_uniques = dates_uniques.astype("datetime64[ns]")
+
+        # les chaînes hors du motif sont confiées à pandas
+        non_reconnues = []
+        if not reconnues.all():
+            autres, non_reconnues = parse_dates(pd.Series(valeurs[~reconnues], dtype=object), format, formats)
+            dates_uniques[~reconnues] = autres.to_numpy()
+
+        dates = np.full(len(series), np.datetime64("NaT", "ns"))
+        presents = codes >= 0
+        dates[presents] = dates_uniques[codes[presents]]
+        return pd.Series(dates, index=series.index, name=series.name), non_reconnues
+
+    def extraire_durees(self, textes, motifs=MOTIFS_DUREE_REDRESSEMENT) -> pd.DataFrame:
+        """
+        Voir date_utils.extraire_durees : les motifs sont recherchés par Polars, les fragments capturés
+        (peu de valeurs distinctes) sont convertis en nombres une fois chacun.
+        """
+        valeurs = textes.to_numpy(dtype=object, copy=True)
+        manquants = pd.isna(valeurs)
+        textes_pl = pl.Series([None if manquant else str(valeur) for valeur, manquant in zip(valeurs, manquants)], dtype=pl.String)
+        # comme str_utils.ajouter_espace : un espace entre lettres et chiffres collés
+        textes_pl = (
+            textes_pl
+            .str.replace_all(r"([A-Za-z])(\d)", "${1} ${2}")
+            .str.replace_all(r"(\d)([A-Za-z])", "${1} ${2}")
+        )
+
+        durees = {}
+        for colonne, motif in zip(("duree_annes", "duree_mois"), motifs):
+            fragments = textes_pl.str.extract(motif, 1).fill_null("")
+            nombres = {}
+            for fragment in fragments.unique().to_list():
+                nombre = re.search(r"\d+", remplacer_nombres_francais(fragment))
+                nombres[fragment] = int(nombre.group()) if nombre else 0
+            durees[colonne] = fragments.replace_strict(nombres, return_dtype=pl.Int64).to_numpy()
+        return pd.DataFrame(durees, index=textes.index)
+
+    def classify_and_group(self, df, col="nature", regles=REGLES_NATURE, columns=None, cle="id") -> pd.DataFrame:
+        """
+        Voir bodacc_utils.classify_and_group.
+        """
+        assert col in df.columns, f"La colonne '{col}' n'existe pas dans le DataFrame."
+        assert cle in df.columns, f"La colonne '{cle}' n'existe pas dans le DataFrame."
+        assert "date" in df.columns, "La colonne 'date' n'existe pas dans le DataFrame."
+
+        # clés de tri : rang de la clé (ordre de pandas, valeurs manquantes à la fin), date et position
+        rangs, _ = pd.factorize(df[cle], sort=True)
+        # les motifs ne sont évalués que sur les valeurs distinctes de la colonne
+        codes, uniques = pd.factorize(df[col])
+        textes = np.asarray(uniques, dtype=object)
+        textes = np.where([isinstance(texte, str) for texte in textes], textes, None)
+
+        table = (
+            pl.LazyFrame({"code": np.arange(len(textes)), "texte": pl.Series(textes, dtype=pl.String)})
+            .with_columns([pl.col("texte").str.contains(f"(?i){motif}").alias(categorie) for categorie, motif in regles.items()])
+            .unpivot(index="code", on=list(regles), variable_name="categorie")
+            .filter(pl.col("value"))
+            .select("code", "categorie")
+        )
+        retenus = (
+            pl.LazyFrame({
+                "position": np.arange(len(df)),
+                "cle": pl.Series(rangs).replace(-1, None),
+                "date": pd.to_datetime(df["date"], errors="coerce").to_numpy(),
+                "code": codes,
+            })
+            .join(table, on="code")
+            .sort(["categorie", "cle", "date", "position"], descending=[False, False, True, False], nulls_last=True)
+            .unique(subset=["categorie", "cle"], keep="first", maintain_order=True)
+            .select("position", "categorie")
+            .collect()
+        )
+
+        evenements = df if columns is None else df[columns]
+        return evenements.iloc[retenus["position"].to_numpy()].assign(categorie=retenus["categorie"].to_numpy())
+
+
+ENGINES = {
+    PandasEngine.name: PandasEngine,
+    PolarsEngine.name: PolarsEngine,
+}
+
+
+def available_engines() -> List[str]:
+    """
+    Retourne les noms des moteurs utilisables dans l'environnement courant.
+    """
+    return [nom for nom, moteur in ENGINES.items() if moteur.is_available()]
+
+
+def get_engine(engine="pandas"):
+    """
+    Retourne le moteur demandé.
+
+    Args:
+        engine (str): 'pandas', 'polars', ou 'auto' pour le moteur le plus rapide disponible.
+            Une instance de moteur est retournée telle quelle.
+    Returns:
+        Le moteur.
+    """
+    if not isinstance(engine, str):
+        return engine
+    if engine == "auto":
+        engine = PolarsEngine.name if PolarsEngine.is_available() else PandasEngine.name
+    if engine not in ENGINES:
+        raise ValueError(f"Moteur inconnu : '{engine}'. Moteurs possibles : {', '.join(ENGINES)}.")
+    if not ENGINES[engine].is_available():
+        raise ImportError(f"Le moteur '{engine}' n'est pas installé (pip install {engine}).")
+    return ENGINES[engine]()
+
+
+def benchmark_engines(df: pd.DataFrame, engines: Optional[List[str]] = None, cle="id", repeat: int = 3) -> pd.DataFrame:
+    """
+    Mesure la durée de clean_and_extract_ps avec chaque moteur sur les mêmes annonces.
+
+    Args:
+        df (pd.DataFrame): Les annonces brutes.
+        engines (list): Les moteurs à comparer. Par défaut, tous les moteurs disponibles.
+        cle (str): La colonne de regroupement des statuts ('id' ou 'SIREN').
+        repeat (int): Le nombre d'exécutions par moteur ; la meilleure durée est retenue.
+    Returns:
+        pd.DataFrame: Une ligne par moteur, avec la durée en secondes et l'accélération par rapport à pandas.
+    """
+    durees = {}
+    for engine in engines or available_engines():
+        mesures = []
+        for _ in range(repeat):
+            debut = time.perf_counter()
+            clean_and_extract_ps(df, cle=cle, engine=engine)
+            mesures.append(time.perf_counter() - debut)
+        durees[engine] = min(mesures)
+
+    resultat = pd.DataFrame({"engine": list(durees), "secondes": list(durees.values())})
+    reference = durees.get(PandasEngine.name)
+    resultat["acceleration"] = reference / resultat["secondes"] if reference else np.nan
+    return resultat
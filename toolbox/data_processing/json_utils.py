@@ -0,0 +1,333 @@
+import gc
+import json
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from .date_utils import parse_dates
+from .str_utils import normaliser_siren
+
+try:
+    # décodeur JSON plus rapide si disponible, json de la bibliothèque standard sinon
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# --- Chemins des champs imbriqués des annonces BODACC ---
+# Dans les exports BODACC, une liste à un seul élément est souvent publiée comme un objet simple :
+# les chemins traversent indifféremment un objet ou une liste d'objets.
+
+CHEMINS_PERSONNE = {
+    "type_personne": "typePersonne",
+    "denomination": "denomination",
+    "nom": "nom",
+    "prenom": "prenom",
+    "forme_juridique": "formeJuridique",
+    "siren": "numeroImmatriculation.numeroIdentification",
+    "greffe": "numeroImmatriculation.nomGreffeImmat",
+    "capital": "capital.montantCapital",
+    "ville": "adresseSiegeSocial.ville",
+    "code_postal": "adresseSiegeSocial.codePostal",
+}
+
+CHEMINS_ETABLISSEMENT = {
+    "origine_fonds": "origineFonds",
+    "qualite_etablissement": "qualiteEtablissement",
+    "activite": "activite",
+    "enseigne": "enseigne",
+    "ville": "adresse.ville",
+    "code_postal": "adresse.codePostal",
+}
+
+CHEMINS_ACTE = {
+    "categorie_vente": "vente.categorieVente",
+    "date_effet_vente": "vente.dateEffet",
+    "date_immatriculation": "dateImmatriculation",
+    "date_commencement_activite": "dateCommencementActivite",
+    "descriptif_acte": "descriptif",
+}
+
+CHEMINS_DEPOT = {
+    "type_depot": "typeDepot",
+    "date_cloture": "dateCloture",
+    "descriptif_depot": "descriptif",
+}
+
+CHEMINS_MODIFICATIONS = {
+    "descriptif_modification": "descriptif",
+}
+
+# champ imbriqué -> (chemin de la liste d'éléments, None pour un objet simple ; chemins des colonnes)
+CHAMPS_IMBRIQUES_BODACC = {
+    "listepersonnes": ("personne", CHEMINS_PERSONNE),
+    "listeetablissements": ("etablissement", CHEMINS_ETABLISSEMENT),
+    "acte": (None, CHEMINS_ACTE),
+    "modificationsgenerales": (None, CHEMINS_MODIFICATIONS),
+    "depot": (None, CHEMINS_DEPOT),
+}
+
+# colonne extraite -> type (voir typer_colonne)
+TYPES_CHAMPS_BODACC = {
+    "siren": "siren",
+    "date_effet_vente": "date",
+    "date_immatriculation": "date",
+    "date_commencement_activite": "date",
+    "date_cloture": "date",
+}
+
+
+def decoder_json(valeur):
+    """
+    Décode une valeur JSON. Les objets et listes déjà décodés (données issues directement de l'API)
+    sont retournés tels quels. Retourne None si la valeur n'est pas un JSON valide.
+    """
+    if isinstance(valeur, (dict, list)):
+        return valeur
+    if not isinstance(valeur, (str, bytes)):
+        return None
+    try:
+        return _json_loads(valeur)
+    except (ValueError, TypeError):
+        return None
+
+
+def compiler_chemin(chemin: str):
+    """
+    Compile un chemin JSON ('cle.sous_cle.feuille') en une fonction qui l'évalue sur un objet décodé.
+    Une liste rencontrée en cours de chemin est remplacée par son premier élément ; une clé absente
+    ou un objet d'un autre type donne None.
+
+    Args:
+        chemin (str): Les clés successives, séparées par des points. Une chaîne vide désigne l'objet lui-même.
+    Returns:
+        function: objet -> valeur.
+    """
+    cles = tuple(chemin.split(".")) if chemin else ()
+
+    def suivre(objet):
+        for cle in cles:
+            if isinstance(objet, list):
+                objet = objet[0] if objet else None
+            if not isinstance(objet, dict):
+                return None
+            objet = objet.get(cle)
+        return objet
+    return suivre
+
+
+@contextmanager
+def ramasse_miettes_suspendu():
+    """
+    Suspend le ramasse-miettes cyclique pendant le décodage d'une colonne : les objets décodés, conservés
+    jusqu'à l'extraction, déclencheraient sinon des collectes répétées de plus en plus coûteuses.
+    """
+    actif = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if actif:
+            gc.enable()
+
+
+def _cle(objet, cle):
+    # accès à une clé lorsque l'objet n'est pas un dictionnaire : premier élément d'une liste, sinon None
+    if isinstance(objet, list) and objet:
+        objet = objet[0]
+    return objet.get(cle) if isinstance(objet, dict) else None
+
+
+def _arbre_des_chemins(chemins: Dict[str, str]):
+    # arbre des clés : un préfixe commun à plusieurs chemins n'est évalué qu'une fois
+    racine = ({}, [])
+    for nom, chemin in chemins.items():
+        noeud = racine
+        for cle in (chemin.split(".") if chemin else []):
+            noeud = noeud[0].setdefault(cle, ({}, []))
+        noeud[1].append(nom)
+    return racine
+
+
+def _evaluer_arbre(objets: list, noeud, colonnes: dict):
+    # évaluation niveau par niveau : une compréhension de liste par clé de l'arbre
+    enfants, noms = noeud
+    for nom in noms:
+        colonnes[nom] = objets
+    for cle, enfant in enfants.items():
+        valeurs = [objet.get(cle) if type(objet) is dict else _cle(objet, cle) for objet in objets]
+        _evaluer_arbre(valeurs, enfant, colonnes)
+
+
+def _compiler_liste(chemin: str):
+    # éléments d'une liste : un objet simple est traité comme une liste à un élément
+    suivre = compiler_chemin(chemin)
+
+    def elements(objet):
+        valeur = suivre(objet) if chemin else objet
+        if valeur is None:
+            return []
+        return valeur if isinstance(valeur, list) else [valeur]
+    return elements
+
+
+def typer_colonne(serie: pd.Series, type_colonne: str) -> pd.Series:
+    """
+    Convertit une colonne extraite dans son type :
+        - 'siren' : identifiant normalisé (voir normaliser_siren)
+        - 'date' : datetime64 (voir parse_dates)
+        - 'int' : entier nullable (Int64)
+        - 'str' : chaînes, les autres valeurs devenant manquantes
+        - tout autre type pandas est appliqué par astype
+    """
+    if type_colonne == "siren":
+        return normaliser_siren(serie)
+    if type_colonne == "date":
+        return parse_dates(serie)[0]
+    if type_colonne == "int":
+        return pd.to_numeric(serie, errors="coerce").astype("Int64")
+    if type_colonne == "str":
+        return serie.where(serie.map(lambda valeur: isinstance(valeur, str)), None)
+    return serie.astype(type_colonne)
+
+
+class ExtracteurJson:
+    """
+    Extraction colonnaire d'un ensemble de chemins JSON, compilés une seule fois.
+
+    Chaque valeur de la colonne n'est décodée qu'une fois, quel que soit le nombre de chemins :
+        - les chemins scalaires donnent une colonne par chemin (une ligne par valeur)
+        - chaque liste donne une table fille, avec une ligne par élément, indexée comme la valeur
+          parente et numérotée par la colonne 'rang'
+
+    Args:
+        chemins (dict): Nom de colonne -> chemin scalaire.
+        listes (dict): Nom de table -> (chemin de la liste, {nom de colonne -> chemin relatif à l'élément}).
+        types (dict): Nom de colonne -> type (voir typer_colonne). Les colonnes non typées restent des objets.
+    """
+
+    def __init__(self, chemins: Optional[Dict[str, str]] = None,
+                 listes: Optional[Dict[str, Tuple[str, Dict[str, str]]]] = None,
+                 types: Optional[Dict[str, str]] = None):
+        self.chemins = dict(chemins or {})
+        self.listes = dict(listes or {})
+        self.types = dict(types or {})
+        self._arbre = _arbre_des_chemins(self.chemins)
+        self._listes = [
+            (nom, _compiler_liste(liste), _arbre_des_chemins(chemins_element), list(chemins_element))
+            for nom, (liste, chemins_element) in self.listes.items()
+        ]
+
+    def _tableau(self, objets: list, index, arbre, noms) -> pd.DataFrame:
+        colonnes = {}
+        _evaluer_arbre(objets, arbre, colonnes)
+        # tableaux d'objets construits directement (les listes et dictionnaires restent des valeurs)
+        tableau = pd.DataFrame(
+            {nom: np.fromiter(colonnes[nom], dtype=object, count=len(objets)) for nom in noms},
+            index=index, columns=noms, copy=False,
+        )
+        for nom in tableau.columns:
+            if nom in self.types:
+                tableau[nom] = typer_colonne(tableau[nom], self.types[nom])
+        return tableau
+
+    def decoder(self, valeurs: pd.Series) -> list:
+        """
+        Décode une colonne de valeurs JSON (une fois par valeur).
+        """
+        with ramasse_miettes_suspendu():
+            return [decoder_json(valeur) for valeur in valeurs.tolist()]
+
+    def __call__(self, valeurs: pd.Series) -> pd.DataFrame:
+        """
+        Extrait les chemins scalaires d'une colonne de valeurs JSON.
+
+        Args:
+            valeurs (pd.Series): Les valeurs JSON (chaînes, objets décodés ou valeurs manquantes).
+        Returns:
+            pd.DataFrame: Une colonne par chemin, indexée comme les valeurs.
+        """
+        return self._tableau(self.decoder(valeurs), valeurs.index, self._arbre, list(self.chemins))
+
+    def extraire(self, valeurs: pd.Series) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        """
+        Extrait en une seule passe les chemins scalaires et les tables filles d'une colonne de valeurs JSON.
+
+        Args:
+            valeurs (pd.Series): Les valeurs JSON.
+        Returns:
+            tuple: Le DataFrame des chemins scalaires et le dictionnaire des tables filles.
+        """
+        objets = self.decoder(valeurs)
+        tables = {}
+        for nom, elements, arbre, noms in self._listes:
+            positions, rangs, enfants = [], [], []
+            for position, objet in enumerate(objets):
+                for rang, element in enumerate(elements(objet)):
+                    positions.append(position)
+                    rangs.append(rang)
+                    enfants.append(element)
+            table = self._tableau(enfants, valeurs.index[positions], arbre, noms)
+            table.insert(0, "rang", rangs)
+            tables[nom] = table
+        return self._tableau(objets, valeurs.index, self._arbre, list(self.chemins)), tables
+
+
+@lru_cache(maxsize=64)
+def _extracteur(chemins: Tuple[Tuple[str, str], ...], types: Tuple[Tuple[str, str], ...]) -> ExtracteurJson:
+    return ExtracteurJson(dict(chemins), types=dict(types))
+
+
+def extraire_chemins(valeurs: pd.Series, chemins: Dict[str, str], types: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Extrait des chemins JSON d'une colonne (voir ExtracteurJson). Les extracteurs sont compilés une fois
+    par ensemble de chemins et réutilisés d'un appel à l'autre.
+
+    Args:
+        valeurs (pd.Series): Les valeurs JSON.
+        chemins (dict): Nom de colonne -> chemin.
+        types (dict): Nom de colonne -> type (voir typer_colonne).
+    Returns:
+        pd.DataFrame: Une colonne par chemin.
+    """
+    return _extracteur(tuple(chemins.items()), tuple((types or {}).items()))(valeurs)
+
+
+def aplatir_champs_imbriques(df: pd.DataFrame, champs=CHAMPS_IMBRIQUES_BODACC, types=TYPES_CHAMPS_BODACC,
+                             cle: str = "id") -> Dict[str, pd.DataFrame]:
+    """
+    Aplatit les champs JSON imbriqués des annonces (listepersonnes, listeetablissements, acte, ...).
+
+    Les champs à objet simple sont ajoutés en colonnes à la table des annonces ; les champs à liste
+    donnent une table fille par champ, reliée aux annonces par la colonne cle. Les colonnes JSON
+    d'origine sont retirées de la table des annonces. Les champs absents du DataFrame sont ignorés.
+
+    Args:
+        df (pd.DataFrame): Les annonces brutes.
+        champs (dict): Champ -> (chemin de la liste ou None, chemins des colonnes).
+        types (dict): Nom de colonne -> type (voir typer_colonne).
+        cle (str): La colonne reliant les tables filles aux annonces.
+    Returns:
+        dict: 'annonces', puis une table fille par champ à liste.
+    """
+    assert cle in df.columns, f"La colonne '{cle}' n'existe pas dans le DataFrame."
+
+    tables = {}
+    colonnes = []
+    for champ, (liste, chemins) in champs.items():
+        if champ not in df.columns:
+            continue
+        if liste is None:
+            colonnes.append(ExtracteurJson(chemins, types=types)(df[champ]))
+            continue
+        # index positionnel : les tables filles sont reliées aux annonces même si l'index n'est pas unique
+        _, enfants = ExtracteurJson(listes={champ: (liste, chemins)}, types=types).extraire(df[champ].reset_index(drop=True))
+        enfant = enfants[champ]
+        enfant.insert(0, cle, df[cle].to_numpy()[enfant.index.to_numpy(dtype=int)])
+        tables[champ] = enfant.reset_index(drop=True)
+
+    annonces = df.drop(columns=[champ for champ in champs if champ in df.columns])
+    return {"annonces": pd.concat([annonces, *colonnes], axis=1), **tables}
+
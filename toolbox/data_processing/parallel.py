@@ -0,0 +1,141 @@
+import os
+import multiprocessing
+import pickle
+import threading
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+from .bodacc_utils import clean_and_extract_ps, siren_des_annonces
+from .chunked import partition_index
+
+
+def _partager(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, int]:
+    """
+    Écrit une partition dans un segment de mémoire partagée : seul le nom du segment est transmis
+    au processus qui la traite, et non la partition elle-même à travers le tube du pool.
+    Le segment doit être libéré par l'appelant (close puis unlink).
+    """
+    donnees = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    segment = shared_memory.SharedMemory(create=True, size=len(donnees))
+    segment.buf[:len(donnees)] = donnees
+    return segment, len(donnees)
+
+
+def _process_partition(nom: str, taille: int, cle):
+    segment = shared_memory.SharedMemory(name=nom)
+    try:
+        with segment.buf[:taille] as vue:
+            df = pickle.loads(vue)
+    finally:
+        segment.close()
+    return clean_and_extract_ps(df, cle=cle)
+
+
+def _processus_multithread() -> bool:
+    # threads système (pools de pyarrow, polars, ...) compris, et pas seulement les threads Python
+    try:
+        return len(os.listdir("/proc/self/task")) > 1
+    except OSError:
+        return threading.active_count() > 1
+
+
+def _methode_de_demarrage() -> str:
+    """
+    Méthode de démarrage des processus : fork si le processus n'a qu'un seul thread, sinon forkserver
+    ou spawn, un fork d'un processus multithread pouvant bloquer les processus fils. En pratique,
+    l'import de pandas suffit souvent à démarrer un thread (allocateur de pyarrow).
+    """
+    methodes = multiprocessing.get_all_start_methods()
+    if "fork" in methodes and not _processus_multithread():
+        return "fork"
+    return "forkserver" if "forkserver" in methodes else "spawn"
+
+
+def _assembler(resultats) -> pd.DataFrame:
+    """
+    Concatène les résultats des partitions. Les partitions vides sont écartées et les colonnes
+    entièrement vides d'une partition prennent le type qu'elles ont dans les autres partitions,
+    comme dans le résultat du traitement en série. La concaténation se fait colonne par colonne,
+    ce qui évite le traitement particulier des blocs vides de pd.concat sur des DataFrames.
+    """
+    non_vides = [resultat for resultat in resultats if not resultat.empty] or resultats[:1]
+    types = {}
+    for resultat in non_vides:
+        for col, dtype in resultat.dtypes.items():
+            if col not in types and resultat[col].notnull().any():
+                types[col] = dtype
+    non_vides = [
+        resultat.astype({
+            col: types[col] for col, dtype in resultat.dtypes.items()
+            if col in types and dtype != types[col] and resultat[col].isnull().all()
+        })
+        for resultat in non_vides
+    ]
+    colonnes = {col: pd.concat([resultat[col] for resultat in non_vides]) for col in non_vides[0].columns}
+    return pd.DataFrame(colonnes, copy=False)
+
+
+def partition_key(df: pd.DataFrame, cle: str = "id") -> pd.Series:
+    """
+    Retourne la clé de partitionnement des annonces brutes : 'id', ou le SIREN calculé comme dans
+    prepare_ps_data (registre, complété par 'listepersonnes'), afin que toutes les annonces d'une
+    même entreprise tombent dans la même partition.
+    """
+    if cle == "SIREN" and "registre" in df.columns:
+        return siren_des_annonces(df)
+    if cle in df.columns:
+        return df[cle]
+    raise KeyError(f"Impossible de partitionner selon '{cle}' : colonne absente du DataFrame.")
+
+
+def clean_and_extract_ps_parallel(df: pd.DataFrame, n_workers: Optional[int] = None, cle: str = "id",
+                                  n_partitions: Optional[int] = None) -> pd.DataFrame:
+    """
+    Exécute clean_and_extract_ps sur plusieurs cœurs.
+
+    Les annonces sont partitionnées par hachage de la clé ('id' ou SIREN), chaque partition est traitée
+    dans un processus distinct, puis les résultats sont réassemblés dans l'ordre des lignes d'entrée :
+    le résultat est identique à celui de clean_and_extract_ps.
+
+    Chaque partition est sérialisée une fois dans un segment de mémoire partagée (voir _partager), que
+    le processus qui la traite relit directement ; les processus sont démarrés par fork si le processus
+    courant n'a qu'un seul thread, par forkserver ou spawn sinon (voir _methode_de_demarrage).
+
+    Args:
+        df (pd.DataFrame): Les annonces brutes.
+        n_workers (int): Le nombre de processus. Par défaut, le nombre de cœurs.
+        cle (str): La colonne de regroupement des statuts ('id' ou 'SIREN').
+        n_partitions (int): Le nombre de partitions. Par défaut, n_workers.
+    Returns:
+        pd.DataFrame: Le DataFrame nettoyé et enrichi, comme clean_and_extract_ps.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    n_partitions = n_partitions or n_workers
+    if n_workers == 1 or len(df) == 0:
+        return clean_and_extract_ps(df, cle=cle)
+
+    # l'index est remplacé par la position des lignes pour réassembler le résultat dans l'ordre d'entrée
+    index = df.index
+    df = df.reset_index(drop=True)
+    partitions = partition_index(partition_key(df, cle), n_partitions)
+    groupes = [groupe for _, groupe in df.groupby(partitions, sort=True)]
+
+    contexte = multiprocessing.get_context(_methode_de_demarrage())
+    segments = []
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=contexte) as executor:
+            taches = []
+            for groupe in groupes:
+                segment, taille = _partager(groupe)
+                segments.append(segment)
+                taches.append(executor.submit(_process_partition, segment.name, taille, cle))
+            resultats = [tache.result() for tache in taches]
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    resultat = _assembler(resultats).sort_index()
+    resultat.index = index
+    return resultat
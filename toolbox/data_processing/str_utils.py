@@ -1,4 +1,10 @@
 import re
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from functools import lru_cache, update_wrapper
+from typing import Optional
 
 corrections_caracteres = {
     "Ã§": "ç",
@@ -57,6 +63,180 @@ corrections_caracteres = {
     "Â": "",  # Souvent résidu vide
 }
 
+# caractères par lesquels commence toute séquence de corrections_caracteres
+MARQUEURS_MOJIBAKE = re.compile(r"[ÃãÂâ]")
+
+
+@lru_cache(maxsize=32)
+def _compiler_table(items):
+    table = dict(items)
+    # alternance triée par longueur décroissante : la plus longue séquence l'emporte ("â€™" avant "â€")
+    pattern = re.compile("|".join(re.escape(mauvais) for mauvais in sorted(table, key=len, reverse=True)))
+    return pattern, table
+
+
+def compiler_corrections(corrections=corrections_caracteres):
+    """
+    Compile un dictionnaire de corrections en une seule expression régulière.
+
+    Le remplacement se fait en une passe, à la plus longue correspondance, au lieu
+    d'un str.replace par entrée du dictionnaire.
+
+    Returns:
+        function: Une fonction qui applique les corrections à une chaîne.
+    """
+    pattern, table = _compiler_table(tuple(corrections.items()))
+    remplacement = lambda match: table[match.group()]
+    return lambda text: pattern.sub(remplacement, text)
+
+
+# taille par défaut du cache entre appels des fonctions de texte du pipeline
+TAILLE_CACHE_TEXTE = 100_000
+
+# au-delà de cette part de valeurs distinctes (sur au moins LIGNES_MIN_CARDINALITE lignes), une série est
+# considérée comme quasi unique : ses valeurs ne sont pas conservées dans le cache entre appels
+SEUIL_CARDINALITE_CACHE = 0.5
+LIGNES_MIN_CARDINALITE = 1000
+
+# fonctions par valeur nommées, suivies par rapport_memoisation
+FONCTIONS_PAR_VALEUR = []
+
+
+class FonctionParValeur:
+    """
+    Transforme une fonction scalaire en fonction de série : l'entrée est factorisée, la fonction
+    n'est évaluée qu'une fois par valeur distincte et les résultats sont replacés sur chaque ligne.
+    Les valeurs manquantes sont conservées telles quelles.
+
+    Un cache borné (LRU) optionnel conserve les résultats d'un appel à l'autre, pour les colonnes
+    traitées bloc par bloc ou annonce par annonce. Le nombre de valeurs distinctes est mesuré à chaque
+    appel : une série quasi unique (noms, compléments de jugement) est traitée sans passer par le cache,
+    qu'elle ne ferait que remplir de valeurs jamais relues.
+
+    Le cache et les compteurs sont propres au processus (les processus de parallel ont chacun les leurs)
+    et protégés par un verrou : des threads peuvent appeler la même fonction, leurs appels sont alors
+    traités l'un après l'autre.
+    """
+
+    def __init__(self, func, cache_size: int = 0, nom: str = None,
+                 seuil_cardinalite: Optional[float] = SEUIL_CARDINALITE_CACHE):
+        """
+        :param func: Fonction scalaire à appliquer.
+        :param cache_size: Nombre maximal de résultats conservés entre les appels (0 : pas de cache, None : illimité).
+        :param nom: Nom de la fonction dans rapport_memoisation. Si absent, la fonction n'est pas suivie.
+        :param seuil_cardinalite: Part maximale de valeurs distinctes d'une série pour utiliser le cache
+            (None : cache toujours utilisé).
+        """
+        update_wrapper(self, func)
+        self.func = func
+        self.cache_size = cache_size
+        self.seuil_cardinalite = seuil_cardinalite
+        self.nom = nom
+        self._cache = OrderedDict()
+        self._verrou = threading.RLock()
+        self.reinitialiser_stats()
+        if nom:
+            FONCTIONS_PAR_VALEUR.append(self)
+
+    def reinitialiser_stats(self):
+        with self._verrou:
+            self.lignes = 0
+            self.valeurs_distinctes = 0
+            self.succes_cache = 0
+            self.calculs = 0
+
+    def vider_cache(self):
+        with self._verrou:
+            self._cache.clear()
+
+    def _calculer(self, valeur):
+        self.calculs += 1
+        return self.func(valeur)
+
+    def _evaluer(self, valeur):
+        try:
+            resultat = self._cache[valeur]
+            self._cache.move_to_end(valeur)
+            self.succes_cache += 1
+            return resultat
+        except KeyError:
+            pass
+        self.calculs += 1
+        resultat = self._cache[valeur] = self.func(valeur)
+        if self.cache_size is not None and len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return resultat
+
+    def _utilise_cache(self, distinctes: int, lignes: int) -> bool:
+        if self.cache_size == 0:
+            return False
+        if self.seuil_cardinalite is None or lignes < LIGNES_MIN_CARDINALITE:
+            return True
+        return distinctes <= self.seuil_cardinalite * lignes
+
+    def __call__(self, series: pd.Series) -> pd.Series:
+        codes, uniques = pd.factorize(series)
+        presents = codes >= 0
+        lignes = int(presents.sum())
+        evaluer = self._evaluer if self._utilise_cache(len(uniques), lignes) else self._calculer
+        resultats = np.empty(len(uniques), dtype=object)
+        with self._verrou:
+            for i, valeur in enumerate(uniques):
+                resultats[i] = evaluer(valeur)
+            self.lignes += lignes
+            self.valeurs_distinctes += len(uniques)
+
+        valeurs = series.to_numpy(dtype=object, copy=True)
+        valeurs[presents] = resultats[codes[presents]]
+        return pd.Series(valeurs, index=series.index, name=series.name)
+
+    def stats(self) -> dict:
+        """
+        Retourne les compteurs d'utilisation : lignes traitées, valeurs distinctes, succès du cache,
+        évaluations de la fonction, et la part des lignes servies sans évaluation (taux_reutilisation).
+        """
+        return {
+            "fonction": self.nom or self.__name__,
+            "lignes": self.lignes,
+            "valeurs_distinctes": self.valeurs_distinctes,
+            "succes_cache": self.succes_cache,
+            "calculs": self.calculs,
+            "taux_reutilisation": 1 - self.calculs / self.lignes if self.lignes else 0.0,
+        }
+
+
+def par_valeur(func=None, *, cache_size: int = 0, nom: str = None,
+               seuil_cardinalite: Optional[float] = SEUIL_CARDINALITE_CACHE):
+    """
+    Décorateur : voir FonctionParValeur. Utilisable avec ou sans arguments
+    (@par_valeur, @par_valeur(cache_size=1000)).
+    """
+    if func is None:
+        return lambda f: FonctionParValeur(f, cache_size=cache_size, nom=nom, seuil_cardinalite=seuil_cardinalite)
+    return FonctionParValeur(func, cache_size=cache_size, nom=nom, seuil_cardinalite=seuil_cardinalite)
+
+
+def rapport_memoisation(reinitialiser: bool = False) -> pd.DataFrame:
+    """
+    Retourne les statistiques des fonctions par valeur du pipeline, une ligne par fonction.
+
+    Args:
+        reinitialiser (bool): Si True, les compteurs sont remis à zéro après lecture.
+    """
+    rapport = pd.DataFrame([fonction.stats() for fonction in FONCTIONS_PAR_VALEUR])
+    if reinitialiser:
+        for fonction in FONCTIONS_PAR_VALEUR:
+            fonction.reinitialiser_stats()
+    return rapport
+
+
+def _appliquer_sur_uniques(series: pd.Series, func) -> pd.Series:
+    """
+    Applique une fonction scalaire une seule fois par valeur distincte d'une série, sans cache ni suivi.
+    Les valeurs manquantes sont conservées telles quelles.
+    """
+    return FonctionParValeur(func)(series)
+
 def clean_chaine(chaine):
     """
     Nettoie une chaine de caractère en :
@@ -96,6 +276,48 @@ def nettoyage_texte(txt):
     return txt.strip().lower()
 
 
+# versions série des fonctions de texte : une évaluation par valeur distincte, avec cache entre appels
+ajouter_espace_series = FonctionParValeur(ajouter_espace, cache_size=TAILLE_CACHE_TEXTE, nom="ajouter_espace")
+nettoyage_texte_series = FonctionParValeur(nettoyage_texte, cache_size=TAILLE_CACHE_TEXTE, nom="nettoyage_texte")
+clean_chaine_series = FonctionParValeur(clean_chaine, cache_size=TAILLE_CACHE_TEXTE, nom="clean_chaine")
+
+
+@par_valeur(nom="normaliser_siren")
+def _normaliser_un_siren(siren):
+    if not isinstance(siren, str):
+        return None
+    siren = "".join(siren.split())
+    return siren.zfill(9) if siren else None
+
+
+def normaliser_siren(siren: pd.Series) -> pd.Series:
+    """
+    Normalise une série de SIREN : suppression de tous les espaces (y compris insécables) et complétion
+    à 9 caractères par des zéros, une seule fois par valeur distincte. Les valeurs vides ou qui ne sont
+    pas des chaînes deviennent manquantes.
+    """
+    return _normaliser_un_siren(siren.astype(object))
+
+
+def siren_invalides(siren: pd.Series) -> pd.Series:
+    """
+    Signale les SIREN mal formés, c'est-à-dire présents mais différents de 9 chiffres.
+    Les valeurs manquantes ne sont pas signalées (voir remove_no_siren_rows).
+    """
+    codes, uniques = pd.factorize(siren.astype(object))
+    invalides_uniques = ~pd.Series(uniques, dtype=object).str.fullmatch(r"\d{9}", na=False).to_numpy(dtype=bool)
+    invalides = np.zeros(len(siren), dtype=bool)
+    presents = codes >= 0
+    invalides[presents] = invalides_uniques[codes[presents]]
+    return pd.Series(invalides, index=siren.index, name=siren.name)
+
+
+# les SIRET des établissements de La Poste (SIREN 356000000) ne respectent pas la clé de Luhn :
+# la somme de leurs chiffres doit être un multiple de 5. Le siège fait exception.
+SIREN_LA_POSTE = "356000000"
+SIRET_SIEGE_LA_POSTE = "35600000000048"
+
+
 def is_valide_siren_siret(numero: str) -> bool:
     """
     Valide un numéro SIREN (9 chiffres) ou SIRET (14 chiffres) à l'aide de l'algorithme de Luhn.
@@ -106,6 +328,9 @@ def is_valide_siren_siret(numero: str) -> bool:
     if not re.fullmatch(r"\d{9}|\d{14}", numero):
         return False
 
+    if len(numero) == 14 and numero.startswith(SIREN_LA_POSTE) and numero != SIRET_SIEGE_LA_POSTE:
+        return sum(map(int, numero)) % 5 == 0
+
     total = 0
     reverse_digits = list(map(int, reversed(numero)))
     for i, digit in enumerate(reverse_digits):
@@ -114,4 +339,53 @@ def is_valide_siren_siret(numero: str) -> bool:
             if digit > 9:
                 digit -= 9
         total += digit
-    return total % 10 == 0
\ No newline at end of file
+    return total % 10 == 0
+
+
+def _matrice_chiffres(numeros: np.ndarray, longueur: int):
+    """
+    Convertit des chaînes de même longueur en une matrice de chiffres (une ligne par numéro),
+    et retourne aussi le masque des lignes ne contenant que des chiffres ASCII.
+    """
+    # un caractère non ASCII est remplacé par '?' pour conserver un octet par caractère
+    octets = "".join(numeros).encode("ascii", errors="replace")
+    chiffres = np.frombuffer(octets, dtype=np.uint8).reshape(-1, longueur).astype(np.int16) - ord("0")
+    return chiffres, ((chiffres >= 0) & (chiffres <= 9)).all(axis=1)
+
+
+def valider_siren_siret(numeros: pd.Series) -> pd.Series:
+    """
+    Version vectorisée de is_valide_siren_siret : valide une série de SIREN (9 chiffres) et de
+    SIRET (14 chiffres) avec l'algorithme de Luhn, calculé par NumPy sur une matrice de chiffres.
+    Les SIRET des établissements de La Poste sont validés par la somme de leurs chiffres (multiple de 5).
+
+    Args:
+        numeros (pd.Series): Les numéros à valider.
+    Returns:
+        pd.Series: Un masque booléen, False pour les valeurs manquantes ou mal formées
+            (seuls les chiffres ASCII sont acceptés).
+    """
+    valeurs = numeros.to_numpy(dtype=object)
+    longueurs = np.fromiter((len(v) if isinstance(v, str) else 0 for v in valeurs), dtype=np.int64, count=len(valeurs))
+    valides = np.zeros(len(valeurs), dtype=bool)
+
+    for longueur in (9, 14):
+        lignes = np.flatnonzero(longueurs == longueur)
+        if len(lignes) == 0:
+            continue
+        chiffres, bien_formes = _matrice_chiffres(valeurs[lignes], longueur)
+
+        # Luhn : un chiffre sur deux en partant de la droite est doublé (et réduit de 9 s'il dépasse 9)
+        doubles = (longueur - 1 - np.arange(longueur)) % 2 == 1
+        ponderes = np.where(doubles, chiffres * 2, chiffres)
+        ponderes = np.where(ponderes > 9, ponderes - 9, ponderes)
+        luhn = ponderes.sum(axis=1) % 10 == 0
+
+        if longueur == 14:
+            la_poste = (chiffres[:, :9] == np.array(list(SIREN_LA_POSTE), dtype=np.int16)).all(axis=1)
+            la_poste &= valeurs[lignes] != SIRET_SIEGE_LA_POSTE
+            luhn = np.where(la_poste, chiffres.sum(axis=1) % 5 == 0, luhn)
+
+        valides[lignes] = bien_formes & luhn
+
+    return pd.Series(valides, index=numeros.index, name=numeros.name)
@@ -0,0 +1,153 @@
+import pandas as pd
+from typing import Iterable, Iterator, Optional, Union
+from .bodacc_utils import extract_siren_from_registre, rename_columns
+from .chunked import iter_chunks
+from .date_utils import clean_dates
+from .dtype_utils import sans_effet_de_bord
+from .json_utils import (
+    CHAMPS_IMBRIQUES_BODACC, CHEMINS_ACTE, CHEMINS_DEPOT, CHEMINS_ETABLISSEMENT, CHEMINS_MODIFICATIONS,
+    CHEMINS_PERSONNE, ExtracteurJson,
+)
+from .str_utils import clean_chaine
+
+
+# nombre d'annonces traitées par bloc
+TAILLE_BLOC_VC = 100_000
+
+# champ imbriqué -> colonnes retenues pour les ventes et cessions, parmi les chemins de json_utils
+SELECTION_VENTE_CESSION = {
+    "listepersonnes": (CHEMINS_PERSONNE, ("siren", "type_personne", "denomination", "nom", "prenom", "forme_juridique", "greffe")),
+    "listeetablissements": (CHEMINS_ETABLISSEMENT, ("origine_fonds", "qualite_etablissement", "activite", "enseigne")),
+    "acte": (CHEMINS_ACTE, tuple(CHEMINS_ACTE)),
+    "depot": (CHEMINS_DEPOT, ("type_depot", "date_cloture")),
+    "modificationsgenerales": (CHEMINS_MODIFICATIONS, tuple(CHEMINS_MODIFICATIONS)),
+}
+
+# colonnes renommées en sortie (le SIREN de la personne complète celui du registre)
+RENOMMAGES_VENTE_CESSION = {"siren": "siren_personne"}
+
+
+def _chemins_vente_cession(champ: str) -> dict:
+    # chemins depuis la racine du champ : ceux d'un élément de liste sont préfixés par son chemin
+    element, _ = CHAMPS_IMBRIQUES_BODACC[champ]
+    chemins, colonnes = SELECTION_VENTE_CESSION[champ]
+    return {
+        RENOMMAGES_VENTE_CESSION.get(col, col): f"{element}.{chemins[col]}" if element else chemins[col]
+        for col in colonnes
+    }
+
+
+# champ imbriqué -> colonnes extraites (chemins scalaires : premier élément des listes)
+COLONNES_VENTE_CESSION = {champ: _chemins_vente_cession(champ) for champ in SELECTION_VENTE_CESSION}
+
+# extracteurs compilés une fois pour toutes les annonces
+_EXTRACTEURS_VENTE_CESSION = {
+    champ: ExtracteurJson(chemins, types={"siren_personne": "siren"})
+    for champ, chemins in COLONNES_VENTE_CESSION.items()
+}
+
+
+def extract_vc_nested_fields(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Extrait les champs imbriqués des ventes et cessions (personne, établissement, acte, dépôt,
+    modifications) en colonnes, avec un seul décodage JSON par valeur. Les colonnes JSON d'origine
+    sont retirées ; les champs absents du DataFrame donnent des colonnes vides.
+
+    Args:
+        df (pd.DataFrame): Les annonces brutes.
+    Returns:
+        pd.DataFrame: Les annonces avec les colonnes extraites.
+    """
+    colonnes = {}
+    for champ, extracteur in _EXTRACTEURS_VENTE_CESSION.items():
+        valeurs = df[champ] if champ in df.columns else pd.Series(None, index=df.index, dtype=object)
+        extraites = extracteur(valeurs)
+        colonnes.update({col: extraites[col] for col in extraites.columns})
+
+    df = df.drop(columns=[champ for champ in COLONNES_VENTE_CESSION if champ in df.columns])
+    return df.assign(**colonnes)
+
+
+def siren_vente_cession(df: pd.DataFrame) -> pd.Series:
+    """
+    SIREN des ventes et cessions : celui du registre, complété par le numéro d'immatriculation
+    de la personne (colonne 'siren_personne' de extract_vc_nested_fields).
+    """
+    siren = extract_siren_from_registre(df["registre"]) if "registre" in df.columns else df["siren_personne"]
+    manquants = siren.isnull() | (siren == "")
+    return siren.where(~manquants, df["siren_personne"])
+
+
+@sans_effet_de_bord
+def prepare_vc_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Étapes du pipeline des ventes et cessions pour un bloc d'annonces : extraction des champs
+    imbriqués, SIREN, nettoyage des dates et dédoublonnage par 'id'.
+
+    Args:
+        df (pd.DataFrame): Les annonces brutes.
+    Returns:
+        pd.DataFrame: Les annonces nettoyées, au format de sortie de clean_and_extract_vc.
+    """
+    assert "id" in df.columns, "La colonne 'id' n'existe pas dans le DataFrame."
+
+    df = df.drop_duplicates("id")
+    df = extract_vc_nested_fields(df)
+    df["SIREN"] = siren_vente_cession(df)
+    df = df.drop(columns=[col for col in ("registre", "siren_personne") if col in df.columns])
+    df = clean_dates(df)
+    df = rename_columns(df)
+    df.columns = df.columns.map(clean_chaine)
+    return df
+
+
+def iter_clean_and_extract_vc(source: Union[str, pd.DataFrame, Iterable[pd.DataFrame]], chunksize: int = TAILLE_BLOC_VC,
+                              read_csv_kwargs: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+    """
+    Pipeline des ventes et cessions, bloc par bloc : la mémoire utilisée est bornée par la taille des blocs.
+    Une annonce déjà vue dans un bloc précédent (même 'id') est ignorée.
+
+    Args:
+        source: Un DataFrame, le chemin d'un fichier CSV ou un itérable de DataFrames.
+        chunksize (int): Le nombre d'annonces par bloc.
+        read_csv_kwargs (dict): Arguments supplémentaires pour pd.read_csv.
+    Yields:
+        pd.DataFrame: Les annonces nettoyées de chaque bloc non vide.
+    """
+    if isinstance(source, pd.DataFrame):
+        df = source
+        source = (df.iloc[debut:debut + chunksize] for debut in range(0, len(df), chunksize))
+
+    vus = set()
+    for chunk in iter_chunks(source, chunksize, read_csv_kwargs):
+        chunk = chunk[~chunk["id"].isin(vus)]
+        if chunk.empty:
+            continue
+        resultat = prepare_vc_data(chunk)
+        vus.update(resultat["id"].tolist())
+        yield resultat
+
+
+def clean_and_extract_vc(source: Union[str, pd.DataFrame, Iterable[pd.DataFrame]], chunksize: int = TAILLE_BLOC_VC,
+                         output_path: Optional[str] = None, read_csv_kwargs: Optional[dict] = None) -> Union[pd.DataFrame, str]:
+    """
+    Pipeline de nettoyage et d'extraction des ventes et cessions (voir iter_clean_and_extract_vc).
+
+    Args:
+        source: Un DataFrame, le chemin d'un fichier CSV ou un itérable de DataFrames.
+        chunksize (int): Le nombre d'annonces par bloc.
+        output_path (str): Si fourni, chaque bloc est ajouté à ce fichier CSV au lieu d'être gardé en mémoire.
+        read_csv_kwargs (dict): Arguments supplémentaires pour pd.read_csv.
+    Returns:
+        pd.DataFrame | str: Le DataFrame complet, ou le chemin du fichier CSV écrit.
+    """
+    blocs = iter_clean_and_extract_vc(source, chunksize, read_csv_kwargs)
+    if output_path is None:
+        resultats = list(blocs)
+        return pd.concat(resultats) if resultats else pd.DataFrame()
+
+    premier = True
+    for bloc in blocs:
+        bloc.to_csv(output_path, mode="w" if premier else "a", header=premier, index=False)
+        premier = False
+    return output_path
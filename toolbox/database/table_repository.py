@@ -166,11 +166,9 @@ class TableRepository:
         if not isinstance(df, pd.DataFrame):
             raise ValueError("L'argument 'df' doit être un pandas DataFrame.")
         
-        df = df.copy()
+        # sélection des colonnes de la table : nouveau DataFrame, sans copie préalable ni modification de l'argument
         table_columns = self.get_columns()
-        for col in df.columns:
-            if col not in table_columns:
-                df = df.drop(columns=col)
+        df = df[[col for col in df.columns if col in table_columns]]
         df = df.fillna(null())
 
         stmt = insert(self.table).values(df.to_dict(orient='records'))
@@ -1 +1,3 @@
-from .bodacc_schemas import *
\ No newline at end of file
+from .bodacc_schemas import *
+from .record_batch import *
+from .validation import *
\ No newline at end of file
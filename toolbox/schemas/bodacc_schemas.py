@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
+from .record_batch import RecordBatch
 
 
 
-@dataclass
+@dataclass(slots=True)
 class UnProcessedProcedureCollective:
     """
     Représente une procédure collective non traitée.
@@ -50,7 +51,7 @@ class UnProcessedProcedureCollective:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessedProcedureCollective:
     """
     Représente une procédure collective traitée.
@@ -58,7 +59,7 @@ class ProcessedProcedureCollective:
     Les champs sont basés sur les colonnes de la table "annonces commerciales" de l'API BODACC.
     Les champs optionnels sont utilisés pour les données qui peuvent ne pas être présentes dans toutes les annonces.
     """
-    # id,date_parution,numero_departement,raison_sociale,jugement,numero_annonce,siren,date,complement_jugement,type,famille,nature,date_plan_continuation,date_plan_redressement,date_plan_sauvegarde,date_ouverture_une_procedure_sauvegarde,date_modification_plan_redressement,date_ouverture_liquidation_judiciaire,date_mettant_fin_procedure_redressement_judiciaire,date_conversion_en_redressement_judiciaire_procedure,date_extension_procedure_redressement_judiciaire,date_prononcant_resolution_plan_redressement,date_ouverture_procedure_redressement,date_modification_plan_sauvegarde,arret_cour_appel,date_prevue_fin_redressement,date_prevue_fin_sauvegarde
+    # id,date_parution,numero_departement,raison_sociale,jugement,numero_annonce,siren,siren_invalide,date,complement_jugement,type,famille,nature,date_plan_continuation,date_plan_redressement,date_plan_sauvegarde,date_ouverture_une_procedure_sauvegarde,date_modification_plan_redressement,date_ouverture_liquidation_judiciaire,date_mettant_fin_procedure_redressement_judiciaire,date_conversion_en_redressement_judiciaire_procedure,date_extension_procedure_redressement_judiciaire,date_prononcant_resolution_plan_redressement,date_ouverture_procedure_redressement,date_modification_plan_sauvegarde,arret_cour_appel,date_prevue_fin_redressement,date_prevue_fin_sauvegarde
 
     id: Optional[str] = None
     date_parution: Optional[str] = None
@@ -67,6 +68,7 @@ class ProcessedProcedureCollective:
     jugement: Optional[str] = None
     numero_annonce: Optional[str] = None
     siren: Optional[str] = None
+    siren_invalide: Optional[bool] = None
     date: Optional[str] = None
     complement_jugement: Optional[str] = None
     type: Optional[str] = None
@@ -88,7 +90,7 @@ class ProcessedProcedureCollective:
     date_prevue_fin_redressement: Optional[str] = None
     date_prevue_fin_sauvegarde: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class UnProcessedVenteCession:
     """
     Représente une vente ou cession. 
@@ -173,19 +175,89 @@ class UnProcessedVenteCession:
             parutionavisprecedent=row.get('parutionavisprecedent')
         )
     
-@dataclass
+@dataclass(slots=True)
 class ProcessedVenteCession:
     """
     Représente une vente ou cession traitée.
     Cette classe est utilisée pour stocker les données d'une vente ou cession après traitement.
-    Les champs sont basés sur les colonnes de la table "annonces commerciales" de l'API BODACC.
+    Les champs correspondent aux colonnes de sortie de clean_and_extract_vc.
     """
-    id: str
-    date_parution: str
-    numero_departement: str
-    raison_sociale: str
-    jugement: str
-    numero_annonce: str
-    siren: str
-    date: str
-    complement_jugement: Optional[str] = None
\ No newline at end of file
+    id: Optional[str] = None
+    date_parution: Optional[str] = None
+    numero_annonce: Optional[str] = None
+    numero_departement: Optional[str] = None
+    typeavis: Optional[str] = None
+    typeavis_lib: Optional[str] = None
+    familleavis: Optional[str] = None
+    familleavis_lib: Optional[str] = None
+    departement_nom_officiel: Optional[str] = None
+    region_code: Optional[str] = None
+    region_nom_officiel: Optional[str] = None
+    tribunal: Optional[str] = None
+    raison_sociale: Optional[str] = None
+    ville: Optional[str] = None
+    cp: Optional[str] = None
+    siren: Optional[str] = None
+    type_personne: Optional[str] = None
+    denomination: Optional[str] = None
+    nom: Optional[str] = None
+    prenom: Optional[str] = None
+    forme_juridique: Optional[str] = None
+    greffe: Optional[str] = None
+    origine_fonds: Optional[str] = None
+    qualite_etablissement: Optional[str] = None
+    activite: Optional[str] = None
+    enseigne: Optional[str] = None
+    categorie_vente: Optional[str] = None
+    date_effet_vente: Optional[str] = None
+    date_immatriculation: Optional[str] = None
+    date_commencement_activite: Optional[str] = None
+    descriptif_acte: Optional[str] = None
+    type_depot: Optional[str] = None
+    date_cloture: Optional[str] = None
+    descriptif_modification: Optional[str] = None
+
+
+# --- Lots colonnaires : un tableau par champ au lieu d'un objet par enregistrement ---
+
+def _premier_registre(registre):
+    # premier identifiant du registre, comme UnProcessedProcedureCollective.from_dict
+    if isinstance(registre, (list, tuple)) or hasattr(registre, "__array__"):
+        return registre[0] if len(registre) > 0 else None
+    return None
+
+
+class UnProcessedProcedureCollectiveBatch(RecordBatch):
+    """
+    Lot colonnaire de procédures collectives non traitées.
+    Comme dans from_dict, le SIREN est le premier identifiant du registre lorsque celui-ci est fourni.
+    """
+    schema = UnProcessedProcedureCollective
+
+    @classmethod
+    def _deriver(cls, columns: Dict[str, Any]) -> Dict[str, Any]:
+        registres = columns.get("registre")
+        if registres is not None:
+            columns["SIREN"] = [_premier_registre(registre) for registre in registres]
+        return columns
+
+
+class ProcessedProcedureCollectiveBatch(RecordBatch):
+    """
+    Lot colonnaire de procédures collectives traitées.
+    """
+    schema = ProcessedProcedureCollective
+
+
+class UnProcessedVenteCessionBatch(RecordBatch):
+    """
+    Lot colonnaire de ventes et cessions non traitées.
+    """
+    schema = UnProcessedVenteCession
+
+
+class ProcessedVenteCessionBatch(RecordBatch):
+    """
+    Lot colonnaire de ventes et cessions traitées.
+    """
+    schema = ProcessedVenteCession
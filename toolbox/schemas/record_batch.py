@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from dataclasses import fields
+from itertools import repeat
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    # lots Arrow (pyarrow.RecordBatch / pyarrow.Table), optionnels
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def _tableau_objets(valeurs, taille: int) -> np.ndarray:
+    # tableau d'objets construit sans inférence (les listes restent des valeurs, pas une dimension)
+    return np.fromiter(valeurs, dtype=object, count=taille)
+
+
+class RecordBatch:
+    """
+    Lot d'enregistrements stocké par colonnes : un tableau par champ du schéma, au lieu d'un objet
+    Python par enregistrement. Les sous-classes fixent le schéma (une dataclass) dans l'attribut 'schema'.
+
+    Les constructeurs en masse (from_records, from_dataframe, from_arrow) remplissent les colonnes
+    en une passe par champ ; to_dataframe retourne un DataFrame qui partage les tableaux du lot, sans copie.
+    Les enregistrements ne sont instanciés qu'à la demande (indexation, itération).
+    """
+
+    schema = None
+
+    def __init__(self, columns: Dict[str, Any], length: Optional[int] = None):
+        assert self.schema is not None, "RecordBatch doit être sous-classé avec un schéma."
+        noms = self.get_fields()
+        if length is None:
+            length = len(next(iter(columns.values()))) if columns else 0
+        self.columns = {}
+        for nom in noms:
+            valeurs = columns.get(nom)
+            if valeurs is None:
+                valeurs = np.full(length, None, dtype=object)
+            if len(valeurs) != length:
+                raise ValueError(f"La colonne '{nom}' contient {len(valeurs)} valeurs au lieu de {length}.")
+            if not isinstance(valeurs, (np.ndarray, pd.api.extensions.ExtensionArray)):
+                valeurs = _tableau_objets(valeurs, length)
+            self.columns[nom] = valeurs
+        self._length = length
+
+    @classmethod
+    def get_fields(cls) -> List[str]:
+        """
+        Retourne la liste des champs du schéma.
+        """
+        return [champ.name for champ in fields(cls.schema)]
+
+    @classmethod
+    def _deriver(cls, columns: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Calcule les champs dérivés d'autres champs (équivalent colonnaire de from_dict). Sans effet par défaut.
+        """
+        return columns
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "RecordBatch":
+        """
+        Construit un lot à partir d'une liste de dictionnaires (lignes de résultat SQL, réponses de l'API).
+        Les clés absentes donnent None ; les clés hors schéma sont ignorées.
+        """
+        taille = len(records)
+        if all(isinstance(record, dict) for record in records):
+            # accès direct à dict.get, sans appel de méthode par enregistrement
+            colonnes = {nom: _tableau_objets(map(dict.get, records, repeat(nom)), taille) for nom in cls.get_fields()}
+        else:
+            # autres correspondances (lignes SQLAlchemy, ...)
+            colonnes = {nom: _tableau_objets((record.get(nom) for record in records), taille) for nom in cls.get_fields()}
+        return cls(cls._deriver(colonnes), taille)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "RecordBatch":
+        """
+        Construit un lot à partir d'un DataFrame. Les colonnes du schéma sont reprises sans copie
+        lorsque c'est possible ; les colonnes absentes donnent None.
+        """
+        # tableaux NumPy (vues) ou tableaux d'extension (chaînes Arrow, catégories) tels quels
+        colonnes = {nom: df[nom].to_numpy() if isinstance(df[nom].dtype, np.dtype) else df[nom].array
+                    for nom in cls.get_fields() if nom in df.columns}
+        return cls(cls._deriver(colonnes), len(df))
+
+    @classmethod
+    def from_arrow(cls, batch) -> "RecordBatch":
+        """
+        Construit un lot à partir d'un pyarrow.RecordBatch ou d'une pyarrow.Table. Les colonnes numériques
+        sans valeur manquante sont reprises sans copie ; les autres sont converties en tableaux NumPy.
+        """
+        if pa is None:
+            raise ImportError("pyarrow n'est pas installé (pip install pyarrow).")
+        noms = set(batch.schema.names)
+        colonnes = {nom: batch.column(nom).to_numpy(zero_copy_only=False) for nom in cls.get_fields() if nom in noms}
+        return cls(cls._deriver(colonnes), batch.num_rows)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Retourne le lot sous forme de DataFrame, sans copie des colonnes.
+        """
+        return pd.DataFrame(self.columns, columns=self.get_fields(), copy=False)
+
+    def to_records(self) -> List[Any]:
+        """
+        Instancie tous les enregistrements du lot (objets du schéma).
+        """
+        return list(self)
+
+    def valider(self):
+        """
+        Convertit et valide le lot selon son schéma (voir validation.ValidateurSchema).
+        """
+        from .validation import validateur
+        return validateur(self.schema)(self)
+
+    def column(self, nom: str):
+        """
+        Retourne le tableau d'un champ.
+        """
+        return self.columns[nom]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, position: int):
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError("Position hors du lot.")
+        return self.schema(**{nom: valeurs[position] for nom, valeurs in self.columns.items()})
+
+    def __iter__(self) -> Iterator[Any]:
+        noms = list(self.columns)
+        for valeurs in zip(*self.columns.values()):
+            yield self.schema(**dict(zip(noms, valeurs)))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._length} enregistrements, schéma {self.schema.__name__})"
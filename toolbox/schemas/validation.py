@@ -0,0 +1,233 @@
+import re
+import numpy as np
+import pandas as pd
+from dataclasses import MISSING, dataclass, fields
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, get_args
+from ..data_processing.date_utils import parse_dates
+from ..data_processing.str_utils import normaliser_siren, valider_siren_siret
+
+
+# type de validation des champs dont le nom ne suffit pas à déduire le type
+TYPES_PAR_CHAMP = {
+    "SIREN": "siren",
+    "siren": "siren",
+    "numerodepartement": "departement",
+    "numero_departement": "departement",
+    "numeroannonce": "entier",
+    "numero_annonce": "entier",
+    "cp": "code_postal",
+    "arret_cour_appel": "date",
+    "siren_invalide": "booleen",
+}
+
+# type -> motif que doivent respecter les valeurs converties en texte
+MOTIFS_PAR_TYPE = {
+    "siren": re.compile(r"\d{9}"),
+    "departement": re.compile(r"\d{2,3}|2[AB]"),
+    "code_postal": re.compile(r"\d{5}"),
+    "entier": re.compile(r"\d+"),
+}
+
+COLONNES_ERREURS = ["ligne", "champ", "valeur", "motif"]
+
+
+def type_du_champ(nom: str, annotation) -> str:
+    """
+    Retourne le type de validation d'un champ de schéma :
+        - 'any' pour les champs annotés Any (valeurs conservées telles quelles, sans contrôle)
+        - le type de TYPES_PAR_CHAMP s'il est défini, 'date' si le nom contient 'date'
+        - 'str' sinon
+    """
+    if annotation is Any or Any in get_args(annotation):
+        return "any"
+    if nom in TYPES_PAR_CHAMP:
+        return TYPES_PAR_CHAMP[nom]
+    if "date" in nom.lower():
+        return "date"
+    return "str"
+
+
+def _en_texte_uniques(valeurs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # conversion en texte des valeurs distinctes : les entiers (et flottants entiers) deviennent des chaînes,
+    # les autres types (listes, dictionnaires, ...) sont invalides
+    textes = np.empty(len(valeurs), dtype=object)
+    invalides = np.zeros(len(valeurs), dtype=bool)
+    for i, valeur in enumerate(valeurs):
+        if isinstance(valeur, str):
+            textes[i] = valeur
+        elif isinstance(valeur, (int, np.integer)) and not isinstance(valeur, (bool, np.bool_)):
+            textes[i] = str(valeur)
+        elif isinstance(valeur, (float, np.floating)) and float(valeur).is_integer():
+            textes[i] = str(int(valeur))
+        else:
+            invalides[i] = True
+    return textes, invalides
+
+
+def _convertir_texte(serie: pd.Series, type_champ: str) -> Tuple[pd.Series, List[Tuple[pd.Series, str]]]:
+    """
+    Convertit une colonne en texte et vérifie le motif de son type, une fois par valeur distincte.
+    Les SIREN bien formés sont aussi vérifiés par leur clé de Luhn (voir valider_siren_siret).
+
+    Returns:
+        tuple: La colonne convertie et les masques des valeurs invalides, avec leur motif ('type', 'format' ou 'cle').
+    """
+    try:
+        codes, uniques = pd.factorize(serie)
+        uniques = np.asarray(uniques, dtype=object)
+    except TypeError:
+        # valeurs non hachables : chaque valeur est sa propre valeur distincte
+        codes, uniques = np.arange(len(serie)), serie.to_numpy(dtype=object)
+        codes[serie.isnull().to_numpy()] = -1
+
+    textes, mauvais_type = _en_texte_uniques(uniques)
+    hors_motif = np.zeros(len(uniques), dtype=bool)
+    if type_champ == "siren":
+        textes = np.where(mauvais_type, None, normaliser_siren(pd.Series(textes, dtype=object)).to_numpy(dtype=object))
+    if type_champ in MOTIFS_PAR_TYPE:
+        motif = MOTIFS_PAR_TYPE[type_champ]
+        hors_motif = np.array([texte is not None and not motif.fullmatch(texte) for texte in textes], dtype=bool)
+    mauvaise_cle = np.zeros(len(uniques), dtype=bool)
+    if type_champ == "siren":
+        bien_formes = np.array([texte is not None for texte in textes], dtype=bool) & ~hors_motif
+        mauvaise_cle = bien_formes & ~valider_siren_siret(pd.Series(textes, dtype=object)).to_numpy()
+
+    # les valeurs manquantes (code -1) prennent la dernière position : None, valide
+    def par_ligne(tableau, manquant):
+        return np.append(tableau, manquant)[codes]
+
+    invalides = [(pd.Series(par_ligne(masque, False), index=serie.index), motif)
+                 for masque, motif in ((mauvais_type, "type"), (hors_motif, "format"), (mauvaise_cle, "cle")) if masque.any()]
+    return pd.Series(par_ligne(textes, None), index=serie.index, name=serie.name, dtype=object), invalides
+
+
+def _convertir_date(serie: pd.Series) -> Tuple[pd.Series, List[Tuple[pd.Series, str]]]:
+    try:
+        dates, non_reconnues = parse_dates(serie)
+    except TypeError:
+        # valeurs non hachables : seules les valeurs scalaires sont converties
+        scalaires = serie.map(lambda valeur: valeur if pd.api.types.is_scalar(valeur) else None)
+        dates, invalides = _convertir_date(scalaires)
+        return dates, [(serie.notnull() & scalaires.isnull(), "type")] + invalides
+    if not non_reconnues:
+        return dates, []
+    return dates, [(serie.isin(non_reconnues), "date")]
+
+
+def _convertir_booleen(serie: pd.Series) -> Tuple[pd.Series, List[Tuple[pd.Series, str]]]:
+    booleens = serie.astype(object).where(serie.notnull(), None)
+    mauvais_type = serie.notnull() & ~serie.map(lambda valeur: isinstance(valeur, (bool, np.bool_)))
+    return booleens, [(mauvais_type, "type")] if mauvais_type.any() else []
+
+
+@dataclass
+class ResultatValidation:
+    """
+    Résultat de la validation d'un lot : les données converties et les erreurs, une ligne par
+    (enregistrement, champ) invalide. Les valeurs invalides sont remplacées par des valeurs manquantes.
+    """
+    donnees: pd.DataFrame
+    erreurs: pd.DataFrame
+
+    @property
+    def valide(self) -> bool:
+        return self.erreurs.empty
+
+    @property
+    def lignes_invalides(self) -> pd.Index:
+        """
+        Index des enregistrements ayant au moins une erreur.
+        """
+        return pd.Index(self.erreurs["ligne"].unique())
+
+    def lignes_valides(self) -> pd.DataFrame:
+        """
+        Les enregistrements sans erreur.
+        """
+        return self.donnees[~self.donnees.index.isin(self.lignes_invalides)]
+
+
+class ValidateurSchema:
+    """
+    Convertisseur et validateur d'un schéma (dataclass), compilé une fois à partir des champs :
+    type de validation (voir type_du_champ) et caractère obligatoire (champ sans valeur par défaut).
+
+    La validation s'applique à un lot entier, colonne par colonne et une fois par valeur distincte :
+    aucune exception n'est levée par enregistrement, les erreurs sont rapportées dans un DataFrame.
+    """
+
+    def __init__(self, schema, types: Optional[Dict[str, str]] = None):
+        self.schema = schema
+        self.champs = [
+            (
+                champ.name,
+                (types or {}).get(champ.name) or type_du_champ(champ.name, champ.type),
+                champ.default is MISSING and champ.default_factory is MISSING,
+            )
+            for champ in fields(schema)
+        ]
+
+    def _convertisseur(self, type_champ: str) -> Callable:
+        if type_champ == "date":
+            return _convertir_date
+        if type_champ == "booleen":
+            return _convertir_booleen
+        return lambda serie: _convertir_texte(serie, type_champ)
+
+    def valider(self, donnees: Union[pd.DataFrame, List[Dict[str, Any]], Any]) -> ResultatValidation:
+        """
+        Convertit et valide un lot d'enregistrements.
+
+        Args:
+            donnees: Un DataFrame, une liste de dictionnaires ou un RecordBatch. Les colonnes hors schéma sont ignorées.
+        Returns:
+            ResultatValidation: Les données converties (colonnes du schéma, dans l'ordre) et les erreurs.
+        """
+        if hasattr(donnees, "to_dataframe"):
+            donnees = donnees.to_dataframe()
+        elif not isinstance(donnees, pd.DataFrame):
+            donnees = pd.DataFrame(list(donnees))
+
+        colonnes, erreurs = {}, []
+        for nom, type_champ, obligatoire in self.champs:
+            serie = donnees[nom] if nom in donnees.columns else pd.Series(None, index=donnees.index, dtype=object, name=nom)
+            if type_champ != "any":
+                manquants = serie.isnull()
+                serie, invalides = self._convertisseur(type_champ)(serie)
+                for masque, motif in invalides:
+                    erreurs.append(self._erreurs(donnees, nom, masque, motif))
+                    serie = serie.mask(masque, None)
+                if obligatoire and manquants.any():
+                    erreurs.append(self._erreurs(donnees, nom, manquants, "obligatoire"))
+            colonnes[nom] = serie
+
+        erreurs = pd.concat(erreurs, ignore_index=True) if erreurs else pd.DataFrame(columns=COLONNES_ERREURS)
+        return ResultatValidation(pd.DataFrame(colonnes, index=donnees.index), erreurs)
+
+    __call__ = valider
+
+    @staticmethod
+    def _erreurs(donnees: pd.DataFrame, nom: str, masque: pd.Series, motif: str) -> pd.DataFrame:
+        masque = masque.to_numpy(dtype=bool)
+        if nom in donnees.columns:
+            valeurs = donnees[nom].to_numpy(dtype=object)[masque]
+        else:
+            valeurs = np.full(masque.sum(), None, dtype=object)
+        return pd.DataFrame({"ligne": donnees.index[masque], "champ": nom, "valeur": valeurs, "motif": motif},
+                            columns=COLONNES_ERREURS)
+
+
+@lru_cache(maxsize=None)
+def validateur(schema) -> ValidateurSchema:
+    """
+    Retourne le validateur compilé d'un schéma (compilé au premier appel, puis réutilisé).
+    """
+    return ValidateurSchema(schema)
+
+
+def valider(donnees, schema) -> ResultatValidation:
+    """
+    Convertit et valide un lot d'enregistrements selon un schéma (voir ValidateurSchema).
+    """
+    return validateur(schema)(donnees)
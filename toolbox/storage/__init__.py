@@ -0,0 +1,3 @@
+from .arrow_schemas import *
+from .parquet_lake import *
+from .result_cache import *
\ No newline at end of file
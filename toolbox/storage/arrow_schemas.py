@@ -0,0 +1,81 @@
+import pandas as pd
+import pyarrow as pa
+from dataclasses import fields
+from functools import lru_cache
+from ..data_processing.date_utils import parse_dates
+from ..schemas.validation import _convertir_texte, type_du_champ
+
+
+# type de validation (voir schemas.validation.type_du_champ) -> type Arrow
+TYPES_ARROW = {
+    "date": pa.timestamp("ns"),
+    "siren": pa.string(),
+    "departement": pa.string(),
+    "code_postal": pa.string(),
+    "entier": pa.string(),
+    "str": pa.string(),
+    "booleen": pa.bool_(),
+}
+
+
+@lru_cache(maxsize=None)
+def schema_arrow(schema, dates_en_texte: bool = False) -> pa.Schema:
+    """
+    Schéma Arrow dérivé d'un schéma (dataclass) de bodacc_schemas : les dates en timestamp, les indicateurs
+    en booléens, les identifiants et les textes en chaînes. Les champs annotés Any (listes, JSON) ne sont
+    pas typés : leur type est déduit des données.
+
+    Avec dates_en_texte, les dates restent des chaînes : les données brutes sont conservées telles que
+    publiées, y compris les dates que parse_dates ne reconnaît pas.
+    """
+    types = {**TYPES_ARROW, "date": pa.string()} if dates_en_texte else TYPES_ARROW
+    return pa.schema([
+        pa.field(champ.name, types[type_champ])
+        for champ in fields(schema)
+        if (type_champ := type_du_champ(champ.name, champ.type)) in types
+    ])
+
+
+def _colonne_typee(serie: pd.Series, type_arrow: pa.DataType) -> pd.Series:
+    if pa.types.is_timestamp(type_arrow):
+        dates, non_reconnues = parse_dates(serie)
+        if non_reconnues:
+            raise ValueError(f"La colonne '{serie.name}' contient des dates non reconnues : {non_reconnues[:5]}.")
+        return dates
+    if pa.types.is_boolean(type_arrow):
+        return serie
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        # dates déjà converties d'une colonne conservée en texte : format ISO
+        serie = serie.dt.strftime("%Y-%m-%dT%H:%M:%S")
+    if serie.dtype != object:
+        serie = serie.astype(object).where(serie.notnull(), None)
+    textes, invalides = _convertir_texte(serie, "str")
+    if invalides:
+        raise ValueError(f"La colonne '{serie.name}' contient des valeurs qui ne sont pas des chaînes.")
+    return textes
+
+
+def vers_table_arrow(df: pd.DataFrame, schema=None, dates_en_texte: bool = False) -> pa.Table:
+    """
+    Convertit un DataFrame en table Arrow. Les colonnes du schéma (dataclass) reçoivent le type
+    de schema_arrow (dates analysées, identifiants numériques convertis en texte), y compris lorsqu'elles
+    sont entièrement vides ; le type des autres colonnes est déduit des données. L'index n'est pas conservé.
+
+    Args:
+        df (pd.DataFrame): Le DataFrame à convertir.
+        schema: Le schéma (dataclass) des données, ou None pour déduire tous les types.
+        dates_en_texte (bool): Si True, les dates sont conservées en chaînes (voir schema_arrow).
+    Returns:
+        pa.Table: La table Arrow.
+    Raises:
+        ValueError: Si une colonne de dates contient des valeurs non reconnues (sans dates_en_texte),
+            ou si une colonne de texte contient des valeurs qui ne sont pas des chaînes.
+    """
+    types = {champ.name: champ.type for champ in schema_arrow(schema, dates_en_texte)} if schema is not None else {}
+    colonnes = {col: _colonne_typee(df[col], types[col]) if col in types else df[col] for col in df.columns}
+    df = pd.DataFrame(colonnes, index=df.index, copy=False)
+    schema_table = pa.Schema.from_pandas(df, preserve_index=False)
+    for col, type_arrow in types.items():
+        if col in df.columns:
+            schema_table = schema_table.set(schema_table.get_field_index(col), pa.field(col, type_arrow))
+    return pa.Table.from_pandas(df, schema=schema_table, preserve_index=False)
@@ -0,0 +1,210 @@
+import os
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from typing import Any, Dict, List, Optional, Union
+from ..data_processing.date_utils import parse_dates
+from ..schemas.bodacc_schemas import ProcessedProcedureCollective, UnProcessedProcedureCollective
+from .arrow_schemas import vers_table_arrow
+
+
+RAW_DIR = "raw"
+PROCESSED_DIR = "processed"
+
+# colonnes de partition (dossiers Hive 'famille_avis=.../annee=.../mois=.../departement=...')
+SCHEMA_PARTITIONS = pa.schema([
+    pa.field("famille_avis", pa.string()),
+    pa.field("annee", pa.int16()),
+    pa.field("mois", pa.int8()),
+    pa.field("departement", pa.string()),
+])
+COLONNES_PARTITIONS = SCHEMA_PARTITIONS.names
+
+# colonnes sources des partitions, brutes puis traitées
+COLONNES_FAMILLE = ("familleavis",)
+COLONNES_DATE = ("dateparution", "date_parution")
+COLONNES_DEPARTEMENT = ("numerodepartement", "numero_departement")
+
+
+def _premiere_colonne(df: pd.DataFrame, noms) -> Optional[pd.Series]:
+    for nom in noms:
+        if nom in df.columns:
+            return df[nom]
+    return None
+
+
+def colonnes_de_partition(df: pd.DataFrame, familleavis: Optional[str] = None) -> pd.DataFrame:
+    """
+    Calcule les colonnes de partition d'annonces brutes ou traitées : famille d'avis, année et mois
+    de la date de parution, département. Une valeur absente donne une partition par défaut.
+
+    Args:
+        df (pd.DataFrame): Les annonces.
+        familleavis (str): La famille d'avis des annonces, si elles n'ont pas de colonne 'familleavis'.
+    Returns:
+        pd.DataFrame: Les colonnes famille_avis, annee, mois et departement, avec l'index de df.
+    """
+    famille = _premiere_colonne(df, COLONNES_FAMILLE)
+    if famille is None:
+        famille = pd.Series(familleavis, index=df.index, dtype=object)
+    dates = _premiere_colonne(df, COLONNES_DATE)
+    if dates is None:
+        dates = pd.Series(pd.NaT, index=df.index)
+    elif not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = parse_dates(dates)[0]
+    departement = _premiere_colonne(df, COLONNES_DEPARTEMENT)
+    if departement is None:
+        departement = pd.Series(None, index=df.index, dtype=object)
+
+    return pd.DataFrame({
+        "famille_avis": famille.astype(object).where(famille.notnull(), None),
+        "annee": dates.dt.year.astype("Int16"),
+        "mois": dates.dt.month.astype("Int8"),
+        "departement": departement.astype(object).where(departement.notnull(), None),
+    }, index=df.index)
+
+
+def _valeurs(valeurs) -> List[Any]:
+    if isinstance(valeurs, (list, tuple, set)):
+        return list(valeurs)
+    return [valeurs]
+
+
+class BodaccParquetLake:
+    """
+    Lac de données local au format Parquet pour les annonces BODACC : les pages brutes de l'API
+    (dossier 'raw') et les sorties de clean_and_extract_ps (dossier 'processed').
+
+    Les fichiers sont partitionnés (dossiers Hive) par famille d'avis, année et mois de parution
+    et département ; les colonnes sont typées selon les schémas de bodacc_schemas. Les dates des
+    annonces brutes sont conservées en texte ; celles des annonces traitées sont des timestamps. La lecture ne
+    charge que les colonnes demandées et ne parcourt que les partitions retenues par les filtres.
+    """
+
+    def __init__(self, root: str, logger: Optional[Any] = None):
+        """
+        Initialise le lac de données.
+
+        :param root: Dossier racine du lac.
+        :param logger: Logger pour les messages d'information.
+        """
+        self.root = root
+        self.logger = logger
+        self.partitioning = ds.partitioning(SCHEMA_PARTITIONS, flavor="hive")
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, kind: str) -> str:
+        assert kind in (RAW_DIR, PROCESSED_DIR), f"Type de données inconnu : {kind}."
+        return os.path.join(self.root, kind)
+
+    def _write(self, kind: str, df: pd.DataFrame, schema, familleavis: Optional[str], replace: bool) -> int:
+        if df.empty:
+            return 0
+        # les dates brutes restent en texte : une date non reconnue est conservée telle que publiée
+        table = vers_table_arrow(df, schema, dates_en_texte=kind == RAW_DIR)
+        partitions = colonnes_de_partition(df, familleavis)
+        for nom in COLONNES_PARTITIONS:
+            table = table.append_column(SCHEMA_PARTITIONS.field(nom), pa.array(partitions[nom], type=SCHEMA_PARTITIONS.field(nom).type, from_pandas=True))
+
+        ds.write_dataset(
+            table, self._path(kind), format="parquet", partitioning=self.partitioning,
+            # nom de fichier unique : une nouvelle écriture s'ajoute aux fichiers existants
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            # replace : les partitions touchées par l'écriture sont vidées au préalable
+            existing_data_behavior="delete_matching" if replace else "overwrite_or_ignore",
+        )
+        if self.logger:
+            self.logger.info(f"{len(df)} annonce(s) écrite(s) dans {self._path(kind)}.")
+        return len(df)
+
+    def write_raw(self, data: Union[pd.DataFrame, List[Dict[str, Any]]], schema=UnProcessedProcedureCollective,
+                  familleavis: Optional[str] = None, replace: bool = False) -> int:
+        """
+        Écrit des annonces brutes (pages de l'API ou DataFrame) dans le lac.
+
+        :param data: Les annonces brutes, en liste de dictionnaires ou en DataFrame.
+        :param schema: Le schéma des annonces brutes (types des colonnes).
+        :param familleavis: La famille d'avis, si les annonces n'ont pas de colonne 'familleavis'.
+        :param replace: Si True, remplace le contenu des partitions écrites au lieu de s'y ajouter.
+        :return: Le nombre d'annonces écrites.
+        """
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        return self._write(RAW_DIR, df, schema, familleavis, replace)
+
+    def write_processed(self, df: pd.DataFrame, schema=ProcessedProcedureCollective,
+                        familleavis: Optional[str] = "collective", replace: bool = False) -> int:
+        """
+        Écrit des annonces traitées (sortie de clean_and_extract_ps) dans le lac.
+
+        :param df: Les annonces traitées. Une date non reconnue lève une ValueError.
+        :param schema: Le schéma des annonces traitées (types des colonnes).
+        :param familleavis: La famille d'avis des annonces, si elles n'ont pas de colonne 'familleavis'.
+        :param replace: Si True, remplace le contenu des partitions écrites au lieu de s'y ajouter.
+        :return: Le nombre d'annonces écrites.
+        """
+        return self._write(PROCESSED_DIR, df, schema, familleavis, replace)
+
+    def dataset(self, kind: str = PROCESSED_DIR) -> Optional[ds.Dataset]:
+        """
+        Retourne le dataset Arrow d'un dossier du lac ('raw' ou 'processed'), ou None s'il est vide.
+        Le schéma du dataset réunit ceux de tous les fichiers (colonnes ajoutées ou vides dans certains fichiers).
+        """
+        path = self._path(kind)
+        if not os.path.isdir(path):
+            return None
+        dataset = ds.dataset(path, format="parquet", partitioning=self.partitioning)
+        schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+        if not schemas:
+            return None
+        schema = pa.unify_schemas(schemas + [SCHEMA_PARTITIONS], promote_options="permissive")
+        return ds.dataset(path, schema=schema, format="parquet", partitioning=self.partitioning)
+
+    @staticmethod
+    def partition_filter(familles=None, annees=None, mois=None, departements=None) -> Optional[ds.Expression]:
+        """
+        Construit le filtre de partitions : chaque argument est une valeur ou une liste de valeurs acceptées.
+        """
+        filtre = None
+        for nom, valeurs in zip(COLONNES_PARTITIONS, (familles, annees, mois, departements)):
+            if valeurs is None:
+                continue
+            condition = ds.field(nom).isin(_valeurs(valeurs))
+            filtre = condition if filtre is None else filtre & condition
+        return filtre
+
+    def _read(self, kind: str, columns: Optional[List[str]], familles, annees, mois, departements,
+              filtre: Optional[ds.Expression]) -> pd.DataFrame:
+        dataset = self.dataset(kind)
+        if dataset is None:
+            return pd.DataFrame(columns=columns)
+        if columns is None:
+            # par défaut, les colonnes d'origine, sans les colonnes de partition
+            columns = [nom for nom in dataset.schema.names if nom not in COLONNES_PARTITIONS]
+
+        expression = self.partition_filter(familles, annees, mois, departements)
+        if filtre is not None:
+            expression = filtre if expression is None else expression & filtre
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    def read_raw(self, columns: Optional[List[str]] = None, familles=None, annees=None, mois=None,
+                 departements=None, filtre: Optional[ds.Expression] = None) -> pd.DataFrame:
+        """
+        Lit des annonces brutes du lac.
+
+        :param columns: Les colonnes à lire (colonnes de partition comprises). Par défaut, toutes les colonnes d'origine.
+        :param familles: La ou les familles d'avis à lire.
+        :param annees: La ou les années de parution à lire.
+        :param mois: Le ou les mois de parution à lire.
+        :param departements: Le ou les départements à lire.
+        :param filtre: Un filtre Arrow supplémentaire sur les colonnes (par exemple ds.field('SIREN') == '...').
+        :return: Les annonces, dans un DataFrame.
+        """
+        return self._read(RAW_DIR, columns, familles, annees, mois, departements, filtre)
+
+    def read_processed(self, columns: Optional[List[str]] = None, familles=None, annees=None, mois=None,
+                       departements=None, filtre: Optional[ds.Expression] = None) -> pd.DataFrame:
+        """
+        Lit des annonces traitées du lac (mêmes arguments que read_raw).
+        """
+        return self._read(PROCESSED_DIR, columns, familles, annees, mois, departements, filtre)
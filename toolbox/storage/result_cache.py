@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from typing import Any, Callable, List, Optional
+
+
+# taille maximale du cache sur disque, en octets
+TAILLE_MAX_CACHE = 2 * 1024 ** 3
+
+EXTENSION_CACHE = ".arrow"
+
+# métadonnée du schéma Arrow : types pandas des colonnes, restaurés à la lecture
+CLE_TYPES = b"toolbox.dtypes"
+
+def _empreinte_textes(empreinte, marque: bytes, textes):
+    # longueur de chaque texte puis textes concaténés : le découpage est sans ambiguïté, quel que soit le contenu
+    longueurs = np.fromiter(map(len, textes), dtype=np.int64, count=len(textes))
+    empreinte.update(marque)
+    empreinte.update(longueurs.view(np.uint8))
+    empreinte.update("".join(textes).encode("utf-8", "surrogatepass"))
+
+
+def _nom_type_valeur(valeur) -> str:
+    return f"{type(valeur).__module__}.{type(valeur).__qualname__}"
+
+
+def _empreinte_valeurs(empreinte, valeurs: pd.Series):
+    # tableaux NumPy de taille fixe (nombres, dates) : octets bruts, sans conversion
+    if isinstance(valeurs.dtype, pd.CategoricalDtype):
+        _empreinte_valeurs(empreinte, pd.Series(valeurs.cat.categories))
+        valeurs = pd.Series(valeurs.cat.codes)
+    if isinstance(valeurs.dtype, np.dtype) and valeurs.dtype != object:
+        empreinte.update(np.ascontiguousarray(valeurs.to_numpy()).view(np.uint8))
+        return
+    objets = valeurs.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(objets, skipna=False) == "string":
+        # uniquement des chaînes : hachées telles quelles
+        _empreinte_textes(empreinte, b"s", objets)
+        return
+    # valeurs manquantes ou objets : type de chaque valeur, puis la chaîne elle-même ou sa représentation,
+    # de sorte que None et "None", NaN et "nan" restent distincts
+    textes = []
+    for valeur in objets:
+        textes.append(_nom_type_valeur(valeur))
+        textes.append(valeur if isinstance(valeur, str) else repr(valeur))
+    _empreinte_textes(empreinte, b"o", textes)
+
+
+def _nom_type(dtype) -> str:
+    # nom complet du type (str(pd.StringDtype("pyarrow")) ne précise pas le stockage)
+    if isinstance(dtype, pd.StringDtype):
+        return f"string[{dtype.storage}]"
+    return str(dtype)
+
+
+def empreinte_dataframe(df: pd.DataFrame) -> str:
+    """
+    Empreinte du contenu d'un DataFrame (noms et types des colonnes, index, valeurs) : deux DataFrames
+    de même contenu ont la même empreinte. Calculée sur les octets des colonnes, sans hachage par ligne.
+
+    Args:
+        df (pd.DataFrame): Le DataFrame.
+    Returns:
+        str: L'empreinte (hexadécimale).
+    """
+    empreinte = hashlib.blake2b(digest_size=16)
+    empreinte.update(repr((df.shape, list(map(repr, df.columns)), list(map(str, df.dtypes)))).encode())
+    if isinstance(df.index, pd.RangeIndex):
+        empreinte.update(repr(df.index).encode())
+    else:
+        _empreinte_valeurs(empreinte, pd.Series(df.index))
+    for i in range(df.shape[1]):
+        _empreinte_valeurs(empreinte, df.iloc[:, i])
+    return empreinte.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache sur disque de résultats de traitements (DataFrames), au format Arrow IPC (Feather non compressé).
+
+    La clé d'un résultat combine l'empreinte du DataFrame d'entrée, la fonction, sa version et ses
+    paramètres : une modification des données, des paramètres ou du pipeline donne une nouvelle clé.
+    Un résultat en cache est relu au lieu d'être recalculé : get_table projette le fichier en mémoire
+    (memory map) sans copie, get le convertit en DataFrame, ce qui copie les données.
+    La taille du cache est bornée : les résultats les moins récemment utilisés sont supprimés.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = TAILLE_MAX_CACHE, logger: Optional[Any] = None):
+        """
+        Initialise le cache.
+
+        :param cache_dir: Dossier des fichiers du cache.
+        :param max_bytes: Taille maximale du cache, en octets.
+        :param logger: Logger pour les messages d'information.
+        """
+        assert max_bytes > 0, "La taille maximale du cache doit être strictement positive."
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.logger = logger
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(df: pd.DataFrame, func: Callable, version: Any = None, **params) -> str:
+        """
+        Clé du résultat de func(df, **params) pour une version donnée du traitement.
+        """
+        identite = repr((func.__module__, func.__qualname__, version, sorted(params.items()))).encode()
+        return hashlib.blake2b(empreinte_dataframe(df).encode() + identite, digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{EXTENSION_CACHE}")
+
+    def _entries(self) -> List[os.DirEntry]:
+        return [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(EXTENSION_CACHE)]
+
+    def get_table(self, key: str) -> Optional[pa.Table]:
+        """
+        Retourne le résultat en cache sous forme de table Arrow projetée en mémoire (sans copie), ou None.
+        """
+        path = self._path(key)
+        try:
+            table = feather.read_table(path, memory_map=True)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        # date d'accès pour l'éviction des résultats les moins récemment utilisés
+        os.utime(path)
+        return table
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Retourne le résultat en cache sous forme de DataFrame (mêmes types qu'à l'écriture), ou None.
+        La conversion en DataFrame copie les données de la table projetée en mémoire (voir get_table).
+        """
+        table = self.get_table(key)
+        if table is None:
+            return None
+        df = table.to_pandas()
+        types = json.loads((table.schema.metadata or {}).get(CLE_TYPES, b"{}"))
+        for i, col in enumerate(df.columns):
+            # chaînes pandas : Arrow les relit en stockage Python quel que soit le stockage d'origine
+            type_colonne = types.get(str(col))
+            if type_colonne and type_colonne.startswith("string[") and df.dtypes.iloc[i] != pd.api.types.pandas_dtype(type_colonne):
+                df.isetitem(i, df.iloc[:, i].astype(type_colonne))
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> str:
+        """
+        Écrit un résultat dans le cache puis applique la limite de taille.
+
+        :return: Le chemin du fichier écrit.
+        """
+        table = pa.Table.from_pandas(df)
+        types = json.dumps({str(col): _nom_type(dtype) for col, dtype in df.dtypes.items()})
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), CLE_TYPES: types.encode()})
+
+        path = self._path(key)
+        # écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais de fichier tronqué
+        tmp_path = f"{path}.tmp"
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        self.evict(keep=key)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Supprime les résultats les moins récemment utilisés jusqu'à respecter la taille maximale.
+
+        :param keep: Clé d'un résultat à conserver (celui qui vient d'être écrit).
+        :return: Le nombre de résultats supprimés.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        supprimes = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.name == f"{keep}{EXTENSION_CACHE}":
+                continue
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+            supprimes += 1
+        return supprimes
+
+    def clear(self):
+        """
+        Vide le cache.
+        """
+        for entry in self._entries():
+            os.remove(entry.path)
+
+    def size(self) -> int:
+        """
+        Taille totale des résultats en cache, en octets.
+        """
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def call(self, func: Callable, df: pd.DataFrame, version: Any = None, **params) -> pd.DataFrame:
+        """
+        Retourne func(df, **params) depuis le cache s'il y est, sinon le calcule et l'écrit dans le cache.
+
+        :param func: Le traitement (DataFrame -> DataFrame).
+        :param df: Le DataFrame d'entrée.
+        :param version: La version du traitement : la changer invalide les résultats en cache.
+        :param params: Les paramètres nommés du traitement.
+        """
+        key = self.key(df, func, version, **params)
+        resultat = self.get(key)
+        if resultat is not None:
+            if self.logger:
+                self.logger.info(f"Résultat de {func.__qualname__} lu depuis le cache ({key}).")
+            return resultat
+        resultat = func(df, **params)
+        self.put(key, resultat)
+        return resultat